@@ -0,0 +1,100 @@
+import sys
+import os
+import json
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from bodygraph import (CENTER_INDEX, CHANNELS, GATE_CENTER, MOTORS, TYPES, AUTHORITIES,
+                       gate_masks, evaluate)
+
+# Microbenchmark for the bitmask body graph.
+#
+# Evaluates random 26-activation gate matrices in batch and compares the rate
+# with a straightforward per-chart implementation (gate sets, union-find over
+# the defined channels), which also checks that both agree on a sample.
+#
+# Usage: python backend/benchmarks/bodygraph_bench.py [charts] [reference_charts]
+
+
+def reference_bodygraph(gates):
+    # Per-chart evaluation with sets, for comparison
+    gates = set(gates)
+    channels = [(a, b) for a, b in CHANNELS if a in gates and b in gates]
+    parent = {}
+
+    def find(center):
+        while parent[center] != center:
+            center = parent[center]
+        return center
+
+    for a, b in channels:
+        for gate in (a, b):
+            parent.setdefault(int(GATE_CENTER[gate]), int(GATE_CENTER[gate]))
+        parent[find(int(GATE_CENTER[a]))] = find(int(GATE_CENTER[b]))
+    defined = set(parent)
+    throat = CENTER_INDEX['Throat']
+    motor_to_throat = throat in defined and any(
+        CENTER_INDEX[motor] in defined and find(CENTER_INDEX[motor]) == find(throat) for motor in MOTORS)
+    sacral = CENTER_INDEX['Sacral'] in defined
+
+    if not defined:
+        hd_type = 'Reflector'
+    elif sacral:
+        hd_type = 'Manifesting Generator' if motor_to_throat else 'Generator'
+    else:
+        hd_type = 'Manifestor' if motor_to_throat else 'Projector'
+
+    authority = 'Lunar' if not defined else 'Mental Projector'
+    for center, name in (('Solar Plexus', 'Emotional'), ('Sacral', 'Sacral'), ('Spleen', 'Splenic'),
+                         ('Heart', 'Ego'), ('G', 'Self')):
+        if CENTER_INDEX[center] in defined:
+            authority = name
+            break
+
+    return (sum(1 << center for center in defined), len({find(center) for center in defined}),
+            hd_type, authority)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: charts reference_charts'}))
+        sys.exit(1)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    reference_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    rng = np.random.default_rng(0)
+    gates = rng.integers(1, 65, size=(count, 26), dtype=np.int8)
+
+    start = time.perf_counter()
+    masks = gate_masks(gates)
+    mask_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    result = evaluate(masks)
+    evaluate_seconds = time.perf_counter() - start
+
+    sample = gates[:reference_count].tolist()
+    start = time.perf_counter()
+    expected = [reference_bodygraph(row) for row in sample]
+    reference_seconds = time.perf_counter() - start
+
+    mismatches = sum(
+        (int(result['centers'][i]), int(result['components'][i]),
+         TYPES[result['type'][i]], AUTHORITIES[result['authority'][i]]) != reference
+        for i, reference in enumerate(expected))
+
+    batch_seconds = mask_seconds + evaluate_seconds
+    print(json.dumps({
+        'charts': count,
+        'maskSeconds': round(mask_seconds, 3),
+        'evaluateSeconds': round(evaluate_seconds, 3),
+        'chartsPerSecond': round(count / batch_seconds),
+        'referenceChartsPerSecond': round(len(sample) / reference_seconds),
+        'speedup': round((count / batch_seconds) / (len(sample) / reference_seconds), 1),
+        'types': {name: int(n) for name, n in zip(TYPES, np.bincount(result['type'], minlength=len(TYPES)))},
+        'centersDefined': round(float(np.mean([bin(int(c)).count('1') for c in result['centers'][:10000]])), 2),
+        'mismatches': mismatches
+    }))
+    sys.exit(1 if mismatches else 0)
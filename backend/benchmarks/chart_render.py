@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from astro_calculator import calculate_astro
+from human_design import calculate_human_design
+from chart_generator import generate_hd_chart, generate_hd_chart_batch
+
+# Chart PDF rendering throughput.
+#
+# Renders the same synthetic charts with one generate_hd_chart call per file
+# and with generate_hd_chart_batch (one multi-page document with the static
+# layout, centers and gate descriptions as form XObjects). Chart data is
+# computed up front and not timed.
+#
+# Usage: python backend/benchmarks/chart_render.py [charts]
+
+
+def synthetic_charts(count, seed=0):
+    rng = random.Random(seed)
+    charts = []
+    for i in range(count):
+        record = (f'{rng.randint(1900, 2099)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+                  f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}',
+                  round(rng.uniform(-60, 65), 4), round(rng.uniform(-180, 180), 4))
+        charts.append((calculate_human_design(*record), calculate_astro(*record), f'User {i}'))
+    return charts
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: charts'}))
+        sys.exit(1)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    charts = synthetic_charts(count)
+    report = {'charts': count}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Warm imports and caches outside the timings
+        generate_hd_chart(*charts[0], os.path.join(workdir, 'warm.pdf'))
+        os.remove(os.path.join(workdir, 'warm.pdf'))
+
+        for mode in ('perFile', 'batch'):
+            output_dir = os.path.join(workdir, mode)
+            os.makedirs(output_dir)
+            paths = [os.path.join(output_dir, f'{i}.pdf') for i in range(count)]
+            start = time.perf_counter()
+            if mode == 'perFile':
+                results = [generate_hd_chart(*chart, path) for chart, path in zip(charts, paths)]
+                failed = sum(not result['success'] for result in results)
+            else:
+                result = generate_hd_chart_batch(charts, os.path.join(output_dir, 'charts.pdf'))
+                failed = count - result.get('pages', 0)
+            seconds = time.perf_counter() - start
+            report[mode] = {
+                'seconds': round(seconds, 3),
+                'pagesPerSecond': round(count / seconds, 1),
+                'bytes': directory_size(output_dir),
+                'failed': failed
+            }
+
+    report['batchSpeedup'] = round(report['batch']['pagesPerSecond'] / report['perFile']['pagesPerSecond'], 2)
+    print(json.dumps(report))
@@ -0,0 +1,127 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from gazetteer import Gazetteer, build_gazetteer
+from name_index import NameIndex
+from spatial_index import SphereKDTree
+
+# Gazetteer load time (JSON versus the memory-mapped binary format) and
+# per-keystroke latency of city autocomplete and nearest-city lookup as the
+# gazetteer grows. Synthetic names are built from syllables so prefixes are
+# shared the way real place names share them.
+#
+# Usage: python backend/benchmarks/city_search.py [max_size]
+
+SIZES = (20, 1000, 10000, 100000, 300000)
+SYLLABLES = ('san', 'ta', 'ro', 'mar', 'ka', 'bel', 'lo', 'ni', 'ver', 'do', 'sa', 'ri',
+             'port', 'new', 'el', 'mon', 'ga', 'tor', 'vi', 'la', 'ber', 'lin', 'ko', 'zu')
+COUNTRIES = ('USA', 'UK', 'France', 'Germany', 'Brazil', 'India', 'Japan', 'Mexico',
+             'Spain', 'Italy', 'Canada', 'Australia', 'Egypt', 'Russia', 'China')
+QUERIES = 200
+
+
+def synthetic_gazetteer(size, rng):
+    words = rng.choice(len(SYLLABLES), size=(size, 7))
+    lengths = rng.integers(2, 5, size)
+    two_words = rng.random(size) < 0.2
+    names = []
+    for i in range(size):
+        name = ''.join(SYLLABLES[s] for s in words[i, :lengths[i]])
+        if two_words[i]:
+            name += ' ' + ''.join(SYLLABLES[s] for s in words[i, 5:])
+        names.append(name)
+    countries = [COUNTRIES[c] for c in rng.integers(0, len(COUNTRIES), size)]
+    latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, size)))
+    longitudes = rng.uniform(-180, 180, size)
+    return names, countries, latitudes, longitudes
+
+
+def typo(name, rng):
+    # Swap two neighbouring letters
+    if len(name) < 4:
+        return name
+    i = int(rng.integers(1, len(name) - 2))
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def percentiles(samples):
+    samples = np.array(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50)), 4),
+        'p95_ms': round(float(np.percentile(samples, 95)), 4),
+        'max_ms': round(float(samples.max()), 4)
+    }
+
+
+def load_times(names, countries, latitudes, longitudes):
+    # Seconds to open each format and answer one exact-name lookup
+    cities = {name: {'country': country, 'lat': float(lat), 'lng': float(lng)}
+              for name, country, lat, lng in zip(names, countries, latitudes, longitudes)}
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'cities.json')
+        with open(json_path, 'w') as f:
+            json.dump(cities, f)
+        binary_path = build_gazetteer(json_path, os.path.join(directory, 'cities.bin'))
+
+        start = time.perf_counter()
+        with open(json_path, 'r') as f:
+            json.load(f).get(names[0])
+        json_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Gazetteer(binary_path).find(names[0])
+        binary_time = time.perf_counter() - start
+        return {'json': round(json_time, 4), 'mmap': round(binary_time, 4),
+                'json_bytes': os.path.getsize(json_path), 'mmap_bytes': os.path.getsize(binary_path)}
+
+
+def run(size, rng):
+    names, countries, latitudes, longitudes = synthetic_gazetteer(size, rng)
+    load = load_times(names, countries, latitudes, longitudes)
+
+    start = time.perf_counter()
+    names_index = NameIndex(names, countries)
+    name_build = time.perf_counter() - start
+    start = time.perf_counter()
+    spatial = SphereKDTree(latitudes, longitudes)
+    spatial_build = time.perf_counter() - start
+
+    # Type sampled names one keystroke at a time
+    keystrokes, fuzzy, nearest = [], [], []
+    for i in rng.integers(0, size, QUERIES):
+        name = names[i]
+        for end in range(1, len(name) + 1):
+            start = time.perf_counter()
+            names_index.search(name[:end], 5)
+            keystrokes.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        names_index.search(typo(name, rng), 5)
+        fuzzy.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        spatial.nearest(latitudes[i] + 0.1, longitudes[i] + 0.1, 5)
+        nearest.append(time.perf_counter() - start)
+
+    return {
+        'size': size,
+        'load_s': load,
+        'build_s': {'names': round(name_build, 3), 'spatial': round(spatial_build, 3)},
+        'keystroke': percentiles(keystrokes),
+        'typo': percentiles(fuzzy),
+        'nearest': percentiles(nearest)
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: max_size'}))
+        sys.exit(1)
+
+    max_size = int(sys.argv[1]) if len(sys.argv) == 2 else SIZES[-1]
+    rng = np.random.default_rng(0)
+    print(json.dumps([run(size, rng) for size in SIZES if size <= max_size], indent=2))
@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from executor import ChartExecutor
+
+# Throughput of the process-pool executor from 1 to N workers, for dict
+# results (map 'astro' and 'human_design') and the shared-memory columnar
+# path (compute_columns). Pools are warmed before timing.
+#
+# Usage: python backend/benchmarks/executor_scaling.py [records] [max_workers]
+
+
+def synthetic_records(count, seed=0):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 365 * 200, count)
+    minutes = rng.integers(0, 24 * 60, count)
+    dates = (np.datetime64('1900-01-01') + days).astype(str)
+    return [
+        (str(date), f'{minute // 60:02d}:{minute % 60:02d}', float(lat), float(lng))
+        for date, minute, lat, lng in zip(dates, minutes, rng.uniform(-60, 65, count),
+                                          rng.uniform(-180, 180, count))
+    ]
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run(records, workers):
+    with ChartExecutor(workers) as executor:
+        # Warm every worker before timing
+        executor.map('astro', records[:workers * 4])
+        return {
+            'astro': len(records) / timed(lambda: executor.map('astro', records)),
+            'human_design': len(records) / timed(lambda: executor.map('human_design', records)),
+            'columns': len(records) / timed(lambda: executor.compute_columns(records))
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: records max_workers'}))
+        sys.exit(1)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    records = synthetic_records(count)
+
+    results = []
+    baseline = None
+    for workers in worker_counts(max_workers):
+        throughput = run(records, workers)
+        baseline = baseline or throughput
+        results.append({
+            'workers': workers,
+            'recordsPerSecond': {kind: round(rate, 1) for kind, rate in throughput.items()},
+            'speedup': {kind: round(rate / baseline[kind], 2) for kind, rate in throughput.items()},
+            'efficiency': {kind: round(rate / baseline[kind] / workers, 2) for kind, rate in throughput.items()}
+        })
+    print(json.dumps({'records': count, 'cpus': os.cpu_count(), 'results': results}, indent=2))
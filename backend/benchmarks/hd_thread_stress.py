@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from human_design import calculate_human_design, calculate_human_design_batch
+from astro_calculator import calculate_astro
+
+# Concurrency stress test for the Human Design calculator.
+#
+# Computes a serial reference, then recomputes every record from many threads
+# at once, over several rounds, while another thread keeps reseeding the
+# module-global RNG. Any shared random state would show up as mismatches.
+# Exits non-zero on the first mismatch.
+#
+# Usage: python backend/benchmarks/hd_thread_stress.py [records] [threads] [rounds]
+
+
+def random_records(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        (f'{rng.randint(1900, 2099)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+         f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}',
+         round(rng.uniform(-60, 65), 4), round(rng.uniform(-180, 180), 4))
+        for _ in range(count)
+    ]
+
+
+def interfere(stop):
+    # Reseed and draw from the global RNG as fast as possible
+    while not stop.is_set():
+        random.seed(time.perf_counter_ns())
+        random.random()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 4:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: records threads rounds'}))
+        sys.exit(1)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    # Lots of thread switches inside each call
+    sys.setswitchinterval(1e-6)
+
+    records = random_records(count)
+    expected = [calculate_human_design(*record) for record in records]
+    astro_records = records[:max(1, count // 20)]
+    expected_astro = [calculate_astro(*record)['humanDesign'] for record in astro_records]
+
+    stop = threading.Event()
+    noise = threading.Thread(target=interfere, args=(stop,), daemon=True)
+    noise.start()
+    mismatches = 0
+    start = time.perf_counter()
+    try:
+        for _ in range(rounds):
+            results = calculate_human_design_batch(records, threads)
+            mismatches += sum(result != reference for result, reference in zip(results, expected))
+            # calculate_astro embeds Human Design data too
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                astro = list(pool.map(lambda record: calculate_astro(*record)['humanDesign'], astro_records))
+            mismatches += sum(result != reference for result, reference in zip(astro, expected_astro))
+    finally:
+        stop.set()
+        noise.join()
+
+    print(json.dumps({
+        'records': count,
+        'threads': threads,
+        'rounds': rounds,
+        'mismatches': mismatches,
+        'seconds': round(time.perf_counter() - start, 3)
+    }))
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,112 @@
+import sys
+import os
+import json
+import statistics
+import subprocess
+
+# Import-time budget for the calculator utilities.
+#
+# Every check starts fresh interpreters with -X importtime and parses the
+# per-module report on stderr ("import time: self | cumulative | name", with
+# nesting shown by indentation). Two kinds of checks:
+#
+#   module  `import <name>`: its cumulative time must stay within budget
+#   cli     `python <script>` with missing arguments: the whole start-up,
+#           up to the JSON error, must stay within budget
+#
+# and neither may import any of its forbidden modules (the heavy
+# dependencies that only compute paths need). Times are the median of
+# several runs. Exits non-zero when any check fails.
+#
+# Usage: python backend/benchmarks/import_budget.py [runs] [scale]
+#   scale multiplies every budget, for slower machines
+
+UTILS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils')
+
+HEAVY = ('numpy', 'ephem', 'reportlab.pdfgen', 'reportlab.platypus', 'reportlab.lib.styles')
+
+# (kind, target, budget in ms, forbidden modules)
+BUDGETS = (
+    ('module', 'astro_calculator', 80, HEAVY + ('human_design',)),
+    ('module', 'human_design', 80, HEAVY + ('concurrent.futures',)),
+    ('module', 'chart_generator', 80, HEAVY),
+    ('module', 'chart_store', 80, HEAVY),
+    ('module', 'astro_record', 80, HEAVY),
+    ('module', 'bodygraph_cache', 80, HEAVY + ('PIL',)),
+    ('module', 'stream_cli', 200, HEAVY),
+    ('module', 'bodygraph', 600, ('ephem', 'reportlab')),
+    ('module', 'gate_engine', 700, ('reportlab',)),
+    ('cli', 'astro_calculator.py', 120, HEAVY),
+    ('cli', 'human_design.py', 120, HEAVY),
+    ('cli', 'chart_generator.py', 120, HEAVY),
+    ('cli', 'chart_store.py', 120, HEAVY)
+)
+
+DEFAULT_RUNS = 5
+
+
+def parse_importtime(stderr):
+    """(depth, self_us, cumulative_us, name) for every module in a report."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def run_importtime(kind, target):
+    if kind == 'module':
+        command = [sys.executable, '-X', 'importtime', '-c', f'import {target}']
+    else:
+        command = [sys.executable, '-X', 'importtime', target]
+    completed = subprocess.run(command, cwd=UTILS_DIR, capture_output=True, text=True)
+    entries = parse_importtime(completed.stderr)
+    if kind == 'module':
+        top = [cumulative for depth, _, cumulative, name in entries if depth == 0 and name == target]
+        if not top:
+            raise RuntimeError(f'{target} did not import: {completed.stderr.strip().splitlines()[-1:]}')
+        total = top[-1]
+    else:
+        total = sum(cumulative for depth, _, cumulative, _ in entries if depth == 0)
+    return total / 1000, {name for _, _, _, name in entries}, entries
+
+
+def check(kind, target, budget, forbidden, runs, scale):
+    times = []
+    imported = set()
+    entries = []
+    for _ in range(runs):
+        ms, names, entries = run_importtime(kind, target)
+        times.append(ms)
+        imported |= names
+    heavy = sorted(name for name in imported
+                   if any(name == module or name.startswith(module + '.') for module in forbidden))
+    median = statistics.median(times)
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:5]
+    return {
+        'kind': kind,
+        'target': target,
+        'ms': round(median, 1),
+        'budgetMs': round(budget * scale, 1),
+        'forbiddenImported': heavy,
+        'slowest': [{'module': name, 'selfMs': round(self_us / 1000, 1)} for _, self_us, _, name in slowest],
+        'ok': median <= budget * scale and not heavy
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: runs scale'}))
+        sys.exit(1)
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUNS
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    results = [check(kind, target, budget, forbidden, runs, scale)
+               for kind, target, budget, forbidden in BUDGETS]
+    ok = all(result['ok'] for result in results)
+    print(json.dumps({'runs': runs, 'scale': scale, 'ok': ok, 'checks': results}, indent=2))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,313 @@
+import sys
+import os
+import json
+import time
+import platform
+import resource
+import subprocess
+from datetime import datetime, timezone
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src', 'utils'))
+
+# Benchmark suite for the calculation and rendering hot paths.
+#
+# Every case runs in a fresh interpreter, so start-up work, caches and peak
+# RSS belong to that case alone. Inputs are a fixed, seeded set of synthetic
+# birth records spanning 1900-2100 in both hemispheres, so two runs on the
+# same machine measure the same work. Each case reports throughput, per-call
+# latency percentiles and the process's peak RSS; the run is saved as JSON.
+#
+# `compare` diffs two saved runs and exits non-zero when any throughput
+# drops, or any latency or peak RSS grows, by more than the threshold.
+#
+# Usage:
+#   python backend/benchmarks/suite.py run [output_path] [records] [cases]
+#   python backend/benchmarks/suite.py compare baseline.json current.json [threshold]
+# cases is a comma-separated subset of CASES.
+
+DEFAULT_RECORDS = 2000
+DEFAULT_THRESHOLD = 0.15
+SEED = 20240101
+
+FIRST_DATE = np.datetime64('1900-01-01')
+LAST_DATE = np.datetime64('2100-12-31')
+
+# Charts rendered by the PDF case (rendering is far slower than the rest)
+MAX_CHARTS = 300
+
+# Gazetteer sizes and queries per lookup kind for the locations case
+GAZETTEER_SIZES = (1000, 10000, 100000)
+LOCATION_QUERIES = 500
+
+
+def synthetic_records(count, seed=SEED):
+    """(date, time, lat, lng) rows; odd rows are in the southern hemisphere."""
+    rng = np.random.default_rng(seed)
+    span = int((LAST_DATE - FIRST_DATE).astype(int))
+    dates = (FIRST_DATE + rng.integers(0, span + 1, count)).astype(str)
+    minutes = rng.integers(0, 24 * 60, count)
+    latitudes = rng.uniform(0, 65, count) * np.where(np.arange(count) % 2, -1, 1)
+    longitudes = rng.uniform(-180, 180, count)
+    return [
+        (str(date), f'{minute // 60:02d}:{minute % 60:02d}', round(float(lat), 4), round(float(lng), 4))
+        for date, minute, lat, lng in zip(dates, minutes, latitudes, longitudes)
+    ]
+
+
+def latency_stats(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        'p50': round(float(np.percentile(samples, 50)), 4),
+        'p90': round(float(np.percentile(samples, 90)), 4),
+        'p99': round(float(np.percentile(samples, 99)), 4),
+        'max': round(float(samples.max()), 4)
+    }
+
+
+def measure(function, items):
+    """Call function(*item) for every item, timing each call."""
+    samples = []
+    results = []
+    clock = time.perf_counter
+    for item in items:
+        start = clock()
+        results.append(function(*item))
+        samples.append(clock() - start)
+    seconds = sum(samples)
+    return results, {
+        'ops': len(samples),
+        'seconds': round(seconds, 4),
+        'opsPerSecond': round(len(samples) / seconds, 1) if seconds > 0 else None,
+        'latencyMs': latency_stats(samples)
+    }
+
+
+def case_astro_cold(records):
+    # Unique birth instants: every call misses the instant cache. The first
+    # call also pays for imports and table loading, reported on its own.
+    from astro_calculator import calculate_astro
+    start = time.perf_counter()
+    calculate_astro(*records[0])
+    first_call = time.perf_counter() - start
+    _, stats = measure(calculate_astro, records[1:])
+    stats['firstCallMs'] = round(first_call * 1000, 2)
+    return stats
+
+
+def case_astro_warm(records):
+    # Same records twice: the second pass hits the per-instant cache
+    from astro_calculator import calculate_astro
+    for record in records:
+        calculate_astro(*record)
+    _, stats = measure(calculate_astro, records)
+    return stats
+
+
+def case_aspects(records):
+    # Pairwise calculate_aspects over the 45 body pairs of every chart, and
+    # the vectorized engine over all charts at once
+    from astro_calculator import calculate_astro_batch, calculate_aspects
+    from aspects import find_aspects
+    longitudes = calculate_astro_batch(records)['longitudes']
+    longitudes = longitudes[~np.isnan(longitudes).any(axis=1)]
+    pairs = [(float(row[i]), float(row[j])) for row in longitudes
+             for i in range(len(row)) for j in range(i + 1, len(row))]
+    _, stats = measure(calculate_aspects, pairs)
+    start = time.perf_counter()
+    find_aspects(longitudes)
+    seconds = time.perf_counter() - start
+    stats['batchChartsPerSecond'] = round(len(longitudes) / seconds, 1)
+    return stats
+
+
+def case_house_cusps(records):
+    # calculate_house_cusps per observer, and compute_house_cusps vectorized
+    import ephem
+    from astro_calculator import (calculate_house_cusps, compute_house_cusps,
+                                  parse_birth_datetime, setup_observer)
+    observers = [(setup_observer(ephem.Observer(), parse_birth_datetime(date, birth_time), lat, lng),)
+                 for date, birth_time, lat, lng in records]
+    _, stats = measure(calculate_house_cusps, observers)
+    # compute_house_cusps takes Greenwich sidereal time plus the longitudes
+    locations = np.array([record[3] for record in records])
+    sidereal_times = np.array([float(observer.sidereal_time()) for observer, in observers]) - np.radians(locations)
+    start = time.perf_counter()
+    compute_house_cusps(sidereal_times, locations)
+    seconds = time.perf_counter() - start
+    stats['batchChartsPerSecond'] = round(len(records) / seconds, 1)
+    return stats
+
+
+def case_human_design(records):
+    from human_design import calculate_human_design
+    _, stats = measure(calculate_human_design, records)
+    return stats
+
+
+def case_chart_pdf(records):
+    # In-memory rendering, so disk speed does not enter the numbers
+    from astro_calculator import calculate_astro
+    from chart_generator import render_hd_chart
+    from human_design import calculate_human_design
+    charts = [(calculate_human_design(*record), calculate_astro(*record), f'User {i}')
+              for i, record in enumerate(records[:MAX_CHARTS])]
+    render_hd_chart(*charts[0])
+    pdfs, stats = measure(render_hd_chart, charts)
+    total_bytes = sum(len(pdf) for pdf in pdfs)
+    stats['bytes'] = total_bytes
+    stats['bytesPerSecond'] = round(total_bytes / stats['seconds'], 1)
+    return stats
+
+
+def case_locations(records):
+    # Exact, nearest and type-ahead lookups as the gazetteer grows
+    from city_search import synthetic_gazetteer
+    from gazetteer import Gazetteer, encode_cities
+    from location_utils import LocationUtils
+    rng = np.random.default_rng(SEED)
+    result = {}
+    for size in GAZETTEER_SIZES:
+        names, countries, latitudes, longitudes = synthetic_gazetteer(size, rng)
+        cities = {name: {'country': country, 'lat': float(lat), 'lng': float(lng)}
+                  for name, country, lat, lng in zip(names, countries, latitudes, longitudes)}
+        names = list(cities)
+        locations = LocationUtils(Gazetteer(encode_cities(cities)))
+
+        start = time.perf_counter()
+        locations.spatial_index, locations.name_index
+        build_seconds = time.perf_counter() - start
+
+        picks = rng.integers(0, len(names), LOCATION_QUERIES)
+        _, exact = measure(locations.get_coordinates, [(names[i],) for i in picks])
+        _, nearest = measure(locations.nearest_cities,
+                             [(lat, lng, 5) for _, _, lat, lng in records[:LOCATION_QUERIES]])
+        _, prefix = measure(locations.search_cities, [(names[i][:3],) for i in picks])
+        result[str(size)] = {
+            'indexBuildSeconds': round(build_seconds, 3),
+            'getCoordinates': exact,
+            'nearestCities': nearest,
+            'searchCities': prefix
+        }
+    return result
+
+
+CASES = {
+    'astro_cold': case_astro_cold,
+    'astro_warm': case_astro_warm,
+    'aspects': case_aspects,
+    'house_cusps': case_house_cusps,
+    'human_design': case_human_design,
+    'chart_pdf': case_chart_pdf,
+    'locations': case_locations
+}
+
+
+def run_case(name, count):
+    # Runs inside the child interpreter
+    result = CASES[name](synthetic_records(count))
+    result['peakRssKb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def environment():
+    versions = {}
+    for module_name in ('numpy', 'ephem', 'reportlab'):
+        try:
+            versions[module_name] = __import__(module_name).__version__
+        except (ImportError, AttributeError):
+            versions[module_name] = None
+    from ephemeris_table import get_default_table
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'packages': versions,
+        'ephemerisTable': get_default_table() is not None
+    }
+
+
+def run_suite(count, names):
+    cases = {}
+    for name in names:
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), 'case', name, str(count)],
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            cases[name] = {'error': completed.stderr.strip().splitlines()[-1:]}
+        else:
+            cases[name] = json.loads(completed.stdout)
+        sys.stderr.write(f'{name}: done\n')
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'records': count,
+        'seed': SEED,
+        'environment': environment(),
+        'cases': cases
+    }
+
+
+# Metric name -> +1 when higher is better, -1 when lower is better
+METRICS = {
+    'opsPerSecond': 1, 'batchChartsPerSecond': 1, 'bytesPerSecond': 1,
+    'p50': -1, 'p90': -1, 'p99': -1, 'peakRssKb': -1
+}
+
+
+def _flatten(value, prefix=''):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f'{prefix}.{key}' if prefix else key)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def compare_runs(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Metrics that got worse by more than threshold (a fraction)."""
+    before = dict(_flatten(baseline['cases']))
+    regressions = []
+    for path, value in _flatten(current['cases']):
+        direction = METRICS.get(path.rsplit('.', 1)[-1])
+        old = before.get(path)
+        if direction is None or not old:
+            continue
+        change = (value - old) / old
+        if change * direction < -threshold:
+            regressions.append({'metric': path, 'baseline': old, 'current': value,
+                                'change': round(change, 3)})
+    return regressions
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == 'case' and len(sys.argv) == 4 and sys.argv[2] in CASES:
+        print(json.dumps(run_case(sys.argv[2], int(sys.argv[3]))))
+
+    elif command == 'run' and len(sys.argv) <= 5:
+        output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(BENCHMARKS_DIR, 'results.json')
+        count = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_RECORDS
+        names = sys.argv[4].split(',') if len(sys.argv) > 4 else list(CASES)
+        unknown = [name for name in names if name not in CASES]
+        if unknown:
+            print(json.dumps({'error': f"Unknown cases: {', '.join(unknown)}"}))
+            sys.exit(1)
+        report = run_suite(count, names)
+        with open(output_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(json.dumps({'path': output_path, 'cases': list(report['cases'])}))
+
+    elif command == 'compare' and len(sys.argv) in (4, 5):
+        with open(sys.argv[2], 'r') as f:
+            baseline = json.load(f)
+        with open(sys.argv[3], 'r') as f:
+            current = json.load(f)
+        threshold = float(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_THRESHOLD
+        regressions = compare_runs(baseline, current, threshold)
+        print(json.dumps({'threshold': threshold, 'regressions': regressions}, indent=2))
+        sys.exit(1 if regressions else 0)
+
+    else:
+        print(json.dumps({'error': 'Incorrect arguments. Required: run [output_path] [records] [cases], '
+                                   'or compare baseline.json current.json [threshold]'}))
+        sys.exit(1)
@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from astro_calculator import calculate_astro
+from astro_record import AstroRecord, compute_astro_record, pack_records, unpack_records
+
+# Payload size and encode/decode cost of chart results on the worker bridge.
+#
+# Compares the calculate_astro dict as JSON (what the worker sends today)
+# with the AstroRecord compact JSON list and the struct-packed binary form.
+# "decode" ends with something the consumer can use: the dict for JSON, an
+# AstroRecord for the compact forms; "materialize" is the extra cost of
+# building the dict from a record at the edge. Every record is checked to
+# materialize to exactly the calculate_astro dict.
+#
+# Usage: python backend/benchmarks/wire_format.py [records] [repeats]
+
+
+def synthetic_records(count, seed=0):
+    rng = random.Random(seed)
+    return [(f'{rng.randint(1900, 2099)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+             f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}',
+             round(rng.uniform(-60, 65), 4), round(rng.uniform(-180, 180), 4))
+            for _ in range(count)]
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def report(count, size, encode_seconds, decode_seconds):
+    return {
+        'bytesPerRecord': round(size / count, 1),
+        'encodeUsPerRecord': round(encode_seconds / count * 1e6, 2),
+        'decodeUsPerRecord': round(decode_seconds / count * 1e6, 2)
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: records repeats'}))
+        sys.exit(1)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    records = [compute_astro_record(*birth) for birth in synthetic_records(count)]
+    mismatches = sum(record.to_astro_data() != calculate_astro(*birth)
+                     for record, birth in zip(records, synthetic_records(count)))
+    dicts = [record.to_astro_data() for record in records]
+
+    # Current bridge: one JSON line per result
+    encode, lines = best_of(repeats, lambda: [json.dumps(data) for data in dicts])
+    decode, _ = best_of(repeats, lambda: [json.loads(line) for line in lines])
+    results = {'json': report(count, sum(map(len, lines)), encode, decode)}
+
+    encode, lines = best_of(repeats, lambda: [json.dumps(record.compact(), separators=(',', ':'))
+                                              for record in records])
+    decode, _ = best_of(repeats, lambda: [AstroRecord.from_compact(json.loads(line)) for line in lines])
+    results['compactJson'] = report(count, sum(map(len, lines)), encode, decode)
+
+    encode, packed = best_of(repeats, lambda: pack_records(records))
+    decode, _ = best_of(repeats, lambda: list(unpack_records(packed)))
+    results['binary'] = report(count, len(packed), encode, decode)
+
+    materialize, _ = best_of(repeats, lambda: [record.to_astro_data() for record in records])
+    baseline = results['json']['bytesPerRecord']
+    for name in ('compactJson', 'binary'):
+        results[name]['sizeRatio'] = round(results[name]['bytesPerRecord'] / baseline, 3)
+
+    print(json.dumps({
+        'records': count,
+        'mismatches': mismatches,
+        'formats': results,
+        'materializeUsPerRecord': round(materialize / count * 1e6, 2)
+    }, indent=2))
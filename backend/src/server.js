@@ -1,6 +1,5 @@
 const express = require('express');
 const cors = require('cors');
-const { spawn } = require('child_process');
 const path = require('path');
 const fs = require('fs');
 const sqlite3 = require('sqlite3').verbose();
@@ -8,6 +7,7 @@ const axios = require('axios');
 const swaggerUi = require('swagger-ui-express');
 const morgan = require('morgan');
 const { logger, stream } = require('./utils/logger');
+const { PythonWorkerPool } = require('./utils/workerPool');
 
 // Load Swagger documentation
 const swaggerDocument = require('./swagger.json');
@@ -22,10 +22,12 @@ app.use(express.json());
 app.use(morgan('combined', { stream }));
 app.use('/api-docs', swaggerUi.serve, swaggerUi.setup(swaggerDocument));
 app.use('/charts', express.static(path.join(__dirname, '..', 'data', 'charts')));
+app.use('/bodygraphs', express.static(path.join(__dirname, '..', 'data', 'bodygraphs')));
 
 // Ensure required directories exist
 const dirs = [
   path.join(__dirname, '..', 'data', 'charts'),
+  path.join(__dirname, '..', 'data', 'bodygraphs'),
   path.join(__dirname, '..', 'logs')
 ];
 
@@ -128,38 +130,11 @@ const getCoordinates = (place) => {
   return { lat: 0, lng: 0 };
 };
 
-// Run Python script and get the result
-const runPythonScript = (scriptPath, args) => {
-  return new Promise((resolve, reject) => {
-    const pythonPath = process.env.PYTHON_PATH || 'python3';
-    const process = spawn(pythonPath, [scriptPath, ...args]);
-    
-    let output = '';
-    let errorOutput = '';
-    
-    process.stdout.on('data', (data) => {
-      output += data.toString();
-    });
-    
-    process.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-    });
-    
-    process.on('close', (code) => {
-      if (code !== 0) {
-        console.error(`Python script exited with code ${code}`);
-        console.error(`Error: ${errorOutput}`);
-        reject(new Error(`Script execution failed: ${errorOutput}`));
-      } else {
-        try {
-          resolve(JSON.parse(output));
-        } catch (error) {
-          reject(new Error(`Failed to parse script output: ${output}`));
-        }
-      }
-    });
-  });
-};
+// Pool of warm Python calculation workers (see utils/calc_worker.py)
+const calcPool = new PythonWorkerPool({
+  pythonPath: process.env.PYTHON_PATH || 'python3',
+  size: parseInt(process.env.PYTHON_WORKERS || '2', 10)
+});
 
 // Define resonance based on astrology and human design
 const determineResonance = (astroData, hdData) => {
@@ -473,6 +448,62 @@ app.get('/api/test', (req, res) => {
   res.json({ message: 'Server is running!' });
 });
 
+// Calculation stage timings and counters, for scraping; empty unless the
+// server runs with ASTRO_INSTRUMENTATION=1
+app.get('/metrics', async (req, res) => {
+  try {
+    const text = await calcPool.metrics();
+    res.type('text/plain; version=0.0.4').send(text);
+  } catch (error) {
+    console.error('Metrics error', error);
+    res.status(500).json({ message: `Server error: ${error.message}` });
+  }
+});
+
+// Birthplace autocomplete
+app.get('/api/cities/search', async (req, res) => {
+  try {
+    const query = (req.query.q || '').trim();
+    const k = Math.min(parseInt(req.query.k || '5', 10) || 5, 20);
+    if (!query) {
+      return res.json({ results: [] });
+    }
+    
+    const results = await calcPool.call('search_cities', { query, k });
+    res.json({ results });
+  } catch (error) {
+    console.error('City search error', error);
+    res.status(500).json({ message: `Server error: ${error.message}` });
+  }
+});
+
+// Stored charts are evicted when the store is full; render them again
+// from the user record when requested
+app.get('/charts/:filename', (req, res, next) => {
+  if (!/^[0-9a-f]{64}\.pdf$/.test(req.params.filename)) {
+    return next();
+  }
+  db.get(
+    'SELECT name, astro_data, hd_data FROM users WHERE chart_url = ? LIMIT 1',
+    [`/charts/${req.params.filename}`],
+    async (err, row) => {
+      if (err || !row) {
+        return next(err);
+      }
+      try {
+        const chartResult = await calcPool.call('store_chart', {
+          hd_data: JSON.parse(row.hd_data),
+          astro_data: JSON.parse(row.astro_data),
+          user_name: row.name
+        });
+        res.sendFile(path.join(__dirname, '..', 'data', 'charts', chartResult.filename));
+      } catch (error) {
+        next(error);
+      }
+    }
+  );
+});
+
 // Main user data endpoint
 app.post('/api/user', async (req, res) => {
   try {
@@ -492,33 +523,35 @@ app.post('/api/user', async (req, res) => {
     // Get coordinates for birthplace
     const { lat, lng } = getCoordinates(birthplace);
     
-    // Run Python scripts for calculations
-    // Calculate astrology data
-    const astroData = await runPythonScript(
-      path.join(__dirname, 'utils', 'astro_calculator.py'),
-      [birthday, birthtime, lat.toString(), lng.toString()]
-    );
-    
-    // Calculate human design data
-    const hdData = await runPythonScript(
-      path.join(__dirname, 'utils', 'human_design.py'),
-      [birthday, birthtime, lat.toString(), lng.toString()]
-    );
+    // Calculate astrology and human design data on the warm worker pool
+    const birthParams = {
+      birth_date: birthday,
+      birth_time: birthtime,
+      latitude: lat,
+      longitude: lng
+    };
+    const [astroData, hdData] = await Promise.all([
+      calcPool.call('astro', birthParams),
+      calcPool.call('human_design', birthParams)
+    ]);
     
     // Determine quantum resonance and archetype
     const resonance = determineResonance(astroData, hdData);
     const archetype = determineArchetype(astroData, hdData);
     
-    // Generate human design chart PDF
-    const chartFilename = `${name.replace(/\s+/g, '_')}_${Date.now()}.pdf`;
-    const chartPath = path.join(chartsDir, chartFilename);
-    
-    await runPythonScript(
-      path.join(__dirname, 'utils', 'chart_generator.py'),
-      [JSON.stringify(hdData), JSON.stringify(astroData), name, chartPath]
-    );
+    // Human design chart PDF, stored under a hash of its input; identical
+    // input reuses the stored file without rendering
+    const [chartResult, bodygraph] = await Promise.all([
+      calcPool.call('store_chart', {
+        hd_data: hdData,
+        astro_data: astroData,
+        user_name: name
+      }),
+      // Pre-drawn body graph thumbnail for this combination of centers
+      calcPool.call('bodygraph', { centers: hdData.centers })
+    ]);
     
-    const chartUrl = `/charts/${chartFilename}`;
+    const chartUrl = `/charts/${chartResult.filename}`;
     
     // Generate initial chatbot response
     const chatResponse = `Welcome to your cosmic guide! As a ${astroData.sunSign} ${hdData.type}, you have a unique cosmic signature. Your archetype is "${archetype}" and your resonance is aligned with ${resonance}. Ask me anything about your design or how it relates to your life.`;
@@ -560,6 +593,7 @@ app.post('/api/user', async (req, res) => {
           resonance,
           archetype,
           chartUrl: `http://localhost:${PORT}${chartUrl}`,
+          bodygraphUrl: `http://localhost:${PORT}/bodygraphs/${bodygraph.svg}`,
           chatResponse
         });
       }
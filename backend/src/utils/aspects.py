@@ -0,0 +1,136 @@
+import numpy as np
+
+# Vectorized aspect engine.
+#
+# Aspects are matched for every pair of bodies at once: the angular
+# separation matrix is computed by broadcasting, then compared against all
+# aspect angles and orbs in a single step. Works on one chart (a vector of
+# longitudes), a batch of charts (an (N, bodies) array), or two charts
+# against each other (synastry).
+
+# (name, exact angle, default orb) in degrees
+MAJOR_ASPECTS = (
+    ('Conjunction', 0, 10),
+    ('Sextile', 60, 6),
+    ('Square', 90, 8),
+    ('Trine', 120, 8),
+    ('Opposition', 180, 10)
+)
+
+MINOR_ASPECTS = (
+    ('Semi-sextile', 30, 2),
+    ('Semi-square', 45, 2),
+    ('Quintile', 72, 2),
+    ('Sesquiquadrate', 135, 2),
+    ('Biquintile', 144, 2),
+    ('Quincunx', 150, 3)
+)
+
+ALL_ASPECTS = MAJOR_ASPECTS + MINOR_ASPECTS
+
+# Charts processed per broadcast step, to bound temporary memory
+CHUNK_SIZE = 8192
+
+
+class AspectSet:
+    """Aspect names, exact angles and orbs as parallel arrays.
+
+    Args:
+        aspects: Sequence of (name, angle, orb) tuples
+        orbs (dict): Optional {name: orb} overrides
+    """
+
+    def __init__(self, aspects=MAJOR_ASPECTS, orbs=None):
+        orbs = orbs or {}
+        self.names = tuple(name for name, _, _ in aspects)
+        self.angles = np.array([angle for _, angle, _ in aspects], dtype=float)
+        self.orbs = np.array([orbs.get(name, orb) for name, _, orb in aspects], dtype=float)
+
+
+DEFAULT_ASPECT_SET = AspectSet()
+
+
+def angular_separation(longitudes_a, longitudes_b):
+    """Shortest arc between two longitude arrays, elementwise (broadcasts)."""
+    diff = np.abs(np.asarray(longitudes_a, dtype=float) - np.asarray(longitudes_b, dtype=float)) % 360
+    return np.minimum(diff, 360 - diff)
+
+
+def match_aspects(separation, aspect_set=DEFAULT_ASPECT_SET):
+    """Match separations against an aspect set.
+
+    Returns (aspect index, deviation) arrays shaped like separation. Index is
+    -1 where no aspect is within orb; deviation is separation minus the
+    exact angle of the matched aspect (NaN when unmatched). When orbs
+    overlap, the aspect closest to exact wins.
+    """
+    deviation = separation[..., None] - aspect_set.angles
+    distance = np.where(np.abs(deviation) <= aspect_set.orbs, np.abs(deviation), np.inf)
+    index = distance.argmin(axis=-1)[..., None]
+    matched = np.isfinite(np.take_along_axis(distance, index, axis=-1)[..., 0])
+    exact = np.take_along_axis(deviation, index, axis=-1)[..., 0]
+    return np.where(matched, index[..., 0], -1).astype(np.int8), np.where(matched, exact, np.nan)
+
+
+def _collect(longitudes_a, longitudes_b, first, second, aspect_set):
+    # Shared driver: gather the (first, second) body pairs of every chart,
+    # match them in chunks, and flatten the hits
+    a = np.atleast_2d(np.asarray(longitudes_a, dtype=float))
+    b = np.atleast_2d(np.asarray(longitudes_b, dtype=float))
+    charts, aspects, deviations, pairs = [], [], [], []
+    for start in range(0, a.shape[0], CHUNK_SIZE):
+        separation = angular_separation(a[start:start + CHUNK_SIZE, first],
+                                        b[start:start + CHUNK_SIZE, second])
+        index, exact = match_aspects(separation, aspect_set)
+        chart, pair = np.nonzero(index >= 0)
+        charts.append(chart + start)
+        pairs.append(pair)
+        aspects.append(index[chart, pair])
+        deviations.append(exact[chart, pair])
+    if not pairs:
+        # No charts: no chunks to concatenate
+        empty = np.empty(0, dtype=np.intp)
+        charts, pairs, aspects, deviations = [empty], [empty], [np.empty(0, dtype=np.int8)], [np.empty(0)]
+    pair = np.concatenate(pairs)
+    return {
+        'chart': np.concatenate(charts),
+        'first': first[pair],
+        'second': second[pair],
+        'aspect': np.concatenate(aspects),
+        'deviation': np.concatenate(deviations),
+        'names': aspect_set.names
+    }
+
+
+def find_aspects(longitudes, aspect_set=DEFAULT_ASPECT_SET):
+    """Aspects between distinct bodies of one chart or a batch of charts.
+
+    longitudes is (bodies,) or (N, bodies). Returns a dict of flat arrays:
+    'chart', 'first' and 'second' (body indices, first < second), 'aspect'
+    (index into 'names') and 'deviation' from exact. Hits are ordered by
+    chart, then pair, like the nested pair loop in calculate_astro.
+    """
+    first, second = np.triu_indices(np.shape(longitudes)[-1], k=1)
+    return _collect(longitudes, longitudes, first, second, aspect_set)
+
+
+def find_synastry_aspects(longitudes_a, longitudes_b, aspect_set=DEFAULT_ASPECT_SET):
+    """Aspects from every body of chart a to every body of chart b.
+
+    Inputs are (n,) and (m,), or (N, n) and (N, m) for N chart pairs.
+    'first' indexes bodies of a and 'second' bodies of b.
+    """
+    first, second = np.indices((np.shape(longitudes_a)[-1], np.shape(longitudes_b)[-1]))
+    return _collect(longitudes_a, longitudes_b, first.ravel(), second.ravel(), aspect_set)
+
+
+def aspect_list(longitudes, body_names, aspect_set=DEFAULT_ASPECT_SET):
+    """Aspects of one chart in the JSON format returned by calculate_astro."""
+    hits = find_aspects(longitudes, aspect_set)
+    return [
+        {
+            'bodies': [body_names[i], body_names[j]],
+            'aspect': aspect_set.names[k]
+        }
+        for i, j, k in zip(hits['first'].tolist(), hits['second'].tolist(), hits['aspect'].tolist())
+    ]
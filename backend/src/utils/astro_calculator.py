@@ -1,9 +1,32 @@
 import sys
 import json
-import ephem
 import math
+from collections import namedtuple
 from datetime import datetime
-from human_design import calculate_human_design
+from functools import lru_cache
+from instrumentation import stage, count
+
+# ephem, numpy and the table modules built on them are imported inside the
+# functions that use them, so argument errors and light importers (such as
+# modules that only need BODY_NAMES or parse_birth_datetime) do not pay for
+# loading them.
+
+# Bodies in the order used by every columnar (batch) result
+BODY_NAMES = ('Sun', 'Moon', 'Mercury', 'Venus', 'Mars',
+              'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto')
+
+ZODIAC_SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+                'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+
+def warm_up():
+    """Import the heavy dependencies now; for long-lived worker processes."""
+    import ephem
+    import numpy
+    import aspects
+    import human_design
+    from ephemeris_table import get_default_table
+    from lunation_table import get_default_table as get_lunation_table
+    get_lunation_table()
 
 def calculate_aspects(body1_lon, body2_lon):
     # Calculate the angular distance between two bodies
@@ -37,133 +60,348 @@ def calculate_house_cusps(observer):
     return house_cusps
 
 def get_zodiac_and_degrees(degrees):
-    zodiac_signs = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo', 
-                    'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
-    
     # Normalize degrees to 0-360 range
     degrees = degrees % 360
     sign_index = int(degrees / 30)
     degrees_in_sign = degrees % 30
     
     return {
-        'sign': zodiac_signs[sign_index],
+        'sign': ZODIAC_SIGNS[sign_index],
         'degrees': round(degrees_in_sign, 2)
     }
 
-def calculate_astro(birth_date_str, birth_time_str, latitude, longitude):
+def parse_birth_datetime(birth_date_str, birth_time_str):
+    # Fast path for the "YYYY-MM-DD" / "HH:MM" strings the API sends;
+    # anything else goes through strptime so errors read the same as before.
     try:
-        # Parse date and time
-        birth_datetime = datetime.strptime(f"{birth_date_str} {birth_time_str}", "%Y-%m-%d %H:%M")
-        
-        # Set up observer
-        observer = ephem.Observer()
-        observer.lon = str(longitude)
-        observer.lat = str(latitude)
-        observer.date = birth_datetime.strftime("%Y/%m/%d %H:%M")
-        observer.pressure = 0  # Ignore atmospheric refraction
-        
-        # Calculate planets
-        bodies = {
-            'Sun': ephem.Sun(),
-            'Moon': ephem.Moon(),
-            'Mercury': ephem.Mercury(),
-            'Venus': ephem.Venus(),
-            'Mars': ephem.Mars(),
-            'Jupiter': ephem.Jupiter(),
-            'Saturn': ephem.Saturn(),
-            'Uranus': ephem.Uranus(),
-            'Neptune': ephem.Neptune(),
-            'Pluto': ephem.Pluto()
-        }
-        
-        # Calculate positions and store longitudes for aspect calculation
-        positions = {}
-        longitudes = {}
-        
-        for name, body in bodies.items():
-            body.compute(observer)
-            
-            # Convert ecliptic longitude to degrees
-            lon_deg = body.hlong * 180 / ephem.pi
-            longitudes[name] = lon_deg
-            
-            # Get zodiacal position
-            positions[name] = get_zodiac_and_degrees(lon_deg)
-        
-        # Calculate aspects between planets
-        aspects = []
-        for name1 in bodies:
-            for name2 in list(bodies.keys())[list(bodies.keys()).index(name1) + 1:]:
-                aspect = calculate_aspects(longitudes[name1], longitudes[name2])
-                if aspect:
-                    aspects.append({
-                        'bodies': [name1, name2],
-                        'aspect': aspect
-                    })
-        
-        # Calculate house cusps
-        house_cusps = calculate_house_cusps(observer)
-        
-        # Calculate precise ascendant (1st house cusp)
-        ascendant_deg = house_cusps[0]
-        ascendant = get_zodiac_and_degrees(ascendant_deg)
-        
-        # Calculate Midheaven (10th house cusp)
-        mc_deg = house_cusps[9]
-        midheaven = get_zodiac_and_degrees(mc_deg)
-        
-        # Calculate Human Design data
+        year, month, day = birth_date_str.split('-')
+        hour, minute = birth_time_str.split(':')
+        if len(year) == 4 and len(month) == 2 and len(day) == 2 and len(hour) <= 2 and len(minute) == 2:
+            return datetime(int(year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        pass
+    return datetime.strptime(f"{birth_date_str} {birth_time_str}", "%Y-%m-%d %H:%M")
+
+def create_bodies():
+    import ephem
+    return [getattr(ephem, name)() for name in BODY_NAMES]
+
+def setup_observer(observer, birth_datetime, latitude=0, longitude=0):
+    import ephem
+    observer.lon = str(longitude)
+    observer.lat = str(latitude)
+    observer.date = ephem.Date((birth_datetime.year, birth_datetime.month, birth_datetime.day,
+                                birth_datetime.hour, birth_datetime.minute, 0))
+    observer.pressure = 0  # Ignore atmospheric refraction
+    return observer
+
+def compute_longitudes(observer, bodies, table=None):
+    # Heliocentric ecliptic longitude of each body, in degrees. A precomputed
+    # ephemeris table answers by interpolation when it covers the date.
+    if table is not None and table.covers(observer.date):
+        count('ephemeris_table.lookups')
+        return table.longitudes(observer.date)
+    import ephem
+    count('ephem.body_compute', len(bodies))
+    longitudes = []
+    for body in bodies:
+        body.compute(observer)
+        longitudes.append(body.hlong * 180 / ephem.pi)
+    return longitudes
+
+def compute_moon_phase(observer):
+    # Lunar phase, from the precomputed lunation table when it covers the date
+    import ephem
+    from lunation_table import get_default_table as get_lunation_table, moon_phase_name
+    lunations = get_lunation_table()
+    if lunations.covers(observer.date):
+        count('lunation_table.lookups')
+        return lunations.moon_phase(observer.date)
+    
+    count('ephem.lunation_search')
+    moon = ephem.Moon(observer)
+    moon_phase = moon.phase
+    next_full = ephem.next_full_moon(observer.date)
+    next_new = ephem.next_new_moon(observer.date)
+    
+    return {
+        'percentage': round(moon_phase, 2),
+        'phase': moon_phase_name(moon_phase),
+        'nextFull': next_full.datetime().strftime("%Y-%m-%d %H:%M"),
+        'nextNew': next_new.datetime().strftime("%Y-%m-%d %H:%M")
+    }
+
+# Everything about a chart that depends only on the birth instant
+InstantData = namedtuple('InstantData', ['date', 'longitudes', 'sidereal_time', 'moon_phase'])
+
+@lru_cache(maxsize=4096)
+def compute_instant(birth_date_str, birth_time_str, use_ephemeris_table=False):
+    """Time-only stage: planet longitudes, Greenwich sidereal time and moon phase.
+
+    Planet positions are the same for every birthplace, so this is cached per
+    birth instant and shared by every location computed for it. Results are
+    immutable apart from moon_phase, which callers must copy before changing.
+    """
+    import ephem
+    from ephemeris_table import get_default_table
+    count('astro.instant_misses')
+    with stage('astro.instant.parse'):
+        birth_datetime = parse_birth_datetime(birth_date_str, birth_time_str)
+    with stage('astro.instant.observer'):
+        observer = setup_observer(ephem.Observer(), birth_datetime)
+    table = get_default_table() if use_ephemeris_table else None
+    with stage('astro.instant.bodies'):
+        longitudes = tuple(compute_longitudes(observer, create_bodies(), table))
+    with stage('astro.instant.lunation'):
+        moon_phase = compute_moon_phase(observer)
+    return InstantData(
+        date=float(observer.date),
+        longitudes=longitudes,
+        sidereal_time=float(observer.sidereal_time()),
+        moon_phase=moon_phase
+    )
+
+def compute_house_cusps(sidereal_time, longitudes):
+    """Location stage: equal house cusps for many birthplaces at once.
+
+    Local sidereal time is Greenwich sidereal time (radians) plus the east
+    longitude, so one ephemeris evaluation serves every location. Both
+    arguments broadcast; the result has shape (..., 12) in degrees.
+    """
+    import numpy as np
+    st_deg = (np.degrees(sidereal_time) + np.asarray(longitudes, dtype=float)) % 360
+    ascendant_deg = (st_deg - 90) % 360
+    return (ascendant_deg[..., None] + 30 * np.arange(12)) % 360
+
+def build_astro_data(birth_date_str, birth_time_str, latitude, longitude,
+                     body_longitudes, house_cusps, moon_phase):
+    from aspects import aspect_list
+    from human_design import calculate_human_design
+    longitudes = dict(zip(BODY_NAMES, body_longitudes))
+    house_cusps = [float(cusp) for cusp in house_cusps]
+    
+    # Get zodiacal positions
+    positions = {name: get_zodiac_and_degrees(lon_deg) for name, lon_deg in longitudes.items()}
+    
+    # Calculate aspects between planets
+    with stage('astro.aspects'):
+        aspects = aspect_list(body_longitudes, BODY_NAMES)
+    
+    # Calculate precise ascendant (1st house cusp)
+    ascendant_deg = house_cusps[0]
+    ascendant = get_zodiac_and_degrees(ascendant_deg)
+    
+    # Calculate Midheaven (10th house cusp)
+    mc_deg = house_cusps[9]
+    midheaven = get_zodiac_and_degrees(mc_deg)
+    
+    # Calculate Human Design data
+    with stage('astro.human_design'):
         hd_data = calculate_human_design(birth_date_str, birth_time_str, latitude, longitude)
+    
+    # Prepare the response data
+    astro_data = {
+        'sunSign': positions['Sun']['sign'],
+        'moonSign': positions['Moon']['sign'],
+        'ascendant': ascendant['sign'],
+        'midheaven': midheaven['sign'],
+        'planets': {
+            name: {
+                'sign': pos['sign'],
+                'degrees': pos['degrees'],
+                'longitude': round(longitudes[name], 2)
+            } for name, pos in positions.items()
+        },
+        'aspects': aspects,
+        'houses': {
+            f"house_{i+1}": get_zodiac_and_degrees(cusp)
+            for i, cusp in enumerate(house_cusps)
+        },
+        'humanDesign': hd_data,
+        'moonPhase': dict(moon_phase)
+    }
+    
+    return astro_data
+
+def calculate_astro(birth_date_str, birth_time_str, latitude, longitude, use_ephemeris_table=False):
+    count('astro.calls')
+    try:
+        # Time-only stage (cached per birth instant)
+        with stage('astro.instant'):
+            instant = compute_instant(birth_date_str, birth_time_str, use_ephemeris_table)
         
-        # Prepare the response data
-        astro_data = {
-            'sunSign': positions['Sun']['sign'],
-            'moonSign': positions['Moon']['sign'],
-            'ascendant': ascendant['sign'],
-            'midheaven': midheaven['sign'],
-            'planets': {
-                name: {
-                    'sign': pos['sign'],
-                    'degrees': pos['degrees'],
-                    'longitude': round(longitudes[name], 2)
-                } for name, pos in positions.items()
-            },
-            'aspects': aspects,
-            'houses': {
-                f"house_{i+1}": get_zodiac_and_degrees(cusp)
-                for i, cusp in enumerate(house_cusps)
-            },
-            'humanDesign': hd_data
-        }
-        
-        # Add lunar phase
-        moon = ephem.Moon(observer)
-        moon_phase = moon.phase
-        next_full = ephem.next_full_moon(observer.date)
-        next_new = ephem.next_new_moon(observer.date)
-        
-        astro_data['moonPhase'] = {
-            'percentage': round(moon_phase, 2),
-            'phase': 'New' if moon_phase < 25 else
-                    'Waxing Crescent' if moon_phase < 50 else
-                    'First Quarter' if moon_phase < 75 else
-                    'Waxing Gibbous' if moon_phase < 100 else
-                    'Full' if moon_phase < 125 else
-                    'Waning Gibbous' if moon_phase < 150 else
-                    'Last Quarter' if moon_phase < 175 else
-                    'Waning Crescent',
-            'nextFull': next_full.datetime().strftime("%Y-%m-%d %H:%M"),
-            'nextNew': next_new.datetime().strftime("%Y-%m-%d %H:%M")
-        }
+        # Location stage
+        with stage('astro.house_cusps'):
+            house_cusps = compute_house_cusps(instant.sidereal_time, float(longitude))
         
-        return astro_data
+        return build_astro_data(birth_date_str, birth_time_str, latitude, longitude,
+                                instant.longitudes, house_cusps, instant.moon_phase)
         
     except Exception as e:
         return {'error': str(e), 'sunSign': 'Unknown'}
 
+def calculate_astro_locations(birth_date_str, birth_time_str, latitudes, longitudes,
+                              materialize=False, use_ephemeris_table=False):
+    """One birth instant evaluated at many birthplaces.
+
+    The ephemeris runs once; house cusps, ascendant and midheaven are
+    vectorized over the coordinates. Returns 'longitudes' (10,) for the
+    planets, 'houses' (M, 12), 'ascendant' and 'midheaven' (M,) in degrees,
+    and, with materialize, the calculate_astro dict for every location.
+    """
+    import numpy as np
+    try:
+        instant = compute_instant(birth_date_str, birth_time_str, use_ephemeris_table)
+    except Exception as e:
+        return {'error': str(e)}
+    
+    house_cusps = compute_house_cusps(instant.sidereal_time, longitudes)
+    result = {
+        'bodies': BODY_NAMES,
+        'longitudes': np.array(instant.longitudes),
+        'houses': house_cusps,
+        'ascendant': house_cusps[:, 0],
+        'midheaven': house_cusps[:, 9],
+        'moonPhase': dict(instant.moon_phase)
+    }
+    if materialize:
+        result['charts'] = [
+            build_astro_data(birth_date_str, birth_time_str, latitude, longitude,
+                             instant.longitudes, cusps, instant.moon_phase)
+            for latitude, longitude, cusps in zip(latitudes, longitudes, house_cusps)
+        ]
+    return result
+
+def _record_columns(records):
+    # Accept either a mapping of columns or a sequence of
+    # (date, time, latitude, longitude) rows
+    if isinstance(records, dict):
+        return (records['dates'], records['times'],
+                records['latitudes'], records['longitudes'])
+    if len(records) == 0:
+        return [], [], [], []
+    return tuple(zip(*records))
+
+def calculate_astro_batch(records, materialize=False, use_ephemeris_table=False):
+    """Calculate many charts at once, returning columnar results.
+
+    records is either a dict with 'dates', 'times', 'latitudes' and
+    'longitudes' arrays, or a sequence of (date, time, lat, lng) rows.
+    One observer and one set of body objects are reused for every record;
+    house cusps for all locations are computed in one vectorized pass.
+
+    Returns a dict with 'bodies' (the column order), 'longitudes' and
+    'degrees' as float arrays of shape (N, 10), 'signs' as an int8 array of
+    indices into ZODIAC_SIGNS, 'houses' of shape (N, 12), 'moonPhase'
+    (percentage illuminated) with 'nextFull' / 'nextNew' as ephem dates from
+    the lunation table, 'aspects' as flat arrays from aspects.find_aspects,
+    and a per-record 'errors' list. Rows that failed are NaN (signs -1). When materialize is
+    True, 'charts' also holds the calculate_astro dict for every record.
+    use_ephemeris_table interpolates longitudes from the precomputed table
+    (see ephemeris_table.py) instead of calling ephem.
+    """
+    import ephem
+    import numpy as np
+    from ephemeris_table import get_default_table
+    from aspects import find_aspects
+    from lunation_table import get_default_table as get_lunation_table
+    dates, times, latitudes, longitudes = _record_columns(records)
+    n_records = len(dates)
+    
+    body_longitudes = np.full((n_records, len(BODY_NAMES)), np.nan)
+    sidereal_times = np.full(n_records, np.nan)
+    locations = np.full(n_records, np.nan)
+    instants = np.full(n_records, np.nan)
+    errors = [None] * n_records
+    
+    # The observer stays at Greenwich: only the time-dependent stage runs per
+    # record, and house cusps are placed for every location afterwards
+    observer = ephem.Observer()
+    bodies = create_bodies()
+    table = get_default_table() if use_ephemeris_table else None
+    
+    # Without materialization, table lookups are deferred and done in one
+    # vectorized pass over every covered instant
+    deferred = table is not None and not materialize
+    deferred_rows = []
+    deferred_dates = []
+    
+    for i in range(n_records):
+        try:
+            birth_datetime = parse_birth_datetime(dates[i], times[i])
+            setup_observer(observer, birth_datetime)
+            locations[i] = float(longitudes[i])
+            sidereal_times[i] = observer.sidereal_time()
+            instants[i] = observer.date
+            if deferred and table.covers(observer.date):
+                deferred_rows.append(i)
+                deferred_dates.append(observer.date)
+                continue
+            body_longitudes[i] = compute_longitudes(observer, bodies, table)
+        except Exception as e:
+            errors[i] = str(e)
+    
+    if deferred_rows:
+        body_longitudes[deferred_rows] = table.longitudes_batch(deferred_dates)
+    
+    # Location stage for every record at once
+    house_cusps = compute_house_cusps(sidereal_times, locations)
+    
+    # Moon phases for every instant the lunation table covers
+    lunations = get_lunation_table()
+    moon_phase = np.full(n_records, np.nan)
+    next_full = np.full(n_records, np.nan)
+    next_new = np.full(n_records, np.nan)
+    covered = (instants >= lunations.start) & (instants < lunations.end)
+    if covered.any():
+        moon_phase[covered], next_full[covered], next_new[covered] = \
+            lunations.lookup_batch(instants[covered])
+    
+    # Normalize to 0-360 and split into sign index and degrees within sign
+    normalized = body_longitudes % 360
+    signs = np.where(np.isnan(normalized), -1, normalized // 30).astype(np.int8)
+    
+    result = {
+        'bodies': BODY_NAMES,
+        'longitudes': body_longitudes,
+        'signs': signs,
+        'degrees': normalized % 30,
+        'houses': house_cusps,
+        'moonPhase': moon_phase,
+        'nextFull': next_full,
+        'nextNew': next_new,
+        'aspects': find_aspects(body_longitudes),
+        'errors': errors
+    }
+    if materialize:
+        charts = []
+        for i in range(n_records):
+            if errors[i] is not None:
+                charts.append({'error': errors[i], 'sunSign': 'Unknown'})
+                continue
+            observer.date = instants[i]
+            charts.append(build_astro_data(dates[i], times[i], latitudes[i], longitudes[i],
+                                           body_longitudes[i].tolist(), house_cusps[i],
+                                           compute_moon_phase(observer)))
+        result['charts'] = charts
+    return result
+
 if __name__ == "__main__":
+    # Bulk mode: NDJSON records on stdin (or a file), one result line each
+    if len(sys.argv) > 1 and sys.argv[1] == '--stream':
+        from stream_cli import stream_main
+        try:
+            stream_main('astro_calculator', 'calculate_astro', sys.argv[2:])
+        except (ValueError, IndexError) as e:
+            print(json.dumps({'error': f'Incorrect arguments. Usage: --stream [input_path] [--workers N] ({str(e)})'}))
+            sys.exit(1)
+        except OSError as e:
+            print(json.dumps({'error': f'Cannot read input: {str(e)}'}))
+            sys.exit(1)
+        sys.exit(0)
+    
     if len(sys.argv) != 5:
-        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time latitude longitude'}))
+        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time latitude longitude, or --stream [input_path] [--workers N]'}))
         sys.exit(1)
     
     birth_date = sys.argv[1]
@@ -0,0 +1,274 @@
+import sys
+import json
+import struct
+from array import array
+from datetime import datetime, timedelta
+from astro_calculator import BODY_NAMES, ZODIAC_SIGNS, get_zodiac_and_degrees, parse_birth_datetime
+from hd_data import CENTER_DESCRIPTIONS
+
+# Compact chart results and their wire formats.
+#
+# calculate_astro returns nested dicts whose keys and sign names repeat in
+# every result. An AstroRecord holds the same chart as numbers: longitudes
+# and house cusps as float arrays, signs as small ints, aspects as
+# (body, body, aspect) index triples, and the human design fields. The
+# human-readable dict is only built by to_astro_data(), at the edge where it
+# is shown or rendered, and is identical to what calculate_astro returns.
+#
+# Two encodings:
+#   compact()  a short JSON-able list; from_compact() reverses it
+#   pack()     struct-packed little-endian bytes; unpack() reverses it.
+#              pack_records()/unpack_records() frame many records with a
+#              4-byte length prefix each.
+#
+# Longitudes and cusps are carried at full double precision, so
+# to_astro_data() rounds exactly as calculate_astro does.
+
+# Bump when the compact or packed layout changes
+FORMAT_VERSION = 1
+
+MAGIC = b'AR'
+
+# Center names in index order for the packed format
+CENTER_NAMES = tuple(CENTER_DESCRIPTIONS)
+
+# magic, version, 10 longitudes, 12 cusps, moon phase %, next full and next
+# new moon (minutes since EPOCH), aspect count. Then the aspect triples;
+# moon phase name, type, authority, profile and definition as length-prefixed
+# UTF-8; and the gates and center indexes, each preceded by their count.
+_HEADER = struct.Struct(f'<2sB{len(BODY_NAMES)}d12ddiiB')
+
+EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+
+HOUSE_KEYS = tuple(f"house_{i+1}" for i in range(12))
+
+
+def _minutes(text):
+    # "YYYY-MM-DD HH:MM" -> minutes since EPOCH
+    date, clock = text.split(' ')
+    return (parse_birth_datetime(date, clock) - EPOCH) // _MINUTE
+
+
+def _format_minutes(minutes):
+    moment = EPOCH + timedelta(minutes=minutes)
+    return (f"{moment.year:04d}-{moment.month:02d}-{moment.day:02d} "
+            f"{moment.hour:02d}:{moment.minute:02d}")
+
+
+class AstroRecord:
+    """One chart, as numbers.
+
+    Args:
+        longitudes (Sequence[float]): Body longitudes in BODY_NAMES order
+        cusps (Sequence[float]): The 12 house cusps, in degrees
+        moon_phase (dict): 'percentage', 'phase', 'nextFull' and 'nextNew'
+        aspects (Sequence[int]): Flat (first, second, aspect) index triples;
+            aspect indexes the names of the default aspect set
+        human_design (dict): calculate_human_design result
+    """
+
+    __slots__ = ('longitudes', 'signs', 'cusps', 'moon_percentage', 'phase', 'next_full', 'next_new',
+                 'aspects', 'hd_type', 'authority', 'profile', 'definition', 'gates', 'centers')
+
+    def __init__(self, longitudes, cusps, moon_phase, aspects, human_design):
+        self.longitudes = array('d', longitudes)
+        self.signs = bytes(int(lon % 360 / 30) for lon in self.longitudes)
+        self.cusps = array('d', cusps)
+        self.moon_percentage = moon_phase['percentage']
+        self.phase = moon_phase['phase']
+        self.next_full = moon_phase['nextFull']
+        self.next_new = moon_phase['nextNew']
+        self.aspects = bytes(aspects)
+        self.hd_type = human_design['type']
+        self.authority = human_design['authority']
+        self.profile = human_design['profile']
+        self.definition = human_design['definition']
+        self.gates = bytes(human_design['gates'])
+        self.centers = tuple(human_design['centers'])
+
+    def __eq__(self, other):
+        if not isinstance(other, AstroRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def moon_phase(self):
+        return {
+            'percentage': self.moon_percentage,
+            'phase': self.phase,
+            'nextFull': self.next_full,
+            'nextNew': self.next_new
+        }
+
+    def human_design(self):
+        return {
+            'type': self.hd_type,
+            'authority': self.authority,
+            'profile': self.profile,
+            'definition': self.definition,
+            'gates': list(self.gates),
+            'centers': list(self.centers)
+        }
+
+    def to_astro_data(self):
+        """The calculate_astro dict for this chart."""
+        from aspects import DEFAULT_ASPECT_SET
+        names = DEFAULT_ASPECT_SET.names
+        aspects = self.aspects
+        return {
+            'sunSign': ZODIAC_SIGNS[self.signs[0]],
+            'moonSign': ZODIAC_SIGNS[self.signs[1]],
+            'ascendant': get_zodiac_and_degrees(self.cusps[0])['sign'],
+            'midheaven': get_zodiac_and_degrees(self.cusps[9])['sign'],
+            'planets': {
+                name: {
+                    'sign': ZODIAC_SIGNS[sign],
+                    'degrees': round(lon % 360 % 30, 2),
+                    'longitude': round(lon, 2)
+                } for name, lon, sign in zip(BODY_NAMES, self.longitudes, self.signs)
+            },
+            'aspects': [
+                {
+                    'bodies': [BODY_NAMES[aspects[i]], BODY_NAMES[aspects[i + 1]]],
+                    'aspect': names[aspects[i + 2]]
+                } for i in range(0, len(aspects), 3)
+            ],
+            'houses': {key: get_zodiac_and_degrees(cusp) for key, cusp in zip(HOUSE_KEYS, self.cusps)},
+            'humanDesign': self.human_design(),
+            'moonPhase': self.moon_phase()
+        }
+
+    def compact(self):
+        """JSON-able list form; see from_compact()."""
+        return [
+            FORMAT_VERSION,
+            self.longitudes.tolist(),
+            self.cusps.tolist(),
+            [self.moon_percentage, self.phase, self.next_full, self.next_new],
+            list(self.aspects),
+            [self.hd_type, self.authority, self.profile, self.definition,
+             list(self.gates), list(self.centers)]
+        ]
+
+    @classmethod
+    def from_compact(cls, data):
+        version, longitudes, cusps, moon, aspects, hd = data
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported compact record version: {version}')
+        percentage, phase, next_full, next_new = moon
+        hd_type, authority, profile, definition, gates, centers = hd
+        return cls(longitudes, cusps,
+                   {'percentage': percentage, 'phase': phase, 'nextFull': next_full, 'nextNew': next_new},
+                   aspects,
+                   {'type': hd_type, 'authority': authority, 'profile': profile,
+                    'definition': definition, 'gates': gates, 'centers': centers})
+
+    def pack(self):
+        """Struct-packed bytes; see unpack()."""
+        parts = [
+            _HEADER.pack(MAGIC, FORMAT_VERSION, *self.longitudes, *self.cusps, self.moon_percentage,
+                         _minutes(self.next_full), _minutes(self.next_new), len(self.aspects) // 3),
+            self.aspects
+        ]
+        for text in (self.phase, self.hd_type, self.authority, self.profile, self.definition):
+            encoded = text.encode('utf-8')
+            parts.append(bytes((len(encoded),)))
+            parts.append(encoded)
+        parts.append(bytes((len(self.gates),)))
+        parts.append(self.gates)
+        parts.append(bytes((len(self.centers),)))
+        parts.append(bytes(CENTER_NAMES.index(center) for center in self.centers))
+        return b''.join(parts)
+
+    @classmethod
+    def unpack(cls, data):
+        values = _HEADER.unpack_from(data)
+        magic, version = values[:2]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('Not a packed chart record of this version')
+        bodies = len(BODY_NAMES)
+        longitudes = values[2:2 + bodies]
+        cusps = values[2 + bodies:14 + bodies]
+        percentage, next_full, next_new, aspect_count = values[14 + bodies:]
+
+        offset = _HEADER.size
+        aspects = data[offset:offset + 3 * aspect_count]
+        offset += 3 * aspect_count
+        texts = []
+        for _ in range(5):
+            length = data[offset]
+            texts.append(bytes(data[offset + 1:offset + 1 + length]).decode('utf-8'))
+            offset += 1 + length
+        gates = data[offset + 1:offset + 1 + data[offset]]
+        offset += 1 + data[offset]
+        centers = [CENTER_NAMES[index] for index in data[offset + 1:offset + 1 + data[offset]]]
+
+        phase, hd_type, authority, profile, definition = texts
+        return cls(longitudes, cusps,
+                   {'percentage': percentage, 'phase': phase, 'nextFull': _format_minutes(next_full),
+                    'nextNew': _format_minutes(next_new)},
+                   aspects,
+                   {'type': hd_type, 'authority': authority, 'profile': profile,
+                    'definition': definition, 'gates': gates, 'centers': centers})
+
+
+def compute_astro_record(birth_date_str, birth_time_str, latitude, longitude, use_ephemeris_table=False):
+    """calculate_astro, returning an AstroRecord instead of the nested dict.
+
+    Errors are returned as a dict with 'error', like calculate_astro.
+    """
+    from astro_calculator import compute_instant, compute_house_cusps
+    from aspects import find_aspects
+    from human_design import calculate_human_design
+    try:
+        instant = compute_instant(birth_date_str, birth_time_str, use_ephemeris_table)
+        house_cusps = compute_house_cusps(instant.sidereal_time, float(longitude))
+        hits = find_aspects(instant.longitudes)
+        aspects = [value for triple in zip(hits['first'].tolist(), hits['second'].tolist(),
+                                           hits['aspect'].tolist())
+                   for value in triple]
+        hd_data = calculate_human_design(birth_date_str, birth_time_str, latitude, longitude)
+        if 'error' in hd_data:
+            raise ValueError(hd_data['error'])
+        return AstroRecord(instant.longitudes, house_cusps.tolist(), instant.moon_phase, aspects, hd_data)
+    except Exception as e:
+        return {'error': str(e), 'sunSign': 'Unknown'}
+
+
+def compact_astro(birth_date_str, birth_time_str, latitude, longitude):
+    """compute_astro_record as its compact list (or the error dict)."""
+    record = compute_astro_record(birth_date_str, birth_time_str, latitude, longitude)
+    return record if isinstance(record, dict) else record.compact()
+
+
+_LENGTH = struct.Struct('<I')
+
+
+def pack_records(records):
+    """Packed records, each preceded by its 4-byte length."""
+    parts = []
+    for record in records:
+        packed = record.pack()
+        parts.append(_LENGTH.pack(len(packed)))
+        parts.append(packed)
+    return b''.join(parts)
+
+
+def unpack_records(data):
+    """Yield the AstroRecords of a pack_records() buffer."""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        yield AstroRecord.unpack(view[offset:offset + length])
+        offset += length
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5:
+        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time latitude longitude'}))
+        sys.exit(1)
+
+    print(json.dumps(compact_astro(sys.argv[1], sys.argv[2], float(sys.argv[3]), float(sys.argv[4])),
+                     separators=(',', ':')))
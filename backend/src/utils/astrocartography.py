@@ -0,0 +1,133 @@
+import sys
+import json
+import ephem
+import numpy as np
+from astro_calculator import BODY_NAMES, compute_instant
+
+# Astrocartography (relocation) lines.
+#
+# For one birth instant, each body is on the MC wherever the local sidereal
+# time equals its right ascension, and on the IC twelve hours later; both are
+# meridians. It is on the ascendant or descendant where its hour angle equals
+# the horizon crossing angle H0, with cos H0 = -tan(latitude) * tan(dec).
+# The lines are solved directly for every latitude of the grid and every body
+# at once, so no per-point observer is needed; local sidereal time is
+# Greenwich sidereal time plus east longitude, exactly as in the location
+# stage of astro_calculator.
+
+ANGLES = ('ASC', 'DSC', 'MC', 'IC')
+
+# Default latitude step in degrees
+DEFAULT_RESOLUTION = 0.5
+
+# Lines are drawn between these latitudes; the horizon lines diverge at the poles
+MAX_LATITUDE = 89.5
+
+
+def body_equatorial(date, bodies=BODY_NAMES):
+    """Apparent geocentric right ascension and declination (radians) of each body."""
+    coordinates = []
+    for name in bodies:
+        body = getattr(ephem, name)()
+        body.compute(date)
+        coordinates.append((float(body.ra), float(body.dec)))
+    ra, dec = np.array(coordinates).T
+    return ra, dec
+
+
+def _wrap_longitude(degrees):
+    # Longitude in -180..180
+    return (degrees + 180) % 360 - 180
+
+
+def angle_longitudes(sidereal_time, ra, dec, latitudes):
+    """Longitudes where each body is on each angle.
+
+    Args:
+        sidereal_time (float): Greenwich sidereal time in radians
+        ra, dec: (bodies,) apparent right ascension and declination in radians
+        latitudes: (M,) latitudes in degrees
+
+    Returns:
+        Dict of angle name -> longitudes in degrees. 'MC' and 'IC' have shape
+        (bodies,); 'ASC' and 'DSC' have shape (M, bodies) and are NaN where
+        the body never rises or sets (circumpolar) at that latitude.
+    """
+    mc = np.degrees(ra - sidereal_time)
+    x = -np.tan(np.radians(latitudes))[:, None] * np.tan(dec)[None, :]
+    with np.errstate(invalid='ignore'):
+        crossing = np.degrees(np.arccos(np.where(np.abs(x) <= 1, x, np.nan)))
+    # Rising bodies are east of the meridian (negative hour angle)
+    return {
+        'ASC': _wrap_longitude(mc - crossing),
+        'DSC': _wrap_longitude(mc + crossing),
+        'MC': _wrap_longitude(mc),
+        'IC': _wrap_longitude(mc + 180)
+    }
+
+
+def _polylines(latitudes, longitudes):
+    # Split one curve into runs of defined points, breaking at gaps and where
+    # it crosses the antimeridian
+    defined = ~np.isnan(longitudes)
+    jumps = np.abs(np.diff(longitudes)) > 180
+    breaks = np.nonzero(~defined[1:] | ~defined[:-1] | jumps)[0] + 1
+    lines = []
+    for lat, lng, ok in zip(np.split(latitudes, breaks), np.split(longitudes, breaks),
+                            np.split(defined, breaks)):
+        if ok.all() and len(lat) > 1:
+            lines.append(np.round(np.column_stack([lat, lng]), 4).tolist())
+    return lines
+
+
+def astrocartography_lines(birth_date_str, birth_time_str, resolution=DEFAULT_RESOLUTION,
+                           bodies=BODY_NAMES):
+    """Relocation lines for one birth instant.
+
+    Args:
+        birth_date_str (str): Birth date as YYYY-MM-DD
+        birth_time_str (str): Birth time as HH:MM (UTC)
+        resolution (float): Latitude step of the horizon lines in degrees
+        bodies: Body names to draw
+
+    Returns:
+        Dict with 'lines', a list of {'body', 'angle', 'points'} where points
+        is a polyline of [latitude, longitude] pairs, or {'error': ...}.
+    """
+    try:
+        instant = compute_instant(birth_date_str, birth_time_str)
+        ra, dec = body_equatorial(instant.date, bodies)
+    except Exception as e:
+        return {'error': str(e)}
+
+    latitudes = np.arange(-MAX_LATITUDE, MAX_LATITUDE + resolution / 2, resolution)
+    longitudes = angle_longitudes(instant.sidereal_time, ra, dec, latitudes)
+    meridian = np.array([-MAX_LATITUDE, MAX_LATITUDE])
+
+    lines = []
+    for index, name in enumerate(bodies):
+        for angle in ANGLES:
+            if angle in ('MC', 'IC'):
+                polylines = _polylines(meridian, np.full(2, longitudes[angle][index]))
+            else:
+                polylines = _polylines(latitudes, longitudes[angle][:, index])
+            lines.extend({'body': name, 'angle': angle, 'points': points} for points in polylines)
+
+    return {
+        'date': birth_date_str,
+        'time': birth_time_str,
+        'resolution': resolution,
+        'lines': lines
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time [resolution]'}))
+        sys.exit(1)
+
+    resolution = float(sys.argv[3]) if len(sys.argv) == 4 else DEFAULT_RESOLUTION
+    result = astrocartography_lines(sys.argv[1], sys.argv[2], resolution)
+    print(json.dumps(result))
+    if 'error' in result:
+        sys.exit(1)
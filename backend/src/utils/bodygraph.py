@@ -0,0 +1,184 @@
+import sys
+import json
+import numpy as np
+
+# Human Design body graph as bitmasks.
+#
+# A chart's gates are one uint64 (bit g - 1 for gate g). A channel is defined
+# when both of its gates are set, which is a single mask comparison per
+# channel. The 36 channels only join 17 distinct pairs of centers, so
+# everything derived from the graph - defined centers, connected components
+# (definition), whether a motor reaches the throat, type and authority - is a
+# function of a 17-bit edge mask. Those are precomputed once for all 2^17
+# edge masks, and evaluating any number of charts is then a few array
+# operations and one table lookup.
+
+CENTERS = ('Head', 'Ajna', 'Throat', 'G', 'Heart', 'Solar Plexus', 'Sacral', 'Spleen', 'Root')
+
+CENTER_GATES = {
+    'Head': (64, 61, 63),
+    'Ajna': (47, 24, 4, 17, 43, 11),
+    'Throat': (62, 23, 56, 35, 12, 45, 33, 8, 31, 20, 16),
+    'G': (1, 13, 25, 46, 2, 15, 10, 7),
+    'Heart': (21, 40, 26, 51),
+    'Solar Plexus': (6, 37, 22, 36, 30, 55, 49),
+    'Sacral': (34, 5, 14, 29, 59, 9, 3, 42, 27),
+    'Spleen': (48, 57, 44, 50, 32, 28, 18),
+    'Root': (58, 38, 54, 53, 60, 52, 19, 39, 41)
+}
+
+CHANNELS = (
+    (1, 8), (2, 14), (3, 60), (4, 63), (5, 15), (6, 59), (7, 31), (9, 52), (10, 20),
+    (10, 34), (10, 57), (11, 56), (12, 22), (13, 33), (16, 48), (17, 62), (18, 58), (19, 49),
+    (20, 34), (20, 57), (21, 45), (23, 43), (24, 61), (25, 51), (26, 44), (27, 50), (28, 38),
+    (29, 46), (30, 41), (32, 54), (34, 57), (35, 36), (37, 40), (39, 55), (42, 53), (47, 64)
+)
+
+MOTORS = ('Heart', 'Solar Plexus', 'Sacral', 'Root')
+
+TYPES = ('Reflector', 'Generator', 'Manifesting Generator', 'Manifestor', 'Projector')
+
+# In order of precedence; the last two have no inner center authority
+AUTHORITIES = ('Emotional', 'Sacral', 'Splenic', 'Ego', 'Self', 'Mental Projector', 'Lunar')
+
+# Indexed by number of connected components
+DEFINITIONS = ('No Definition', 'Single', 'Split', 'Triple Split', 'Quad Split')
+
+CENTER_INDEX = {name: i for i, name in enumerate(CENTERS)}
+
+# Center index of every gate (index 0 unused)
+GATE_CENTER = np.full(65, -1, dtype=np.int8)
+for _name, _gates in CENTER_GATES.items():
+    GATE_CENTER[list(_gates)] = CENTER_INDEX[_name]
+
+# Bit of every gate (index 0, no gate, is empty)
+GATE_BITS = np.array([0] + [1 << (gate - 1) for gate in range(1, 65)], dtype=np.uint64)
+
+CHANNEL_MASKS = np.array([(1 << (a - 1)) | (1 << (b - 1)) for a, b in CHANNELS], dtype=np.uint64)
+CHANNEL_NAMES = tuple(f'{a}-{b}' for a, b in CHANNELS)
+
+# Distinct center pairs joined by channels, and the pair of each channel
+EDGES = tuple(sorted({tuple(sorted((int(GATE_CENTER[a]), int(GATE_CENTER[b])))) for a, b in CHANNELS}))
+CHANNEL_EDGE_BITS = np.array(
+    [1 << EDGES.index(tuple(sorted((int(GATE_CENTER[a]), int(GATE_CENTER[b]))))) for a, b in CHANNELS],
+    dtype=np.int64)
+
+
+def _edge_tables():
+    # Center mask, component count, type and authority for every edge mask
+    count = 1 << len(EDGES)
+    edge_masks = np.arange(count)
+    present = [(edge_masks >> e & 1).astype(bool) for e in range(len(EDGES))]
+
+    defined = np.zeros((count, len(CENTERS)), dtype=bool)
+    for e, (u, v) in enumerate(EDGES):
+        defined[:, u] |= present[e]
+        defined[:, v] |= present[e]
+
+    # Component labels: mask m with highest edge e extends m - 2^e by joining
+    # e's two centers, so each block of the table is derived from the one
+    # before it. A center labelled with its own index represents a component.
+    labels = np.empty((count, len(CENTERS)), dtype=np.int8)
+    labels[0] = np.arange(len(CENTERS))
+    for e, (u, v) in enumerate(EDGES):
+        block = labels[:1 << e]
+        labels[1 << e:2 << e] = np.where(block == block[:, v:v + 1], block[:, u:u + 1], block)
+    components = (defined & (labels == np.arange(len(CENTERS)))).sum(axis=1).astype(np.int8)
+
+    throat = CENTER_INDEX['Throat']
+    motor_to_throat = np.zeros(count, dtype=bool)
+    for motor in MOTORS:
+        m = CENTER_INDEX[motor]
+        motor_to_throat |= defined[:, m] & defined[:, throat] & (labels[:, m] == labels[:, throat])
+
+    sacral = defined[:, CENTER_INDEX['Sacral']]
+    types = np.select(
+        [~defined.any(axis=1), sacral & motor_to_throat, sacral, motor_to_throat],
+        [TYPES.index('Reflector'), TYPES.index('Manifesting Generator'),
+         TYPES.index('Generator'), TYPES.index('Manifestor')],
+        TYPES.index('Projector')).astype(np.int8)
+
+    authorities = np.select(
+        [~defined.any(axis=1),
+         defined[:, CENTER_INDEX['Solar Plexus']], sacral,
+         defined[:, CENTER_INDEX['Spleen']], defined[:, CENTER_INDEX['Heart']],
+         defined[:, CENTER_INDEX['G']]],
+        [AUTHORITIES.index('Lunar'), AUTHORITIES.index('Emotional'), AUTHORITIES.index('Sacral'),
+         AUTHORITIES.index('Splenic'), AUTHORITIES.index('Ego'), AUTHORITIES.index('Self')],
+        AUTHORITIES.index('Mental Projector')).astype(np.int8)
+
+    center_masks = (defined * (1 << np.arange(len(CENTERS)))).sum(axis=1).astype(np.uint16)
+    return center_masks, components, types, authorities
+
+
+EDGE_CENTERS, EDGE_COMPONENTS, EDGE_TYPES, EDGE_AUTHORITIES = _edge_tables()
+
+
+def gate_masks(gates):
+    """uint64 gate masks from an (N, k) array of gate numbers (0 = none).
+
+    A 1-D array is treated as the gates of a single chart.
+    """
+    gates = np.asarray(gates)
+    if gates.ndim == 1:
+        gates = gates[None, :]
+    masks = np.zeros(len(gates), dtype=np.uint64)
+    for column in range(gates.shape[1]):
+        masks |= GATE_BITS[gates[:, column]]
+    return masks
+
+
+def evaluate(masks):
+    """Derive the body graph of every chart from its gate mask.
+
+    Returns a dict of arrays: 'channels' (uint64, bit j for CHANNELS[j]),
+    'centers' (uint16, bit i for CENTERS[i]), 'components' (int8), and
+    'type' / 'authority' as int8 indices into TYPES and AUTHORITIES.
+    """
+    masks = np.atleast_1d(np.asarray(masks, dtype=np.uint64))
+    channels = np.zeros(len(masks), dtype=np.uint64)
+    edges = np.zeros(len(masks), dtype=np.int32)
+    for j, channel in enumerate(CHANNEL_MASKS):
+        defined = (masks & channel) == channel
+        channels |= defined.astype(np.uint64) << np.uint64(j)
+        edges |= defined * np.int32(CHANNEL_EDGE_BITS[j])
+    return {
+        'channels': channels,
+        'centers': EDGE_CENTERS[edges],
+        'components': EDGE_COMPONENTS[edges],
+        'type': EDGE_TYPES[edges],
+        'authority': EDGE_AUTHORITIES[edges]
+    }
+
+
+def bodygraph_dict(evaluated, index=0):
+    """One chart of evaluate() in JSON form."""
+    channels = int(evaluated['channels'][index])
+    centers = int(evaluated['centers'][index])
+    return {
+        'channels': [name for j, name in enumerate(CHANNEL_NAMES) if channels >> j & 1],
+        'centers': [name for i, name in enumerate(CENTERS) if centers >> i & 1],
+        'definition': DEFINITIONS[evaluated['components'][index]],
+        'type': TYPES[evaluated['type'][index]],
+        'authority': AUTHORITIES[evaluated['authority'][index]]
+    }
+
+
+def calculate_bodygraph(gates):
+    """Channels, centers, definition, type and authority for one gate set."""
+    return bodygraph_dict(evaluate(gate_masks(np.array(sorted(set(gates)), dtype=np.int64))))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(json.dumps({'error': 'Incorrect arguments. Required: gate [gate ...]'}))
+        sys.exit(1)
+
+    try:
+        gates = [int(gate) for gate in sys.argv[1:]]
+        if any(gate < 1 or gate > 64 for gate in gates):
+            raise ValueError('Gates must be between 1 and 64')
+        print(json.dumps(calculate_bodygraph(gates)))
+    except ValueError as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
@@ -0,0 +1,191 @@
+import sys
+import json
+import os
+import time
+import tempfile
+from chart_generator import (CENTER_LAYOUT, CENTER_RADIUS, LABEL_OFFSET, DEFINED_COLOR,
+                             UNDEFINED_COLOR, BODYGRAPH_MASKS, center_mask)
+
+# Body graph thumbnails for the frontend, one per center bitmask.
+#
+# There are only 512 combinations of defined centers, so every body graph
+# can be drawn ahead of time as SVG and PNG files in the bodygraphs
+# directory, which the server serves as static files. Serving a body graph
+# is then a file lookup; missing files are drawn on first request. The
+# drawing matches the body graph on the chart PDF (same layout, radius and
+# colors), whose operators chart_generator caches per mask in memory.
+#
+# Usage:
+#   python bodygraph_cache.py warm [directory]   draw every missing file
+#   python bodygraph_cache.py stats [directory]  file counts and sizes
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'bodygraphs')
+
+KINDS = ('svg', 'png')
+
+# Points per inch of the chart layout, and the margin kept around the graph
+POINTS = 72
+MARGIN = 0.1
+
+# Graph extent in inches: x relative to the page center, y from the bottom
+_LEFT = min(dx for _, dx, _ in CENTER_LAYOUT) - CENTER_RADIUS - MARGIN
+_RIGHT = max(dx for _, dx, _ in CENTER_LAYOUT) + CENTER_RADIUS + MARGIN
+_BOTTOM = min(y for _, _, y in CENTER_LAYOUT) - CENTER_RADIUS - MARGIN
+_TOP = max(y for _, _, y in CENTER_LAYOUT) + CENTER_RADIUS + MARGIN
+
+SVG_WIDTH = round((_RIGHT - _LEFT) * POINTS, 2)
+SVG_HEIGHT = round((_TOP - _BOTTOM) * POINTS, 2)
+
+PNG_WIDTH = 160
+
+# PNGs are drawn this many times larger, then downsampled for smooth edges
+PNG_SUPERSAMPLE = 2
+
+# Palette size of the PNGs (flat fills plus anti-aliased edges)
+PNG_COLORS = 64
+
+
+def _point(dx, y):
+    # Layout inches -> thumbnail points, y pointing down
+    return (dx - _LEFT) * POINTS, (_TOP - y) * POINTS
+
+
+def _hex(color):
+    return '#' + ''.join(f'{round(channel * 255):02x}' for channel in color)
+
+
+def bodygraph_svg(mask):
+    """SVG document of the body graph of a center mask."""
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}" height="{SVG_HEIGHT}" '
+        f'viewBox="0 0 {SVG_WIDTH} {SVG_HEIGHT}" font-family="Helvetica, Arial, sans-serif" '
+        f'font-size="8" text-anchor="middle">'
+    ]
+    for i, (center, dx, y) in enumerate(CENTER_LAYOUT):
+        x, top = _point(dx, y)
+        fill = _hex(DEFINED_COLOR if mask >> i & 1 else UNDEFINED_COLOR)
+        parts.append(f'<circle cx="{x:.2f}" cy="{top:.2f}" r="{CENTER_RADIUS * POINTS:.2f}" '
+                     f'fill="{fill}" stroke="#000000"/>')
+        parts.append(f'<text x="{x:.2f}" y="{top + LABEL_OFFSET * POINTS:.2f}">{center}</text>')
+    parts.append('</svg>')
+    return '\n'.join(parts) + '\n'
+
+
+def _font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow without sized default fonts
+        return ImageFont.load_default()
+
+
+def bodygraph_png(mask, width=PNG_WIDTH):
+    """PNG bytes of the body graph of a center mask, width pixels wide."""
+    import io
+    from PIL import Image, ImageDraw
+    scale = width / SVG_WIDTH * PNG_SUPERSAMPLE
+    size = (round(SVG_WIDTH * scale), round(SVG_HEIGHT * scale))
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    font = _font(8 * scale)
+    radius = CENTER_RADIUS * POINTS * scale
+    for i, (center, dx, y) in enumerate(CENTER_LAYOUT):
+        x, top = (value * scale for value in _point(dx, y))
+        fill = tuple(round(channel * 255) for channel in (DEFINED_COLOR if mask >> i & 1 else UNDEFINED_COLOR))
+        draw.ellipse((x - radius, top - radius, x + radius, top + radius),
+                     fill=fill, outline='black', width=max(1, round(scale)))
+        draw.text((x, top + LABEL_OFFSET * POINTS * scale), center, fill='black', font=font, anchor='ms')
+    image = image.resize((round(size[0] / PNG_SUPERSAMPLE), round(size[1] / PNG_SUPERSAMPLE)),
+                         Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.quantize(PNG_COLORS).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class BodygraphCache:
+    """Directory of body graph thumbnails keyed by center mask.
+
+    Args:
+        directory (str): Where thumbnails are stored
+    """
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def filename(mask, kind):
+        return f'bodygraph-{mask:03d}.{kind}'
+
+    def path(self, mask, kind):
+        return os.path.join(self.directory, self.filename(mask, kind))
+
+    def _render(self, mask, kind):
+        data = bodygraph_svg(mask).encode('utf-8') if kind == 'svg' else bodygraph_png(mask)
+        # Write then rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path(mask, kind))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, mask, kind='svg'):
+        """Path of the thumbnail of a center mask, drawing it if missing."""
+        if not 0 <= mask < BODYGRAPH_MASKS:
+            raise ValueError(f'Center mask out of range: {mask}')
+        if kind not in KINDS:
+            raise ValueError(f'Unknown thumbnail kind: {kind}')
+        path = self.path(mask, kind)
+        if os.path.exists(path):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._render(mask, kind)
+        return path
+
+    def lookup(self, centers):
+        """Mask and thumbnail filenames for a list of defined centers."""
+        mask = center_mask(centers)
+        return {'mask': mask, **{kind: os.path.basename(self.get(mask, kind)) for kind in KINDS}}
+
+    def warm(self, kinds=KINDS):
+        """Draw every missing thumbnail."""
+        start = time.perf_counter()
+        rendered = 0
+        for mask in range(BODYGRAPH_MASKS):
+            for kind in kinds:
+                if not os.path.exists(self.path(mask, kind)):
+                    self._render(mask, kind)
+                    rendered += 1
+        return {'rendered': rendered, 'seconds': round(time.perf_counter() - start, 3)}
+
+    def stats(self):
+        result = {'hits': self.hits, 'misses': self.misses}
+        for kind in KINDS:
+            sizes = [os.path.getsize(self.path(mask, kind)) for mask in range(BODYGRAPH_MASKS)
+                     if os.path.exists(self.path(mask, kind))]
+            result[kind] = {'files': len(sizes), 'bytes': sum(sizes)}
+        return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ('warm', 'stats'):
+        print(json.dumps({'error': 'Incorrect arguments. Required: warm|stats [directory]'}))
+        sys.exit(1)
+
+    cache = BodygraphCache(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DIR)
+    result = {}
+    if sys.argv[1] == 'warm':
+        from chart_generator import warm_up, bodygraph_cache_size
+        result['thumbnails'] = cache.warm()
+        # The PDF operators live in each process; this shows what a worker holds
+        warm_up()
+        result['pdfOperators'] = bodygraph_cache_size()
+    result.update(cache.stats())
+    print(json.dumps(result))
@@ -0,0 +1,165 @@
+import sys
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Heavy libraries (ephem, reportlab) are imported exactly once, when the
+# worker starts, instead of once per request. The calculator modules load
+# them lazily, so they are warmed up explicitly.
+import astro_calculator
+import chart_generator
+import instrumentation
+from astro_calculator import calculate_astro
+from astro_record import AstroRecord, compact_astro
+from human_design import calculate_human_design
+from chart_generator import generate_hd_chart, render_hd_chart
+from chart_cache import ChartCache, SQLiteCache
+from chart_store import ChartStore
+from bodygraph_cache import BodygraphCache
+from location_utils import LocationUtils
+
+DEFAULT_THREADS = 4
+
+astro_calculator.warm_up()
+chart_generator.warm_up()
+
+_write_lock = threading.Lock()
+
+# Results are shared with every other worker through the SQLite tier
+_cache = ChartCache(persistent=SQLiteCache())
+
+# Rendered PDFs, shared with every other worker through the charts directory
+_store = ChartStore()
+
+# Body graph thumbnails, one file per center mask, drawn on first use
+_bodygraphs = BodygraphCache()
+
+# City indices are built once, on the first lookup
+_locations = None
+_locations_lock = threading.Lock()
+
+
+def _astro(birth_date, birth_time, latitude, longitude, encoding='json'):
+    # encoding 'compact' returns the AstroRecord list form (see astro_record.py)
+    if encoding == 'compact':
+        return _cache.get_or_compute('astro_compact', compact_astro,
+                                     birth_date, birth_time, latitude, longitude)
+    return _cache.get_or_compute('astro', calculate_astro,
+                                 birth_date, birth_time, latitude, longitude)
+
+
+def _human_design(birth_date, birth_time, latitude, longitude):
+    return _cache.get_or_compute('human_design', calculate_human_design,
+                                 birth_date, birth_time, latitude, longitude)
+
+
+def _chart(hd_data, astro_data, user_name, output_path):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    return generate_hd_chart(hd_data, astro_data, user_name, output_path)
+
+
+def _store_chart(hd_data, user_name, astro_data=None, astro_record=None):
+    # Content-addressed: a repeat of the same input is not rendered again.
+    # The chart can be given as astro_data or as a compact astro_record.
+    if astro_data is None:
+        astro_data = AstroRecord.from_compact(astro_record).to_astro_data()
+    return _store.get_or_render(hd_data, astro_data, user_name, render_hd_chart)
+
+
+def _bodygraph(centers):
+    return _bodygraphs.lookup(centers)
+
+
+def _search_cities(query, k=5, country=None):
+    global _locations
+    with _locations_lock:
+        if _locations is None:
+            _locations = LocationUtils()
+    return _locations.search_cities(query, k, country)
+
+
+def _metrics():
+    # This worker's stage histograms and counters (see instrumentation.py)
+    return instrumentation.snapshot()
+
+
+def _metrics_text(snapshots):
+    # Prometheus text for snapshots gathered from every worker
+    return instrumentation.export_text(instrumentation.merge(snapshots))
+
+
+OPS = {
+    'astro': _astro,
+    'human_design': _human_design,
+    'chart': _chart,
+    'store_chart': _store_chart,
+    'bodygraph': _bodygraph,
+    'search_cities': _search_cities,
+    'metrics': _metrics,
+    'metrics_text': _metrics_text,
+}
+
+
+def write_message(message, out=None):
+    out = out or sys.stdout
+    line = json.dumps(message)
+    with _write_lock:
+        out.write(line + '\n')
+        out.flush()
+
+
+def handle_request(request):
+    # Run a single request and build the tagged response
+    request_id = request.get('id')
+    op = request.get('op')
+    handler = OPS.get(op)
+    if handler is None:
+        return {'id': request_id, 'ok': False, 'error': f'Unknown op: {op}'}
+    try:
+        with instrumentation.trace() as timings:
+            result = handler(**request.get('params', {}))
+    except Exception as e:
+        return {'id': request_id, 'ok': False, 'error': str(e)}
+    response = {'id': request_id, 'ok': True, 'result': result}
+    # Stage breakdown of this request, in milliseconds, when instrumented
+    if instrumentation.enabled:
+        response['timings'] = timings
+    return response
+
+
+def serve(infile=None, out=None, threads=DEFAULT_THREADS):
+    # Read newline-delimited JSON requests until EOF. Requests run on a
+    # thread pool so several can be in flight; responses carry the request id
+    # and may be written out of order.
+    infile = infile or sys.stdin
+    out = out or sys.stdout
+
+    def run(request):
+        write_message(handle_request(request), out)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for line in infile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                write_message({'id': None, 'ok': False, 'error': f'Invalid JSON data: {str(e)}'}, out)
+                continue
+
+            # Health checks are answered inline so they stay fast while busy
+            if request.get('op') == 'ping':
+                write_message({'id': request.get('id'), 'ok': True,
+                               'result': {'pid': os.getpid(), 'ops': sorted(OPS),
+                                          'cache': _cache.stats()}}, out)
+                continue
+
+            pool.submit(run, request)
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_THREADS
+    write_message({'id': None, 'ok': True, 'result': 'ready'})
+    serve(threads=threads)
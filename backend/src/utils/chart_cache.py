@@ -0,0 +1,241 @@
+import sys
+import json
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Two-tier cache for chart computations.
+#
+# calculate_astro and calculate_human_design are pure functions of
+# (date, time, latitude, longitude). Tier one is an in-process LRU with size
+# and TTL eviction; tier two is a SQLite file that several worker processes
+# can share. Keys hold the exact coordinates: results depend on them at full
+# precision (the human design seed truncates latitude and longitude, house
+# cusps use the exact longitude), so nearby birthplaces cannot share an
+# entry. Every key includes the calculator version, so bumping
+# CALCULATOR_VERSION invalidates old results.
+
+# 3: keys hold exact coordinates; version 1 and 2 keys were rounded to two
+#    decimals, so nearby birthplaces could get each other's results
+CALCULATOR_VERSION = '3'
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                               'data', 'chart_cache.db')
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with optional TTL.
+
+    Args:
+        max_size (int): Maximum number of entries
+        ttl (float): Seconds an entry stays valid, or None for no expiry
+    """
+
+    def __init__(self, max_size=4096, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """Persistent cache tier backed by a SQLite file.
+
+    Uses WAL mode so several processes can read and write the same file.
+    Entries older than ttl seconds are treated as misses.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, ttl=None):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = self._connection()
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS chart_cache (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        connection.commit()
+
+    def _connection(self):
+        # sqlite3 connections must not be shared across threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value, created_at FROM chart_cache WHERE key = ?', (key,)).fetchone()
+        if row is not None and (self.ttl is None or row[1] + self.ttl > time.time()):
+            self.hits += 1
+            return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def set(self, key, value, version=CALCULATOR_VERSION):
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO chart_cache (key, version, value, created_at) VALUES (?, ?, ?, ?)',
+            (key, version, json.dumps(value), time.time()))
+        connection.commit()
+
+    def invalidate(self, keep_version=CALCULATOR_VERSION):
+        """Delete entries written by other calculator versions (or expired)."""
+        connection = self._connection()
+        cursor = connection.execute('DELETE FROM chart_cache WHERE version != ?', (keep_version,))
+        removed = cursor.rowcount
+        if self.ttl is not None:
+            cursor = connection.execute('DELETE FROM chart_cache WHERE created_at <= ?',
+                                        (time.time() - self.ttl,))
+            removed += cursor.rowcount
+        connection.commit()
+        self.evictions += removed
+        return removed
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute('DELETE FROM chart_cache')
+        connection.commit()
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM chart_cache').fetchone()[0]
+
+
+class ChartCache:
+    """Memory tier in front of an optional persistent tier.
+
+    Args:
+        memory (LRUCache): First tier
+        persistent (SQLiteCache): Second tier, or None to stay in-process
+        version (str): Calculator version stored in every key
+    """
+
+    def __init__(self, memory=None, persistent=None, version=CALCULATOR_VERSION):
+        self.memory = memory if memory is not None else LRUCache()
+        self.persistent = persistent
+        self.version = version
+
+    def make_key(self, kind, birth_date, birth_time, latitude, longitude):
+        # repr round-trips, so equal keys mean equal coordinates
+        return f"{self.version}:{kind}:{birth_date}:{birth_time}:{float(latitude)!r}:{float(longitude)!r}"
+
+    def get_or_compute(self, kind, compute, birth_date, birth_time, latitude, longitude):
+        """Return a cached result, computing and storing it on a miss.
+
+        Results carrying an 'error' key are returned but never cached. Cached values are shared; treat them
+        as read-only.
+        """
+        key = self.make_key(kind, birth_date, birth_time, latitude, longitude)
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.persistent is not None:
+            value = self.persistent.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                return value
+
+        value = compute(birth_date, birth_time, latitude, longitude)
+        if 'error' not in value:
+            self.memory.set(key, value)
+            if self.persistent is not None:
+                self.persistent.set(key, value, self.version)
+        return value
+
+    def invalidate(self):
+        """Drop every entry not written by the current calculator version."""
+        self.memory.clear()
+        return self.persistent.invalidate(self.version) if self.persistent is not None else 0
+
+    def stats(self):
+        tiers = {'memory': self.memory}
+        if self.persistent is not None:
+            tiers['persistent'] = self.persistent
+        return {
+            name: {
+                'hits': tier.hits,
+                'misses': tier.misses,
+                'evictions': tier.evictions,
+                'size': len(tier)
+            } for name, tier in tiers.items()
+        }
+
+
+def cached_astro(cache):
+    """calculate_astro wrapped by a ChartCache."""
+    from astro_calculator import calculate_astro
+
+    def compute(birth_date, birth_time, latitude, longitude):
+        return cache.get_or_compute('astro', calculate_astro, birth_date, birth_time, latitude, longitude)
+    return compute
+
+
+def cached_human_design(cache):
+    """calculate_human_design wrapped by a ChartCache."""
+    from human_design import calculate_human_design
+
+    def compute(birth_date, birth_time, latitude, longitude):
+        return cache.get_or_compute('human_design', calculate_human_design,
+                                    birth_date, birth_time, latitude, longitude)
+    return compute
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ('stats', 'invalidate', 'clear'):
+        print(json.dumps({'error': 'Incorrect arguments. Required: stats|invalidate|clear [db_path]'}))
+        sys.exit(1)
+
+    cache = ChartCache(persistent=SQLiteCache(sys.argv[2] if len(sys.argv) == 3 else DEFAULT_DB_PATH))
+    if sys.argv[1] == 'invalidate':
+        print(json.dumps({'removed': cache.invalidate()}))
+    elif sys.argv[1] == 'clear':
+        cache.persistent.clear()
+        print(json.dumps({'success': True}))
+    else:
+        print(json.dumps(cache.stats()))
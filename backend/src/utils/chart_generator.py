@@ -1,22 +1,294 @@
 import sys
+import io
 import json
 import os
-from reportlab.pdfgen import canvas
+import threading
+from functools import lru_cache
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph
+from instrumentation import stage, count
 from hd_data import (GATE_DESCRIPTIONS, CENTER_DESCRIPTIONS, 
                      TYPE_DESCRIPTIONS, AUTHORITY_DESCRIPTIONS,
                      PROFILE_DESCRIPTIONS, DEFINITION_DESCRIPTIONS)
 
-def draw_astro_section(c, width, height, astro_data):
-    # Draw astrological section header
+# The rest of reportlab (canvas, platypus, styles) takes most of the import
+# time, so it is imported by the functions that draw, not at module load
+
+# Form XObject holding everything that is the same on every chart page
+TEMPLATE_FORM = 'chartLayout'
+
+# Gate descriptions are laid out once per process; a Paragraph keeps its
+# canvas while drawing, so drawing a shared one is serialized
+_paragraph_lock = threading.Lock()
+
+# Center positions of the body graph, relative to the page
+CENTER_LAYOUT = (
+    ('Head', 0, 5), ('Ajna', 0, 4.5), ('Throat', 0, 4), ('G', -0.7, 3.5), ('Heart', 0.7, 3.5),
+    ('Solar Plexus', 0, 3), ('Spleen', -0.7, 2.5), ('Sacral', 0, 2.5), ('Root', 0, 2)
+)
+
+# Body graph style: center radius and label offset in inches, fill colors
+CENTER_RADIUS = 0.2
+LABEL_OFFSET = 0.1
+DEFINED_COLOR = (0.8, 0.3, 0.8)  # Purple
+UNDEFINED_COLOR = (0.8, 0.8, 0.8)  # Light gray
+
+# A body graph is identified by its center bitmask: bit i set when
+# CENTER_LAYOUT[i] is defined, so there are 512 of them
+BODYGRAPH_MASKS = 1 << len(CENTER_LAYOUT)
+
+# PDF content-stream operators of each body graph, keyed by center mask.
+# Every graph is the concatenation of one piece per center (defined or not),
+# recorded once per process from a scratch canvas. The operators carry no
+# font or resource names, so they can be replayed into any document.
+# Recording reads reportlab's private list of page operators, so it is
+# checked against direct drawing once per process; if the list is missing
+# or the replay differs, body graphs are drawn directly instead.
+_center_ops = None  # () when recording is unavailable
+_bodygraph_ops = {}
+_bodygraph_lock = threading.Lock()
+
+# Labelled fields of the summary block, top to bottom
+FIELDS = (
+    ('Type:', 'type', TYPE_DESCRIPTIONS),
+    ('Authority:', 'authority', AUTHORITY_DESCRIPTIONS),
+    ('Profile:', 'profile', PROFILE_DESCRIPTIONS),
+    ('Definition:', 'definition', DEFINITION_DESCRIPTIONS)
+)
+
+def warm_up():
+    """Import the drawing stack and build shared styles now; for workers."""
+    from reportlab.pdfgen import canvas
+    for gate in GATE_DESCRIPTIONS:
+        gate_paragraph(gate)
+    for mask in range(BODYGRAPH_MASKS):
+        bodygraph_ops(mask)
+
+@lru_cache(maxsize=1)
+def gate_style():
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    styles = getSampleStyleSheet()
+    return ParagraphStyle(
+        'GateStyle',
+        parent=styles['Normal'],
+        fontSize=9,
+        leading=11
+    )
+
+@lru_cache(maxsize=128)
+def gate_paragraph(gate):
+    """Gate description wrapped to the gates column (cached)."""
+    from reportlab.platypus import Paragraph
+    count('chart.paragraph_layouts')
+    with stage('chart.paragraph_layout'):
+        description = GATE_DESCRIPTIONS.get(gate, f"Gate {gate}")
+        p = Paragraph(f"<b>Gate {gate}:</b> {description}", gate_style())
+        p.wrap(2.5*inch, 0.5*inch)
+    return p
+
+def center_positions(width):
+    return {center: (width/2 + dx*inch, y*inch) for center, dx, y in CENTER_LAYOUT}
+
+def center_mask(centers):
+    """Body graph bitmask of a list of defined center names."""
+    defined = set(centers)
+    return sum(1 << i for i, (center, _, _) in enumerate(CENTER_LAYOUT) if center in defined)
+
+def draw_center(c, center, pos, defined):
+    # Expects Helvetica 8 to be the current font
+    c.setFillColorRGB(*(DEFINED_COLOR if defined else UNDEFINED_COLOR))
+    c.circle(pos[0], pos[1], CENTER_RADIUS*inch, fill=1)
+    c.setFillColorRGB(0, 0, 0)  # Reset to black
+    c.drawCentredString(pos[0], pos[1] - LABEL_OFFSET*inch, center)
+
+def _record_center_ops():
+    # (undefined, defined) operator strings of every center, in layout order,
+    # or () when they cannot be recorded faithfully
+    try:
+        pieces = _read_center_ops()
+        return pieces if pieces and _replay_matches(pieces) else ()
+    except Exception:
+        return ()
+
+def _read_center_ops():
+    # Read from the canvas's list of page operators as the centers are drawn
+    from reportlab.pdfgen import canvas
+    width, height = landscape(letter)
+    scratch = canvas.Canvas(io.BytesIO(), pagesize=(width, height))
+    scratch.setFont("Helvetica", 8)
+    code = getattr(scratch, '_code', None)
+    if not isinstance(code, list):
+        return ()
+    pieces = []
+    for center, pos in center_positions(width).items():
+        states = []
+        for defined in (False, True):
+            start = len(code)
+            draw_center(scratch, center, pos, defined)
+            states.append('\n'.join(code[start:]))
+        pieces.append(tuple(states))
+    return pieces
+
+def _page_pdf(draw):
+    # One uncompressed page drawn by draw(c), byte-for-byte reproducible
+    from reportlab.pdfgen import canvas
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter), invariant=1, pageCompression=0)
+    draw(c)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def _replay_matches(pieces):
+    # The empty and the full graph use both pieces of every center
+    for mask in (0, BODYGRAPH_MASKS - 1):
+        ops = '\n'.join(states[mask >> i & 1] for i, states in enumerate(pieces))
+        if (_page_pdf(lambda c: draw_ops(c, ops))
+                != _page_pdf(lambda c: draw_bodygraph_direct(c, mask))):
+            return False
+    return True
+
+def center_ops():
+    """Cached (undefined, defined) operators per center; () if unavailable."""
+    global _center_ops
+    if _center_ops is None:
+        with _bodygraph_lock:
+            if _center_ops is None:
+                _center_ops = _record_center_ops()
+    return _center_ops
+
+def bodygraph_ops(mask):
+    """PDF operators drawing the body graph of a center mask (cached).
+
+    None when the operators could not be recorded (see center_ops).
+    """
+    ops = _bodygraph_ops.get(mask)
+    if ops is None:
+        pieces = center_ops()
+        if not pieces:
+            return None
+        ops = '\n'.join(states[mask >> i & 1] for i, states in enumerate(pieces))
+        _bodygraph_ops[mask] = ops
+    return ops
+
+def draw_ops(c, ops):
+    # setFont puts Helvetica in the document's resources; the cached
+    # operators then draw with it
+    c.setFont("Helvetica", 8)
+    c.addLiteral(ops)
+    c.setFillColorRGB(0, 0, 0)
+
+def draw_bodygraph_direct(c, mask, only_defined=False):
+    """Draw the body graph of a center mask without the operator cache."""
+    c.setFont("Helvetica", 8)
+    positions = center_positions(landscape(letter)[0])
+    for i, (center, _, _) in enumerate(CENTER_LAYOUT):
+        defined = bool(mask >> i & 1)
+        if defined or not only_defined:
+            draw_center(c, center, positions[center], defined)
+    c.setFillColorRGB(0, 0, 0)
+
+def draw_bodygraph(c, mask, forms=None):
+    """Draw the body graph of a center mask from the cached operators.
+
+    With forms (see draw_chart_content) only the defined centers are drawn,
+    each as a form XObject defined once per document, over the empty graph
+    in the page template (begin_template). Most masks occur once in a batch,
+    so per-center forms are smaller and faster than a form per mask.
+    """
+    count('chart.bodygraph_lookups')
+    if forms is None:
+        ops = bodygraph_ops(mask)
+        if ops is None:
+            draw_bodygraph_direct(c, mask)
+        else:
+            draw_ops(c, ops)
+        return
+    pieces = center_ops()
+    for i in range(len(CENTER_LAYOUT)):
+        if not mask >> i & 1:
+            continue
+        name = f"center{i}"
+        if name not in forms:
+            c.beginForm(name)
+            if pieces:
+                draw_ops(c, pieces[i][1])
+            else:
+                draw_bodygraph_direct(c, 1 << i, only_defined=True)
+            c.endForm()
+            forms.add(name)
+        c.doForm(name)
+
+def bodygraph_cache_size():
+    """Number and total size (bytes) of the cached body graph operators."""
+    return {
+        'masks': len(_bodygraph_ops),
+        'bytes': sum(len(ops) for ops in _bodygraph_ops.values())
+    }
+
+def draw_static_layout(c, width, height):
+    # Everything on a chart page that does not depend on the chart
+    c.setFont("Helvetica-Bold", 24)
+    c.drawCentredString(width/2, height - 1*inch, "Human Design & Astrology Chart")
+    
+    y_pos = height - 2.5*inch
+    for label, _, _ in FIELDS:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(1*inch, y_pos, label)
+        y_pos -= 0.5*inch
+    
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(1*inch, height - 5*inch, "Activated Centers:")
+    
+    # The body graph itself is drawn per chart (draw_bodygraph)
+    c.setFont("Helvetica-Bold", 16)
+    c.drawCentredString(width/2, 6*inch, "Body Graph")
+    
     c.setFont("Helvetica-Bold", 16)
     c.drawString(1*inch, height - 7*inch, "Astrological Placements")
+    c.drawString(width/2 + 0.5*inch, height - 7*inch, "Active Gates & Their Meanings")
+    
+    c.setFont("Helvetica", 10)
+    c.drawCentredString(width/2, 0.25*inch, 
+                      "This is a simplified representation for educational purposes only.")
+
+def draw_chart_content(c, width, height, hd_data, astro_data, user_name, forms=None):
+    """Draw the chart-specific part of a page over draw_static_layout.
+
+    With forms (the set of form names already defined in the document),
+    the body graph and gate descriptions are placed as form XObjects, each
+    drawn once per document.
+    """
+    c.setFont("Helvetica", 16)
+    c.drawCentredString(width/2, height - 1.5*inch, f"for {user_name}")
+    
+    y_pos = height - 2.5*inch
+    for _, key, descriptions in FIELDS:
+        c.setFont("Helvetica", 14)
+        c.drawString(2.5*inch, y_pos, hd_data[key])
+        c.setFont("Helvetica", 10)
+        c.drawString(2.5*inch, y_pos - 0.2*inch, descriptions.get(hd_data[key], ""))
+        y_pos -= 0.5*inch
+    
+    y_pos = height - 5.3*inch
+    c.setFont("Helvetica", 12)
+    for center in hd_data['centers']:
+        c.drawString(1.5*inch, y_pos, f"• {center}")
+        c.setFont("Helvetica", 10)
+        c.drawString(1.7*inch, y_pos - 0.15*inch, CENTER_DESCRIPTIONS.get(center, ""))
+        y_pos -= 0.4*inch
+        c.setFont("Helvetica", 12)
+    
+    draw_bodygraph(c, center_mask(hd_data['centers']), forms)
+    
+    draw_astro_section(c, width, height, astro_data, header=False)
+    draw_gate_descriptions(c, width, height, hd_data['gates'], header=False, forms=forms)
+
+def draw_astro_section(c, width, height, astro_data, header=True):
+    # Draw astrological section header
+    if header:
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(1*inch, height - 7*inch, "Astrological Placements")
     
     # Draw planetary positions
     c.setFont("Helvetica-Bold", 12)
@@ -50,21 +322,8 @@ def draw_astro_section(c, width, height, astro_data):
     c.setFont("Helvetica", 12)
     c.drawString(2*inch, y_pos, f"{astro_data['moonPhase']['phase']} ({astro_data['moonPhase']['percentage']}%)")
 
-def draw_gate_descriptions(c, width, height, gates):
-    # Draw gate descriptions header
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(width/2 + 0.5*inch, height - 7*inch, "Active Gates & Their Meanings")
-    
-    # Create a style for the paragraphs
-    styles = getSampleStyleSheet()
-    gate_style = ParagraphStyle(
-        'GateStyle',
-        parent=styles['Normal'],
-        fontSize=9,
-        leading=11
-    )
-    
-    # Draw gate descriptions in two columns
+def gate_positions(width, height, gates):
+    # (gate, x, y) of each description, in two columns
     gates_sorted = sorted(gates)
     col_height = (len(gates_sorted) + 1) // 2
     
@@ -75,131 +334,170 @@ def draw_gate_descriptions(c, width, height, gates):
         if i == col_height:
             y_pos = height - 7.5*inch
             x_pos = width/2 + 3.5*inch
-            
-        description = GATE_DESCRIPTIONS.get(gate, f"Gate {gate}")
-        text = f"<b>Gate {gate}:</b> {description}"
-        p = Paragraph(text, gate_style)
-        p.wrapOn(c, 2.5*inch, 0.5*inch)
-        p.drawOn(c, x_pos, y_pos)
+        yield gate, x_pos, y_pos
         y_pos -= 0.25*inch
 
+def draw_gate_form(c, gate, forms):
+    # Place the description as a form, defining the form on first use
+    name = f"gate{gate}"
+    if name not in forms:
+        p = gate_paragraph(gate)
+        leading = gate_style().leading
+        c.beginForm(name, lowerx=0, lowery=-leading, upperx=p.width, uppery=p.height + leading)
+        with _paragraph_lock:
+            p.drawOn(c, 0, 0)
+        c.endForm()
+        forms.add(name)
+    c.doForm(name)
+
+def draw_gate_descriptions(c, width, height, gates, header=True, forms=None):
+    # Draw gate descriptions header
+    if header:
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(width/2 + 0.5*inch, height - 7*inch, "Active Gates & Their Meanings")
+    
+    with stage('chart.draw.gates'):
+        for gate, x_pos, y_pos in gate_positions(width, height, gates):
+            if forms is None:
+                with _paragraph_lock:
+                    gate_paragraph(gate).drawOn(c, x_pos, y_pos)
+            else:
+                c.saveState()
+                c.translate(x_pos, y_pos)
+                draw_gate_form(c, gate, forms)
+                c.restoreState()
+
+def draw_hd_chart(c, hd_data, astro_data, user_name):
+    # One complete chart page on a fresh canvas
+    width, height = landscape(letter)
+    
+    # Set up the document
+    c.setTitle(f"Human Design Chart - {user_name}")
+    
+    count('chart.pages')
+    with stage('chart.draw'):
+        draw_static_layout(c, width, height)
+        draw_chart_content(c, width, height, hd_data, astro_data, user_name)
+
 def generate_hd_chart(hd_data, astro_data, user_name, output_path):
     try:
+        from reportlab.pdfgen import canvas
+        
         # Create a new PDF with ReportLab (landscape for more space)
         c = canvas.Canvas(output_path, pagesize=landscape(letter))
-        width, height = landscape(letter)
-        
-        # Set up the document
-        c.setTitle(f"Human Design Chart - {user_name}")
-        
-        # Draw the header
-        c.setFont("Helvetica-Bold", 24)
-        c.drawCentredString(width/2, height - 1*inch, "Human Design & Astrology Chart")
-        
-        c.setFont("Helvetica", 16)
-        c.drawCentredString(width/2, height - 1.5*inch, f"for {user_name}")
-        
-        # Draw basic info with descriptions
-        y_pos = height - 2.5*inch
-        
-        # Type info
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(1*inch, y_pos, "Type:")
-        c.setFont("Helvetica", 14)
-        c.drawString(2.5*inch, y_pos, hd_data['type'])
-        c.setFont("Helvetica", 10)
-        c.drawString(2.5*inch, y_pos - 0.2*inch, TYPE_DESCRIPTIONS.get(hd_data['type'], ""))
-        
-        # Authority info
-        y_pos -= 0.5*inch
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(1*inch, y_pos, "Authority:")
-        c.setFont("Helvetica", 14)
-        c.drawString(2.5*inch, y_pos, hd_data['authority'])
-        c.setFont("Helvetica", 10)
-        c.drawString(2.5*inch, y_pos - 0.2*inch, AUTHORITY_DESCRIPTIONS.get(hd_data['authority'], ""))
-        
-        # Profile info
-        y_pos -= 0.5*inch
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(1*inch, y_pos, "Profile:")
-        c.setFont("Helvetica", 14)
-        c.drawString(2.5*inch, y_pos, hd_data['profile'])
-        c.setFont("Helvetica", 10)
-        c.drawString(2.5*inch, y_pos - 0.2*inch, PROFILE_DESCRIPTIONS.get(hd_data['profile'], ""))
-        
-        # Definition info
-        y_pos -= 0.5*inch
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(1*inch, y_pos, "Definition:")
-        c.setFont("Helvetica", 14)
-        c.drawString(2.5*inch, y_pos, hd_data['definition'])
-        c.setFont("Helvetica", 10)
-        c.drawString(2.5*inch, y_pos - 0.2*inch, DEFINITION_DESCRIPTIONS.get(hd_data['definition'], ""))
-        
-        # Draw activated centers with descriptions
-        y_pos = height - 5*inch
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(1*inch, y_pos, "Activated Centers:")
-        
-        y_pos -= 0.3*inch
-        c.setFont("Helvetica", 12)
-        for center in hd_data['centers']:
-            c.drawString(1.5*inch, y_pos, f"• {center}")
-            c.setFont("Helvetica", 10)
-            c.drawString(1.7*inch, y_pos - 0.15*inch, CENTER_DESCRIPTIONS.get(center, ""))
-            y_pos -= 0.4*inch
-            c.setFont("Helvetica", 12)
-        
-        # Draw body graph
-        c.setFont("Helvetica-Bold", 16)
-        c.drawCentredString(width/2, 6*inch, "Body Graph")
-        
-        # Center positions (adjusted for landscape)
-        center_positions = {
-            'Head': (width/2, 5*inch),
-            'Ajna': (width/2, 4.5*inch),
-            'Throat': (width/2, 4*inch),
-            'G': (width/2 - 0.7*inch, 3.5*inch),
-            'Heart': (width/2 + 0.7*inch, 3.5*inch),
-            'Solar Plexus': (width/2, 3*inch),
-            'Spleen': (width/2 - 0.7*inch, 2.5*inch),
-            'Sacral': (width/2, 2.5*inch),
-            'Root': (width/2, 2*inch)
-        }
-        
-        # Draw centers
-        for center, pos in center_positions.items():
-            if center in hd_data['centers']:
-                c.setFillColorRGB(0.8, 0.3, 0.8)  # Purple
-            else:
-                c.setFillColorRGB(0.8, 0.8, 0.8)  # Light gray
-                
-            c.circle(pos[0], pos[1], 0.2*inch, fill=1)
-            c.setFillColorRGB(0, 0, 0)  # Reset to black
-            c.setFont("Helvetica", 8)
-            c.drawCentredString(pos[0], pos[1] - 0.1*inch, center)
+        draw_hd_chart(c, hd_data, astro_data, user_name)
+        with stage('chart.save'):
+            c.save()
+        return {'success': True, 'path': output_path}
         
-        # Draw astrological section
-        draw_astro_section(c, width, height, astro_data)
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error generating chart: {error_msg}", file=sys.stderr)
+        return {'success': False, 'error': error_msg}
+
+def render_hd_chart(hd_data, astro_data, user_name):
+    """Render a chart in memory and return the PDF as a memoryview.
+
+    The document is invariant (fixed creation date and file ID), so the
+    same input always produces the same bytes. Errors are raised.
+    """
+    from reportlab.pdfgen import canvas
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter), invariant=1)
+    draw_hd_chart(c, hd_data, astro_data, user_name)
+    with stage('chart.save'):
+        c.save()
+    return buffer.getbuffer()
+
+def check_chart_data(hd_data, astro_data):
+    # Raise on data a page would fail on, before anything is drawn
+    for _, key, _ in FIELDS:
+        str(hd_data[key])
+    list(hd_data['centers'])
+    sorted(hd_data['gates'])
+    for data in astro_data['planets'].values():
+        data['sign'], data['degrees']
+    for aspect in astro_data['aspects']:
+        aspect['bodies'][1], aspect['aspect']
+    astro_data['moonPhase']['phase'], astro_data['moonPhase']['percentage']
+
+def begin_template(c, width, height):
+    # Static layout and empty body graph as a form XObject, drawn once per
+    # document
+    c.beginForm(TEMPLATE_FORM)
+    draw_static_layout(c, width, height)
+    draw_bodygraph(c, 0)
+    c.endForm()
+
+def generate_hd_chart_batch(charts, output_path):
+    """Render many charts as pages of one PDF.
+
+    The static layout, each defined center and each gate description are
+    form XObjects defined once in the document and referenced from every
+    page that uses them.
+
+    Args:
+        charts: Iterable of (hd_data, astro_data, user_name)
+        output_path: Path of the PDF to write
+
+    Returns:
+        Dict with 'success', 'path', 'pages', and 'errors': a list of
+        {'index', 'error'} for charts that were skipped
+    """
+    try:
+        from reportlab.pdfgen import canvas
         
-        # Draw gate descriptions
-        draw_gate_descriptions(c, width, height, hd_data['gates'])
+        c = canvas.Canvas(output_path, pagesize=landscape(letter))
+        width, height = landscape(letter)
+        c.setTitle("Human Design Charts")
+        begin_template(c, width, height)
+        forms = set()
         
-        # Add a footer
-        c.setFont("Helvetica", 10)
-        c.drawCentredString(width/2, 0.25*inch, 
-                          "This is a simplified representation for educational purposes only.")
+        pages = 0
+        errors = []
+        for index, (hd_data, astro_data, user_name) in enumerate(charts):
+            try:
+                check_chart_data(hd_data, astro_data)
+            except Exception as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+            count('chart.pages')
+            with stage('chart.draw'):
+                c.doForm(TEMPLATE_FORM)
+                draw_chart_content(c, width, height, hd_data, astro_data, user_name, forms)
+            key = f"chart{index}"
+            c.bookmarkPage(key)
+            c.addOutlineEntry(user_name, key)
+            c.showPage()
+            pages += 1
         
-        c.save()
-        return {'success': True, 'path': output_path}
+        with stage('chart.save'):
+            c.save()
+        return {'success': True, 'path': output_path, 'pages': pages, 'errors': errors}
         
     except Exception as e:
         error_msg = str(e)
-        print(f"Error generating chart: {error_msg}", file=sys.stderr)
+        print(f"Error generating charts: {error_msg}", file=sys.stderr)
         return {'success': False, 'error': error_msg}
 
 if __name__ == "__main__":
+    # Batch mode: a JSON file with a list of {hd_data, astro_data, user_name}
+    # rendered into one multi-page PDF
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        if len(sys.argv) != 4:
+            print(json.dumps({'success': False, 'error': 'Incorrect arguments. Required: --batch charts_json_path output_path'}))
+            sys.exit(1)
+        try:
+            with open(sys.argv[2], 'r') as f:
+                charts = [(chart['hd_data'], chart['astro_data'], chart['user_name']) for chart in json.load(f)]
+            output_path = sys.argv[3]
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            result = generate_hd_chart_batch(charts, output_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            result = {'success': False, 'error': f'Invalid charts file: {str(e)}'}
+        print(json.dumps(result))
+        sys.exit(0 if result['success'] else 1)
+
     if len(sys.argv) != 5:
         result = {'success': False, 'error': 'Incorrect arguments. Required: hd_data_json astro_data_json user_name output_path'}
         print(json.dumps(result))
@@ -0,0 +1,167 @@
+import sys
+import json
+import os
+import re
+import hashlib
+import tempfile
+import threading
+
+# Content-addressed store for rendered chart PDFs.
+#
+# A chart is keyed by the SHA-256 of its normalized input (hd_data,
+# astro_data, user_name and the renderer version) and stored as
+# <key>.pdf in the charts directory, which the server already serves.
+# Rendering is deterministic, so a repeat request finds the file and
+# returns it without rendering, and an evicted chart can be rendered again
+# under the same name.
+#
+# The store is bounded by total size. Reads touch a file's mtime, so eviction
+# removes the least recently used charts first. Every worker process keeps
+# its own running total and rescans the directory, which is the shared
+# truth, only when that total passes the bound; eviction then goes down to
+# LOW_WATER of the bound so rescans stay rare. Files not named like a key
+# (older timestamped charts) are never touched.
+
+# Bump when the chart layout changes, so old renders are not reused
+RENDERER_VERSION = '1'
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'charts')
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Fraction of max_bytes left after an eviction pass
+LOW_WATER = 0.9
+
+KEY_FILE = re.compile(r'^[0-9a-f]{64}\.pdf$')
+
+
+def chart_key(hd_data, astro_data, user_name, version=RENDERER_VERSION):
+    """SHA-256 hex digest of the normalized chart input."""
+    normalized = json.dumps([version, hd_data, astro_data, user_name],
+                            sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class ChartStore:
+    """Size-bounded, content-addressed directory of chart PDFs.
+
+    Args:
+        directory (str): Where charts are stored
+        max_bytes (int): Total size of stored charts to stay under
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(size for _, size, _ in self._scan())
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def _scan(self):
+        # (path, size, mtime) of every stored chart
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if KEY_FILE.match(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        """Path of a stored chart, or None. Marks the chart as recently used."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key, data):
+        """Store PDF bytes under key and return the path."""
+        path = self.path(key)
+        # Write then rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        with self._lock:
+            self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _evict(self, keep=None):
+        # Remove least recently used charts down to the low-water mark
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * LOW_WATER
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        self._total = total
+
+    def get_or_render(self, hd_data, astro_data, user_name, render):
+        """Return the stored chart for this input, rendering it on a miss.
+
+        render(hd_data, astro_data, user_name) must return the PDF bytes.
+        Returns a dict with 'key', 'filename', 'path' and 'cached'.
+        """
+        key = chart_key(hd_data, astro_data, user_name)
+        path = self.get(key)
+        cached = path is not None
+        if not cached:
+            path = self.put(key, render(hd_data, astro_data, user_name))
+        return {
+            'key': key,
+            'filename': os.path.basename(path),
+            'path': path,
+            'cached': cached
+        }
+
+    def stats(self):
+        entries = self._scan()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'charts': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'maxBytes': self.max_bytes
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ('stats', 'evict'):
+        print(json.dumps({'error': 'Incorrect arguments. Required: stats|evict [directory]'}))
+        sys.exit(1)
+
+    store = ChartStore(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DIR)
+    if sys.argv[1] == 'evict':
+        with store._lock:
+            store._evict()
+    print(json.dumps(store.stats()))
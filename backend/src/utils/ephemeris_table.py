@@ -0,0 +1,234 @@
+import sys
+import json
+import os
+import mmap
+import ephem
+import numpy as np
+
+# Precomputed Chebyshev ephemeris for the ten chart bodies.
+#
+# Positions of the planets depend only on the instant, so they can be fitted
+# once and interpolated afterwards. Each body gets fixed-length segments; each
+# segment stores Chebyshev coefficients (in degrees) for the heliocentric
+# longitude used by calculate_astro ('hlong') and the apparent geocentric
+# ecliptic longitude of date ('glong').
+#
+# File layout: b'EPHT', uint32 header length, JSON header, zero padding to
+# 8 bytes, then raw little-endian float64 coefficient arrays whose byte
+# offsets are listed in the header.
+
+MAGIC = b'EPHT'
+VERSION = 1
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                            'data', 'ephemeris.bin')
+
+START_DATE = '1900/1/1'
+END_DATE = '2101/1/1'
+
+# (segment length in days, polynomial degree), tuned to each body's speed
+SEGMENTS = {
+    'Sun': (16, 12),
+    'Moon': (4, 13),
+    'Mercury': (8, 13),
+    'Venus': (16, 12),
+    'Mars': (16, 12),
+    'Jupiter': (32, 10),
+    'Saturn': (32, 10),
+    'Uranus': (64, 10),
+    'Neptune': (64, 10),
+    'Pluto': (64, 10)
+}
+
+QUANTITIES = ('hlong', 'glong')
+
+
+def _chebyshev_nodes(count):
+    return np.cos(np.pi * (np.arange(count) + 0.5) / count)
+
+
+def _sample_body(name, dates):
+    # Heliocentric and apparent geocentric ecliptic longitudes in degrees
+    body = getattr(ephem, name)()
+    hlong = np.empty(len(dates))
+    glong = np.empty(len(dates))
+    for i, date in enumerate(dates):
+        body.compute(date)
+        hlong[i] = body.hlong
+        equatorial = ephem.Equatorial(body.g_ra, body.g_dec, epoch=date)
+        glong[i] = ephem.Ecliptic(equatorial, epoch=date).lon
+    return np.degrees(hlong), np.degrees(glong)
+
+
+def _fit_segments(values, count):
+    # Interpolate sampled values (segments x nodes) with Chebyshev series.
+    # Longitudes are unwrapped within each segment before fitting.
+    values = np.degrees(np.unwrap(np.radians(values), axis=1))
+    nodes = np.arange(count)
+    basis = np.cos(np.outer(np.arange(count), np.pi * (nodes + 0.5) / count))
+    coefficients = values @ basis.T * (2.0 / count)
+    coefficients[:, 0] /= 2
+    return coefficients
+
+
+def build_table(path=DEFAULT_PATH, start=START_DATE, end=END_DATE, segments=None):
+    """Fit every body over [start, end) and write the binary table to path."""
+    segments = segments or SEGMENTS
+    start = float(ephem.Date(start))
+    end = float(ephem.Date(end))
+
+    header = {'version': VERSION, 'start': start, 'end': end, 'bodies': []}
+    arrays = []
+    offset = 0
+    for name, (segment_days, degree) in segments.items():
+        count = degree + 1
+        segment_count = int(np.ceil((end - start) / segment_days))
+        segment_starts = start + segment_days * np.arange(segment_count)
+        x = (_chebyshev_nodes(count) + 1) * segment_days / 2
+        dates = (segment_starts[:, None] + x[None, :]).ravel()
+
+        hlong, glong = _sample_body(name, dates)
+        entry = {'name': name, 'segment_days': segment_days, 'degree': degree,
+                 'segments': segment_count}
+        for quantity, values in zip(QUANTITIES, (hlong, glong)):
+            coefficients = _fit_segments(values.reshape(segment_count, count), count)
+            entry[quantity] = offset
+            arrays.append(coefficients.astype('<f8'))
+            offset += coefficients.size * 8
+        header['bodies'].append(entry)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    prefix = len(MAGIC) + 4 + len(header_bytes)
+    padding = (-prefix) % 8
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint32(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        f.write(b'\0' * padding)
+        for array in arrays:
+            f.write(array.tobytes())
+    return path
+
+
+class EphemerisTable:
+    """Memory-mapped view over a file written by build_table."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:4] != MAGIC:
+            raise ValueError(f'Not an ephemeris table: {path}')
+        header_length = int(np.frombuffer(self._mmap, dtype='<u4', count=1, offset=4)[0])
+        header = json.loads(self._mmap[8:8 + header_length].decode('utf-8'))
+        if header['version'] != VERSION:
+            raise ValueError(f"Unsupported ephemeris table version: {header['version']}")
+        data_start = 8 + header_length + (-(8 + header_length)) % 8
+
+        self.path = path
+        self.start = header['start']
+        self.end = header['end']
+        self.names = tuple(entry['name'] for entry in header['bodies'])
+        self._segment_days = np.array([entry['segment_days'] for entry in header['bodies']], dtype=float)
+        self._coefficients = {quantity: [] for quantity in QUANTITIES}
+        for entry in header['bodies']:
+            shape = (entry['segments'], entry['degree'] + 1)
+            for quantity in QUANTITIES:
+                self._coefficients[quantity].append(np.frombuffer(
+                    self._mmap, dtype='<f8', count=shape[0] * shape[1],
+                    offset=data_start + entry[quantity]).reshape(shape))
+
+    def covers(self, date):
+        return self.start <= float(date) < self.end
+
+    def _locate(self, date, index):
+        days = self._segment_days[index]
+        elapsed = float(date) - self.start
+        segment = int(elapsed // days)
+        return segment, 2 * (elapsed - segment * days) / days - 1
+
+    def longitudes(self, date, quantity='hlong'):
+        """Longitudes of all bodies, in degrees, at one ephem date."""
+        if not self.covers(date):
+            raise ValueError(f'Date {ephem.Date(date)} is outside the ephemeris table')
+        result = []
+        for index, table in enumerate(self._coefficients[quantity]):
+            segment, x = self._locate(date, index)
+            # Clenshaw recurrence on plain floats (cheaper than numpy for one point)
+            coefficients = table[segment].tolist()
+            b1 = b2 = 0.0
+            for c in reversed(coefficients[1:]):
+                b1, b2 = 2 * x * b1 - b2 + c, b1
+            result.append((x * b1 - b2 + coefficients[0]) % 360)
+        return result
+
+    def longitudes_batch(self, dates, quantity='hlong'):
+        """Longitudes of all bodies for an array of ephem dates, shape (N, bodies)."""
+        dates = np.asarray(dates, dtype=float)
+        if dates.size and (dates.min() < self.start or dates.max() >= self.end):
+            raise ValueError('Dates fall outside the ephemeris table')
+        result = np.empty((dates.size, len(self.names)))
+        elapsed = dates - self.start
+        for index, table in enumerate(self._coefficients[quantity]):
+            days = self._segment_days[index]
+            segment = (elapsed // days).astype(np.intp)
+            x = 2 * (elapsed - segment * days) / days - 1
+            coefficients = table[segment]
+            b1 = np.zeros(dates.size)
+            b2 = np.zeros(dates.size)
+            for j in range(coefficients.shape[1] - 1, 0, -1):
+                b1, b2 = 2 * x * b1 - b2 + coefficients[:, j], b1
+            result[:, index] = (x * b1 - b2 + coefficients[:, 0]) % 360
+        return result
+
+    def close(self):
+        self._coefficients = {quantity: [] for quantity in QUANTITIES}
+        self._mmap.close()
+
+
+_default_table = None
+
+
+def get_default_table():
+    # Load the table shipped in data/ once; None when it has not been built
+    global _default_table
+    if _default_table is None and os.path.exists(DEFAULT_PATH):
+        _default_table = EphemerisTable(DEFAULT_PATH)
+    return _default_table
+
+
+def tolerance_report(table, samples=2000, seed=0):
+    """Compare table lookups against ephem at random instants.
+
+    Returns max/mean absolute error per body and quantity in arcseconds.
+    """
+    rng = np.random.default_rng(seed)
+    dates = rng.uniform(table.start, table.end, samples)
+    report = {}
+    for name in table.names:
+        index = table.names.index(name)
+        hlong, glong = _sample_body(name, dates)
+        body_report = {}
+        for quantity, expected in zip(QUANTITIES, (hlong, glong)):
+            actual = table.longitudes_batch(dates, quantity)[:, index]
+            error = np.abs((actual - expected + 180) % 360 - 180) * 3600
+            body_report[quantity] = {
+                'max_arcsec': round(float(error.max()), 4),
+                'mean_arcsec': round(float(error.mean()), 4)
+            }
+        report[name] = body_report
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'report'):
+        print(json.dumps({'error': 'Incorrect arguments. Required: build|report [path]'}))
+        sys.exit(1)
+
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+    if sys.argv[1] == 'build':
+        print(json.dumps({'success': True, 'path': build_table(path),
+                          'bytes': os.path.getsize(path)}))
+    else:
+        print(json.dumps(tolerance_report(EphemerisTable(path)), indent=2))
@@ -0,0 +1,309 @@
+import sys
+import json
+import os
+import time
+import sqlite3
+import importlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+# Multi-core executor for chart computation.
+#
+# Work is fanned out over a process pool whose workers import ephem,
+# reportlab and the precomputed tables once, at start-up. Items are sent in
+# chunks whose size adapts to measured cost: a chunk should take about
+# TARGET_CHUNK_SECONDS, and near the end chunks shrink so every worker
+# finishes at about the same time (guided scheduling).
+#
+# Dict results (calculate_astro, calculate_human_design, chart rendering)
+# have to be pickled back. The columnar path, compute_columns, avoids that:
+# inputs and outputs live in one shared memory block and tasks carry only
+# (start, stop).
+
+TASKS = {
+    'astro': ('astro_calculator', 'calculate_astro'),
+    'human_design': ('human_design', 'calculate_human_design'),
+    'chart': ('chart_generator', 'generate_hd_chart'),
+    'store_chart': ('executor', 'store_chart')
+}
+
+# Wall time a chunk should take once item cost is known
+TARGET_CHUNK_SECONDS = 0.25
+
+# Chunk size before any timing is available
+INITIAL_CHUNK = 4
+
+MAX_CHUNK = 2048
+
+# Chunks in flight per worker
+QUEUE_DEPTH = 2
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                               'data', 'astro_guide.db')
+
+
+def _warm_worker():
+    # Pay for imports and table loading once per process, not per task
+    for module_name, _ in TASKS.values():
+        importlib.import_module(module_name)
+    from astro_calculator import warm_up as warm_astro
+    from chart_generator import warm_up as warm_charts
+    warm_astro()
+    warm_charts()
+    from ephemeris_table import get_default_table
+    from lunation_table import get_default_table as get_lunation_table
+    get_default_table()
+    get_lunation_table()
+
+
+def _run_chunk(kind, chunk):
+    module_name, function_name = TASKS[kind]
+    function = getattr(importlib.import_module(module_name), function_name)
+    start = time.perf_counter()
+    results = []
+    for args in chunk:
+        try:
+            results.append(function(*args))
+        except Exception as e:
+            results.append({'error': str(e)})
+    return results, time.perf_counter() - start
+
+
+# Column layout of the shared block used by compute_columns
+_COLUMNS = (
+    ('dates', 'S10', ()),
+    ('times', 'S5', ()),
+    ('latitudes', '<f8', ()),
+    ('longitudes', '<f8', ()),
+    ('body_longitudes', '<f8', (10,)),
+    ('houses', '<f8', (12,)),
+    ('failed', '?', ())
+)
+
+_attached = {}
+
+# ChartStore per charts directory, kept by each worker between tasks
+_stores = {}
+
+
+def store_chart(hd_data, astro_data, user_name, directory):
+    """Render a chart into the content-addressed store in directory."""
+    from chart_store import ChartStore
+    from chart_generator import render_hd_chart
+    store = _stores.get(directory)
+    if store is None:
+        store = _stores[directory] = ChartStore(directory)
+    return store.get_or_render(hd_data, astro_data, user_name, render_hd_chart)
+
+
+def _layout(count):
+    # Byte offset of each column in the shared block, and the block size
+    offsets = {}
+    size = 0
+    for name, dtype, shape in _COLUMNS:
+        offsets[name] = size
+        nbytes = count * int(np.prod(shape, dtype=int)) * np.dtype(dtype).itemsize
+        size += nbytes + (-nbytes) % 8
+    return offsets, size
+
+
+def _shared_arrays(buffer, count):
+    # Carve the shared block into named arrays
+    offsets, _ = _layout(count)
+    return {
+        name: np.ndarray((count,) + shape, dtype=dtype, buffer=buffer, offset=offsets[name])
+        for name, dtype, shape in _COLUMNS
+    }
+
+
+def _attach(name, count):
+    # Workers keep the current block attached between tasks
+    if name not in _attached:
+        while _attached:
+            _, entry = _attached.popitem()
+            block = entry[0]
+            del entry
+            block.close()
+        block = shared_memory.SharedMemory(name=name)
+        _attached[name] = (block, _shared_arrays(block.buf, count))
+    return _attached[name][1]
+
+
+def _run_columns(name, count, start, stop, use_ephemeris_table):
+    from astro_calculator import calculate_astro_batch
+    began = time.perf_counter()
+    arrays = _attach(name, count)
+    batch = calculate_astro_batch({
+        'dates': [value.decode() for value in arrays['dates'][start:stop]],
+        'times': [value.decode() for value in arrays['times'][start:stop]],
+        'latitudes': arrays['latitudes'][start:stop],
+        'longitudes': arrays['longitudes'][start:stop]
+    }, use_ephemeris_table=use_ephemeris_table)
+    arrays['body_longitudes'][start:stop] = batch['longitudes']
+    arrays['houses'][start:stop] = batch['houses']
+    arrays['failed'][start:stop] = [error is not None for error in batch['errors']]
+    return None, time.perf_counter() - began
+
+
+class ChartExecutor:
+    """Process pool for chart computation.
+
+    Args:
+        workers (int): Worker processes; defaults to every core
+        progress: Optional callable(done, total), called as chunks finish
+    """
+
+    def __init__(self, workers=None, progress=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        # Workers must share the parent's resource tracker, or each one would
+        # try to unlink shared blocks it merely attached to
+        resource_tracker.ensure_running()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def _schedule(self, total, submit):
+        # Adaptive chunking: submit(start, stop) returns a future resolving
+        # to (results, seconds); results are yielded as (start, results)
+        next_start = 0
+        done = 0
+        busy_seconds = 0.0
+        timed_items = 0
+        pending = {}
+        while next_start < total or pending:
+            while next_start < total and len(pending) < self.workers * QUEUE_DEPTH:
+                if timed_items:
+                    size = TARGET_CHUNK_SECONDS * timed_items / max(busy_seconds, 1e-9)
+                else:
+                    size = INITIAL_CHUNK
+                # Guided: never take more than a fair share of what is left
+                fair = -(-(total - next_start) // (self.workers * QUEUE_DEPTH))
+                size = int(max(1, min(size, fair, MAX_CHUNK)))
+                stop = min(total, next_start + size)
+                pending[submit(next_start, stop)] = (next_start, stop)
+                next_start = stop
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, stop = pending.pop(future)
+                results, seconds = future.result()
+                busy_seconds += seconds
+                timed_items += stop - start
+                done += stop - start
+                if self.progress:
+                    self.progress(done, total)
+                yield start, results
+
+    def map(self, kind, items):
+        """Run one of TASKS over argument tuples, returning results in order.
+
+        Failures become {'error': ...} dicts in place of the result.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        for start, chunk in self._schedule(
+                len(items), lambda a, b: self._pool.submit(_run_chunk, kind, items[a:b])):
+            results[start:start + len(chunk)] = chunk
+        return results
+
+    def compute_columns(self, records, use_ephemeris_table=False):
+        """Body longitudes and house cusps for many records, without pickling.
+
+        records are (date, time, lat, lng) rows with 'YYYY-MM-DD' dates and
+        'HH:MM' times. Returns 'longitudes'
+        (N, 10), 'houses' (N, 12) and a boolean 'failed' mask; failed rows
+        are NaN.
+        """
+        count = len(records)
+        if count == 0:
+            return {'longitudes': np.empty((0, 10)), 'houses': np.empty((0, 12)),
+                    'failed': np.empty(0, dtype=bool)}
+        block = shared_memory.SharedMemory(create=True, size=_layout(count)[1])
+        arrays = _shared_arrays(block.buf, count)
+        try:
+            dates, times, latitudes, longitudes = zip(*records)
+            arrays['dates'][:] = [str(value).encode()[:10] for value in dates]
+            arrays['times'][:] = [str(value).encode()[:5] for value in times]
+            arrays['latitudes'][:] = latitudes
+            arrays['longitudes'][:] = longitudes
+            for _ in self._schedule(count, lambda a, b: self._pool.submit(
+                    _run_columns, block.name, count, a, b, use_ephemeris_table)):
+                pass
+            return {
+                'longitudes': arrays['body_longitudes'].copy(),
+                'houses': arrays['houses'].copy(),
+                'failed': arrays['failed'].copy()
+            }
+        finally:
+            del arrays
+            block.close()
+            block.unlink()
+
+
+def regenerate_users(db_path=DEFAULT_DB_PATH, workers=None, progress=None, charts=True):
+    """Recompute astro and Human Design data (and chart PDFs) for every user.
+
+    Charts go through the content-addressed ChartStore, so each user's
+    chart_url is updated to the key of the new input.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        rows = connection.execute(
+            'SELECT id, name, birthday, birthtime, lat, lng, chart_url FROM users ORDER BY id').fetchall()
+        args = [(birthday, birthtime, lat or 0.0, lng or 0.0) for _, _, birthday, birthtime, lat, lng, _ in rows]
+        with ChartExecutor(workers, progress) as executor:
+            astro = executor.map('astro', args)
+            human_design = executor.map('human_design', args)
+            charts_dir = os.path.join(os.path.dirname(db_path), 'charts')
+            chart_users = [
+                index for index, ((*_, chart_url), astro_data, hd) in enumerate(zip(rows, astro, human_design))
+                if charts and chart_url and 'error' not in astro_data and 'error' not in hd
+            ]
+            chart_jobs = [(human_design[index], astro[index], rows[index][1], charts_dir)
+                          for index in chart_users]
+            rendered = executor.map('store_chart', chart_jobs) if chart_jobs else []
+        chart_urls = {index: f"/charts/{result['filename']}"
+                      for index, result in zip(chart_users, rendered) if 'error' not in result}
+
+        updated = 0
+        for index, ((user_id, *_, chart_url), astro_data, hd) in enumerate(zip(rows, astro, human_design)):
+            if 'error' in astro_data or 'error' in hd:
+                continue
+            connection.execute('UPDATE users SET astro_data = ?, hd_data = ?, chart_url = ? WHERE id = ?',
+                               (json.dumps(astro_data), json.dumps(hd), chart_urls.get(index, chart_url),
+                                user_id))
+            updated += 1
+        connection.commit()
+    finally:
+        connection.close()
+    return {
+        'users': len(rows),
+        'updated': updated,
+        'charts': len(chart_urls)
+    }
+
+
+def print_progress(done, total):
+    sys.stderr.write(f'\r{done}/{total}')
+    if done == total:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'regenerate' or len(sys.argv) > 4:
+        print(json.dumps({'error': 'Incorrect arguments. Required: regenerate [db_path] [workers]'}))
+        sys.exit(1)
+
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DB_PATH
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    print(json.dumps(regenerate_users(db_path, workers, print_progress)))
@@ -0,0 +1,227 @@
+import sys
+import json
+import math
+from functools import lru_cache
+import ephem
+import numpy as np
+from astro_calculator import BODY_NAMES, parse_birth_datetime, setup_observer
+from ephemeris_table import get_default_table
+
+# Human Design gate and line activations from planetary positions.
+#
+# The Rave mandala divides the ecliptic into 64 gates of 5.625 degrees, each
+# split into 6 lines of 0.9375 degrees, starting with gate 41 at 302 degrees.
+# Activations are taken from apparent geocentric longitudes for two instants:
+# the birth (personality) and the moment the Sun stood 88 degrees earlier
+# (design). Longitudes come from the precomputed ephemeris table in one
+# vectorized pass where it covers the dates, and from ephem otherwise.
+
+# Gates in mandala order, starting at MANDALA_START
+MANDALA_ORDER = (
+    41, 19, 13, 49, 30, 55, 37, 63, 22, 36, 25, 17, 21, 51, 42, 3,
+    27, 24, 2, 23, 8, 20, 16, 35, 45, 12, 15, 52, 39, 53, 62, 56,
+    31, 33, 7, 4, 29, 59, 40, 64, 47, 6, 46, 18, 48, 57, 32, 50,
+    28, 44, 1, 43, 14, 34, 9, 5, 26, 11, 10, 58, 38, 54, 61, 60
+)
+
+MANDALA_START = 302.0
+GATE_WIDTH = 360 / 64
+LINE_WIDTH = GATE_WIDTH / 6
+
+# Solar arc between the design and personality instants
+DESIGN_ARC = 88.0
+
+# Activations in the usual Human Design order
+ACTIVATION_NAMES = ('Sun', 'Earth', 'North Node', 'South Node', 'Moon', 'Mercury', 'Venus',
+                    'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto')
+
+# Mean daily motion of the Sun, used for the solver's first step
+SUN_SPEED = 0.9856474
+
+# Design solver tolerance in degrees of solar longitude (under 0.1 s of time)
+SOLAR_TOLERANCE = 1e-6
+MAX_ITERATIONS = 8
+
+
+def _wheel_table():
+    # Start longitude (0..360) of every line, sorted, with its gate and line.
+    # The line straddling 0 degrees is split so the table is bisectable.
+    starts = (MANDALA_START + LINE_WIDTH * np.arange(64 * 6)) % 360
+    gates = np.repeat(np.array(MANDALA_ORDER, dtype=np.int8), 6)
+    lines = np.tile(np.arange(1, 7, dtype=np.int8), 64)
+    order = np.argsort(starts, kind='stable')
+    starts, gates, lines = starts[order], gates[order], lines[order]
+    if starts[0] > 0:
+        # Longitudes below the first start belong to the last line
+        starts = np.concatenate([[0.0], starts])
+        gates = np.concatenate([gates[-1:], gates])
+        lines = np.concatenate([lines[-1:], lines])
+    return starts, gates, lines
+
+
+WHEEL_STARTS, WHEEL_GATES, WHEEL_LINES = _wheel_table()
+
+
+def gate_activations(longitudes):
+    """Gate and line for longitudes in degrees, elementwise.
+
+    Returns (gates, lines) as int8 arrays shaped like longitudes.
+    """
+    slot = np.searchsorted(WHEEL_STARTS, np.asarray(longitudes, dtype=float) % 360, side='right') - 1
+    return WHEEL_GATES[slot], WHEEL_LINES[slot]
+
+
+def _ephem_geocentric(date):
+    # Apparent geocentric ecliptic longitudes of date for the table bodies
+    longitudes = []
+    for name in BODY_NAMES:
+        body = getattr(ephem, name)()
+        body.compute(date)
+        equatorial = ephem.Equatorial(body.g_ra, body.g_dec, epoch=date)
+        longitudes.append(math.degrees(ephem.Ecliptic(equatorial, epoch=date).lon))
+    return longitudes
+
+
+def geocentric_longitudes(dates):
+    """(N, 10) apparent geocentric longitudes in BODY_NAMES order."""
+    dates = np.atleast_1d(np.asarray(dates, dtype=float))
+    result = np.empty((len(dates), len(BODY_NAMES)))
+    table = get_default_table()
+    covered = np.zeros(len(dates), dtype=bool)
+    if table is not None:
+        covered = (dates >= table.start) & (dates < table.end)
+        if covered.any():
+            result[covered] = table.longitudes_batch(dates[covered], 'glong')
+    for i in np.nonzero(~covered)[0]:
+        result[i] = _ephem_geocentric(dates[i])
+    return result % 360
+
+
+def _sun_longitudes(dates):
+    table = get_default_table()
+    if table is not None and dates.min() >= table.start and dates.max() < table.end:
+        return table.longitudes_batch(dates, 'glong')[:, 0]
+    sun = ephem.Sun()
+    longitudes = np.empty(len(dates))
+    for i, date in enumerate(dates):
+        sun.compute(date)
+        equatorial = ephem.Equatorial(sun.g_ra, sun.g_dec, epoch=date)
+        longitudes[i] = math.degrees(ephem.Ecliptic(equatorial, epoch=date).lon)
+    return longitudes
+
+
+def mean_lunar_node(dates):
+    """Mean longitude of the Moon's ascending node (Meeus 47.7), degrees."""
+    centuries = (np.asarray(dates, dtype=float) + 2415020.0 - 2451545.0) / 36525
+    return (125.0445479 - 1934.1362891 * centuries + 0.0020754 * centuries ** 2
+            + centuries ** 3 / 467441 - centuries ** 4 / 60616000) % 360
+
+
+def _wrap(degrees):
+    return (degrees + 180) % 360 - 180
+
+
+def design_dates(birth_dates):
+    """Instants when the Sun stood DESIGN_ARC degrees before each birth.
+
+    Vectorized secant iteration on the solar longitude; the Sun's motion is
+    nearly linear over a few days, so it converges in three or four
+    evaluations.
+    """
+    birth_dates = np.atleast_1d(np.asarray(birth_dates, dtype=float))
+    if birth_dates.size == 0:
+        return birth_dates
+    target = _sun_longitudes(birth_dates) - DESIGN_ARC
+    t0 = birth_dates - DESIGN_ARC / SUN_SPEED
+    f0 = _wrap(_sun_longitudes(t0) - target)
+    t1 = t0 - f0 / SUN_SPEED
+    f1 = _wrap(_sun_longitudes(t1) - target)
+    for _ in range(MAX_ITERATIONS):
+        active = np.abs(f1) > SOLAR_TOLERANCE
+        if not active.any():
+            break
+        slope = np.where(f1 != f0, (f1 - f0) / np.where(t1 != t0, t1 - t0, 1), SUN_SPEED)
+        t2 = np.where(active, t1 - f1 / slope, t1)
+        f2 = f1.copy()
+        f2[active] = _wrap(_sun_longitudes(t2[active]) - target[active])
+        t0, f0, t1, f1 = t1, f1, t2, f2
+    return t1
+
+
+@lru_cache(maxsize=65536)
+def design_date(birth_date):
+    """Cached design instant for a single ephem date."""
+    return float(design_dates([birth_date])[0])
+
+
+def activation_longitudes(dates):
+    """(N, 13) longitudes of the Human Design activations, ACTIVATION_NAMES order."""
+    dates = np.atleast_1d(np.asarray(dates, dtype=float))
+    planets = geocentric_longitudes(dates)
+    node = mean_lunar_node(dates)
+    sun = planets[:, 0]
+    return np.column_stack([
+        sun, (sun + 180) % 360, node, (node + 180) % 360,
+        planets[:, 1:]
+    ])
+
+
+def compute_activations(birth_dates, designs=None):
+    """Personality and design activations for many charts at once.
+
+    Args:
+        birth_dates: ephem dates (UTC) of the births
+        designs: Design instants, if already known; solved otherwise
+
+    Returns:
+        Dict with 'designDates' (N,), and 'personality' and 'design', each a
+        dict of 'longitudes' (N, 13), 'gates' and 'lines' (N, 13 int8) in
+        ACTIVATION_NAMES order.
+    """
+    birth_dates = np.atleast_1d(np.asarray(birth_dates, dtype=float))
+    designs = design_dates(birth_dates) if designs is None else np.atleast_1d(np.asarray(designs, dtype=float))
+    result = {'designDates': designs}
+    for name, dates in (('personality', birth_dates), ('design', designs)):
+        longitudes = activation_longitudes(dates)
+        gates, lines = gate_activations(longitudes)
+        result[name] = {'longitudes': longitudes, 'gates': gates, 'lines': lines}
+    return result
+
+
+def activation_dict(activations, index=0):
+    """One chart of compute_activations in JSON form."""
+    chart = {}
+    for side in ('personality', 'design'):
+        gates = activations[side]['gates'][index].tolist()
+        lines = activations[side]['lines'][index].tolist()
+        chart[side] = {
+            name: {'gate': gate, 'line': line, 'activation': f'{gate}.{line}'}
+            for name, gate, line in zip(ACTIVATION_NAMES, gates, lines)
+        }
+    active = set(activations['personality']['gates'][index].tolist())
+    active.update(activations['design']['gates'][index].tolist())
+    chart['gates'] = sorted(active)
+    chart['designDate'] = ephem.Date(activations['designDates'][index]).datetime().strftime("%Y-%m-%d %H:%M")
+    return chart
+
+
+def calculate_gates(birth_date_str, birth_time_str):
+    """Gate activations for one birth (UTC date and time strings)."""
+    try:
+        birth_datetime = parse_birth_datetime(birth_date_str, birth_time_str)
+        date = float(setup_observer(ephem.Observer(), birth_datetime).date)
+        activations = compute_activations([date], [design_date(date)])
+        return activation_dict(activations)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time'}))
+        sys.exit(1)
+
+    result = calculate_gates(sys.argv[1], sys.argv[2])
+    print(json.dumps(result))
+    if 'error' in result:
+        sys.exit(1)
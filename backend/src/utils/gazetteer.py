@@ -0,0 +1,225 @@
+import sys
+import json
+import os
+import mmap
+from collections.abc import Mapping
+import numpy as np
+
+# Compact columnar gazetteer.
+#
+# cities.json becomes one binary file that every worker memory-maps, so
+# opening it costs a few page faults instead of parsing JSON into dicts, and
+# the pages are shared by all processes through the OS cache. Records are
+# sorted by (country, name), which makes every country a contiguous range.
+#
+# File layout: b'GAZT', uint32 header length, JSON header (country table,
+# array offsets), zero padding to 8 bytes, then little-endian arrays:
+# lat/lng/population float32, country index uint16, name offsets uint32
+# (N + 1) into a UTF-8 name blob, and a name-sorted permutation uint32 used
+# for exact lookups by binary search.
+
+MAGIC = b'GAZT'
+VERSION = 1
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+DEFAULT_JSON_PATH = os.path.join(DATA_DIR, 'cities.json')
+DEFAULT_PATH = os.path.join(DATA_DIR, 'cities.bin')
+
+# Coordinates are stored as float32 (about 1 m resolution); they are rounded
+# on the way out so 40.7128 reads back as 40.7128
+COORDINATE_DECIMALS = 5
+
+ARRAYS = (
+    ('lat', '<f4'),
+    ('lng', '<f4'),
+    ('population', '<f4'),
+    ('country', '<u2'),
+    ('name_offsets', '<u4'),
+    ('name_order', '<u4'),
+    ('names', 'u1')
+)
+
+
+def encode_cities(cities):
+    """Serialize a {name: {'country', 'lat', 'lng'[, 'population']}} dict."""
+    records = sorted(cities.items(), key=lambda item: (item[1]['country'], item[0]))
+    countries = sorted({data['country'] for _, data in records})
+    country_index = {country: i for i, country in enumerate(countries)}
+
+    encoded = [name.encode('utf-8') for name, _ in records]
+    offsets = np.zeros(len(records) + 1, dtype='<u4')
+    offsets[1:] = np.cumsum([len(name) for name in encoded])
+    columns = {
+        'lat': np.array([data['lat'] for _, data in records], dtype='<f4'),
+        'lng': np.array([data['lng'] for _, data in records], dtype='<f4'),
+        'population': np.array([data.get('population', 0) for _, data in records], dtype='<f4'),
+        'country': np.array([country_index[data['country']] for _, data in records], dtype='<u2'),
+        'name_offsets': offsets,
+        'name_order': np.array(sorted(range(len(records)), key=lambda i: encoded[i]), dtype='<u4'),
+        'names': np.frombuffer(b''.join(encoded), dtype='u1')
+    }
+
+    # Country i occupies records [ranges[i], ranges[i + 1])
+    counts = np.bincount(columns['country'], minlength=len(countries))
+    ranges = [0] + np.cumsum(counts).tolist()
+
+    header = {'version': VERSION, 'count': len(records), 'countries': countries,
+              'country_ranges': ranges, 'arrays': {}}
+    body = []
+    offset = 0
+    for name, dtype in ARRAYS:
+        data = columns[name].astype(dtype).tobytes()
+        header['arrays'][name] = offset
+        body.append(data + b'\0' * ((-len(data)) % 8))
+        offset += len(body[-1])
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    prefix = len(MAGIC) + 4 + len(header_bytes)
+    return b''.join([MAGIC, np.uint32(len(header_bytes)).tobytes(), header_bytes,
+                     b'\0' * ((-prefix) % 8)] + body)
+
+
+def build_gazetteer(json_path=DEFAULT_JSON_PATH, path=DEFAULT_PATH):
+    """Convert a cities JSON file into the binary gazetteer format."""
+    with open(json_path, 'r') as f:
+        cities = json.load(f)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(encode_cities(cities))
+    return path
+
+
+class Gazetteer:
+    """Read-only columnar view over an encoded gazetteer.
+
+    Args:
+        source: Path of a file written by build_gazetteer (memory-mapped), or
+            the bytes returned by encode_cities
+    """
+
+    def __init__(self, source=DEFAULT_PATH):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._buffer = source
+            self.path = None
+        else:
+            with open(source, 'rb') as f:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.path = source
+        if bytes(self._buffer[:4]) != MAGIC:
+            raise ValueError(f'Not a gazetteer file: {source if self.path else "<bytes>"}')
+        header_length = int(np.frombuffer(self._buffer, dtype='<u4', count=1, offset=4)[0])
+        header = json.loads(bytes(self._buffer[8:8 + header_length]).decode('utf-8'))
+        if header['version'] != VERSION:
+            raise ValueError(f"Unsupported gazetteer version: {header['version']}")
+        data_start = 8 + header_length + (-(8 + header_length)) % 8
+
+        count = header['count']
+        self.countries = tuple(header['countries'])
+        self._country_ranges = header['country_ranges']
+        self._country_index = {country: i for i, country in enumerate(self.countries)}
+
+        def array(name, dtype, length):
+            return np.frombuffer(self._buffer, dtype=dtype, count=length,
+                                 offset=data_start + header['arrays'][name])
+
+        self.lat = array('lat', '<f4', count)
+        self.lng = array('lng', '<f4', count)
+        self.population = array('population', '<f4', count)
+        self.country_ids = array('country', '<u2', count)
+        self.name_offsets = array('name_offsets', '<u4', count + 1)
+        self.name_order = array('name_order', '<u4', count)
+        self.names = array('names', 'u1', int(self.name_offsets[-1]))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def name(self, index):
+        return bytes(self.names[self.name_offsets[index]:self.name_offsets[index + 1]]).decode('utf-8')
+
+    def all_names(self):
+        """Every name in record order (decodes the whole blob)."""
+        blob = bytes(self.names)
+        offsets = self.name_offsets.tolist()
+        return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(self))]
+
+    def find(self, name):
+        """Record index of an exact name, or None."""
+        key = name.encode('utf-8')
+        order = self.name_order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            index = int(order[middle])
+            if bytes(self.names[self.name_offsets[index]:self.name_offsets[index + 1]]) < key:
+                lo = middle + 1
+            else:
+                hi = middle
+        if lo < len(order) and self.name(int(order[lo])) == name:
+            return int(order[lo])
+        return None
+
+    def record(self, index):
+        """The cities.json entry of one record."""
+        record = {
+            'country': self.countries[self.country_ids[index]],
+            'lat': round(float(self.lat[index]), COORDINATE_DECIMALS),
+            'lng': round(float(self.lng[index]), COORDINATE_DECIMALS)
+        }
+        if self.population[index]:
+            record['population'] = int(self.population[index])
+        return record
+
+    def country_range(self, country):
+        """(start, stop) record range of one country; empty if unknown."""
+        i = self._country_index.get(country)
+        if i is None:
+            return 0, 0
+        return self._country_ranges[i], self._country_ranges[i + 1]
+
+    def country(self, index):
+        return self.countries[self.country_ids[index]]
+
+
+class CityMapping(Mapping):
+    """Read-only {name: record} view over a Gazetteer, decoded on access."""
+
+    def __init__(self, gazetteer):
+        self.gazetteer = gazetteer
+
+    def __getitem__(self, name):
+        index = self.gazetteer.find(name)
+        if index is None:
+            raise KeyError(name)
+        return self.gazetteer.record(index)
+
+    def __iter__(self):
+        return (self.gazetteer.name(i) for i in range(len(self.gazetteer)))
+
+    def __len__(self):
+        return len(self.gazetteer)
+
+
+def open_gazetteer(path=DEFAULT_PATH, json_path=DEFAULT_JSON_PATH):
+    """Memory-map the binary gazetteer, or encode cities.json in memory when
+    the binary file is missing or older than the JSON."""
+    if os.path.exists(path) and (not os.path.exists(json_path) or
+                                 os.path.getmtime(path) >= os.path.getmtime(json_path)):
+        return Gazetteer(path)
+    with open(json_path, 'r') as f:
+        return Gazetteer(encode_cities(json.load(f)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: json_path output_path'}))
+        sys.exit(1)
+
+    json_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_JSON_PATH
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+    try:
+        build_gazetteer(json_path, path)
+        print(json.dumps({'success': True, 'path': path, 'records': len(Gazetteer(path)),
+                          'bytes': os.path.getsize(path)}))
+    except Exception as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
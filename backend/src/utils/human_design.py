@@ -3,7 +3,12 @@ import json
 import random
 from datetime import datetime
 
-def calculate_human_design(birth_date_str, birth_time_str, latitude, longitude):
+# Threads used by calculate_human_design_batch
+DEFAULT_THREADS = 8
+
+def calculate_human_design(birth_date_str, birth_time_str, latitude, longitude, method='legacy'):
+    if method == 'mandala':
+        return calculate_mandala_design(birth_date_str, birth_time_str)
     try:
         # Parse date and time
         birth_datetime = datetime.strptime(f"{birth_date_str} {birth_time_str}", "%Y-%m-%d %H:%M")
@@ -15,9 +20,11 @@ def calculate_human_design(birth_date_str, birth_time_str, latitude, longitude):
         definitions = ['Single', 'Split', 'Triple Split', 'Quad Split']
         centers = ['Head', 'Ajna', 'Throat', 'G', 'Heart', 'Solar Plexus', 'Sacral', 'Spleen', 'Root']
         
-        # Create a seed value from the birth date and location
+        # Create a seed value from the birth date and location. Each call
+        # gets its own generator (same sequence as random.seed(seed)), so
+        # concurrent calls never share state.
         seed = int(birth_datetime.timestamp()) + int(latitude * 100) + int(longitude * 100)
-        random.seed(seed)
+        rng = random.Random(seed)
         
         # Select random but deterministic values
         hd_type = types[seed % len(types)]
@@ -43,13 +50,13 @@ def calculate_human_design(birth_date_str, birth_time_str, latitude, longitude):
         # Generate random "activated" gates (1-64)
         num_gates = 15 + seed % 10  # Between 15 and 24 gates
         all_gates = list(range(1, 65))
-        random.shuffle(all_gates)
+        rng.shuffle(all_gates)
         gates = sorted(all_gates[:num_gates])
         
         # Determine activated centers based on gates
         activated_centers = []
         for center in centers:
-            if random.random() < 0.5:  # 50% chance for each center
+            if rng.random() < 0.5:  # 50% chance for each center
                 activated_centers.append(center)
         
         # Return the data
@@ -67,9 +74,64 @@ def calculate_human_design(birth_date_str, birth_time_str, latitude, longitude):
     except Exception as e:
         return {'error': str(e), 'type': 'Unknown', 'authority': 'Unknown'}
 
+def calculate_mandala_design(birth_date_str, birth_time_str):
+    """Human Design from real gate activations and the channel graph.
+
+    The birth date and time are UTC; location does not enter the chart.
+    """
+    try:
+        import numpy as np
+        import ephem
+        from astro_calculator import parse_birth_datetime, setup_observer
+        from gate_engine import compute_activations, design_date
+        from bodygraph import evaluate, gate_masks, bodygraph_dict
+
+        birth_datetime = parse_birth_datetime(birth_date_str, birth_time_str)
+        date = float(setup_observer(ephem.Observer(), birth_datetime).date)
+        activations = compute_activations([date], [design_date(date)])
+        personality = activations['personality']
+        design = activations['design']
+        graph = bodygraph_dict(evaluate(gate_masks(np.hstack([personality['gates'], design['gates']]))))
+
+        return {
+            'type': graph['type'],
+            'authority': graph['authority'],
+            'profile': f"{personality['lines'][0, 0]}/{design['lines'][0, 0]}",
+            'definition': graph['definition'],
+            'gates': sorted(set(personality['gates'][0].tolist()) | set(design['gates'][0].tolist())),
+            'centers': graph['centers'],
+            'channels': graph['channels']
+        }
+    except Exception as e:
+        return {'error': str(e), 'type': 'Unknown', 'authority': 'Unknown'}
+
+def calculate_human_design_batch(records, threads=DEFAULT_THREADS):
+    """Calculate many charts on a thread pool.
+
+    records is a sequence of (birth_date, birth_time, latitude, longitude)
+    rows; results come back in the same order. calculate_human_design keeps
+    no shared state, so no locking is needed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda record: calculate_human_design(*record), records))
+
 if __name__ == "__main__":
+    # Bulk mode: NDJSON records on stdin (or a file), one result line each
+    if len(sys.argv) > 1 and sys.argv[1] == '--stream':
+        from stream_cli import stream_main
+        try:
+            stream_main('human_design', 'calculate_human_design', sys.argv[2:])
+        except (ValueError, IndexError) as e:
+            print(json.dumps({'error': f'Incorrect arguments. Usage: --stream [input_path] [--workers N] ({str(e)})'}))
+            sys.exit(1)
+        except OSError as e:
+            print(json.dumps({'error': f'Cannot read input: {str(e)}'}))
+            sys.exit(1)
+        sys.exit(0)
+    
     if len(sys.argv) != 5:
-        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time latitude longitude'}))
+        print(json.dumps({'error': 'Incorrect arguments. Required: birth_date birth_time latitude longitude, or --stream [input_path] [--workers N]'}))
         sys.exit(1)
     
     birth_date = sys.argv[1]
@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Opt-in stage timers and call counters for the calculation and rendering
+# paths.
+#
+# Off unless enable() is called or ASTRO_INSTRUMENTATION=1 is set in the
+# environment (worker processes inherit it from the server). While off,
+# stage() hands back one shared no-op context manager and count() returns
+# after a single flag check, so instrumented code costs well under a
+# microsecond per stage.
+#
+# While on, every stage is recorded in a per-name histogram of seconds and
+# every count() in a per-name counter, both process-wide. trace() also
+# collects the stages run by the current thread into a breakdown for one
+# result. Stages are inclusive: a stage named 'a.b' runs inside stage 'a'.
+# export_text() renders the histograms and counters in the Prometheus text
+# exposition format.
+
+enabled = os.environ.get('ASTRO_INSTRUMENTATION', '') not in ('', '0')
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# name -> [bucket counts (len(BUCKETS) + 1, the last being +Inf), sum, count]
+_histograms = {}
+_counters = {}
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Forget every recorded stage and counter."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(name, seconds):
+    """Record one run of a stage (normally done by stage())."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect_left(BUCKETS, seconds)] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+    breakdown = getattr(_local, 'breakdown', None)
+    if breakdown is not None:
+        breakdown[name] = breakdown.get(name, 0.0) + seconds
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Context manager timing one stage; a shared no-op while disabled."""
+    if not enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def count(name, value=1):
+    """Add value to a counter; nothing while disabled."""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class trace:
+    """Collect the stages this thread runs into a breakdown for one result.
+
+    Used as `with trace() as timings:`; afterwards timings maps each stage
+    name, and 'total', to milliseconds. Nested traces add to the outermost
+    one and leave their own dict empty. While disabled only 'total' is set.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._outer = False
+
+    def __enter__(self):
+        if getattr(_local, 'breakdown', None) is None:
+            _local.breakdown = {}
+            self._outer = True
+        self.start = time.perf_counter()
+        return self.timings
+
+    def __exit__(self, *exc_info):
+        total = time.perf_counter() - self.start
+        if self._outer:
+            breakdown = _local.breakdown
+            _local.breakdown = None
+            self.timings.update((name, round(seconds * 1000, 3)) for name, seconds in breakdown.items())
+            self.timings['total'] = round(total * 1000, 3)
+        return False
+
+
+def snapshot():
+    """Copy of the recorded histograms and counters as plain data."""
+    with _lock:
+        return {
+            'buckets': list(BUCKETS),
+            'stages': {name: {'buckets': list(counts), 'sum': total, 'count': calls}
+                       for name, (counts, total, calls) in _histograms.items()},
+            'counters': dict(_counters)
+        }
+
+
+def merge(snapshots):
+    """Add up snapshots from several processes (same BUCKETS)."""
+    merged = {'buckets': list(BUCKETS), 'stages': {}, 'counters': {}}
+    for data in snapshots:
+        for name, histogram in data['stages'].items():
+            target = merged['stages'].setdefault(
+                name, {'buckets': [0] * (len(BUCKETS) + 1), 'sum': 0.0, 'count': 0})
+            target['buckets'] = [a + b for a, b in zip(target['buckets'], histogram['buckets'])]
+            target['sum'] += histogram['sum']
+            target['count'] += histogram['count']
+        for name, value in data['counters'].items():
+            merged['counters'][name] = merged['counters'].get(name, 0) + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def export_text(data=None, prefix='astro'):
+    """Prometheus text exposition of a snapshot (this process by default).
+
+    Stages become one histogram, <prefix>_stage_seconds, labelled by stage;
+    counters become <prefix>_calls_total, labelled by name.
+    """
+    data = data if data is not None else snapshot()
+    bounds = [repr(float(bound)) for bound in data['buckets']] + ['+Inf']
+    lines = [
+        f'# HELP {prefix}_stage_seconds Time spent in each instrumented stage.',
+        f'# TYPE {prefix}_stage_seconds histogram'
+    ]
+    for name in sorted(data['stages']):
+        histogram = data['stages'][name]
+        label = _escape(name)
+        cumulative = 0
+        for bound, bucket in zip(bounds, histogram['buckets']):
+            cumulative += bucket
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {histogram["sum"]!r}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {histogram["count"]}')
+    lines.append(f'# HELP {prefix}_calls_total Calls counted by instrumented code.')
+    lines.append(f'# TYPE {prefix}_calls_total counter')
+    for name in sorted(data['counters']):
+        lines.append(f'{prefix}_calls_total{{name="{_escape(name)}"}} {data["counters"][name]}')
+    return '\n'.join(lines) + '\n'
@@ -1,21 +1,105 @@
-import json
 import os
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from gazetteer import CityMapping, Gazetteer, encode_cities, open_gazetteer
+from spatial_index import SphereKDTree
+from name_index import NameIndex
 
 class LocationUtils:
-    def __init__(self):
-        self.cities = self._load_cities()
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
+        """
+        Args:
+            gazetteer (Gazetteer): Cities to use instead of data/cities.bin
+        """
+        self.gazetteer = gazetteer if gazetteer is not None else self._load_gazetteer()
+        self.cities = CityMapping(self.gazetteer)
+        self._spatial_index = None
+        self._name_index = None
     
-    def _load_cities(self) -> Dict:
-        """Load cities data from JSON file."""
-        data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                                'data', 'cities.json')
+    def _load_gazetteer(self) -> Gazetteer:
+        """Memory-map data/cities.bin, falling back to data/cities.json."""
+        data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
         try:
-            with open(data_path, 'r') as f:
-                return json.load(f)
+            return open_gazetteer(os.path.join(data_dir, 'cities.bin'),
+                                  os.path.join(data_dir, 'cities.json'))
         except Exception as e:
             print(f"Error loading cities data: {str(e)}")
-            return {}
+            return Gazetteer(encode_cities({}))
+    
+    @property
+    def spatial_index(self) -> SphereKDTree:
+        """KD-tree used for reverse lookups, built on first use."""
+        if self._spatial_index is None:
+            self._spatial_index = SphereKDTree(self.gazetteer.lat, self.gazetteer.lng)
+        return self._spatial_index
+    
+    @property
+    def name_index(self) -> NameIndex:
+        """Type-ahead name index, built on first use."""
+        if self._name_index is None:
+            self._name_index = NameIndex(
+                self.gazetteer.all_names(),
+                [self.gazetteer.country(i) for i in range(len(self.gazetteer))],
+                self.gazetteer.population
+            )
+        return self._name_index
+    
+    def _city(self, index: int, **extra) -> Dict:
+        return dict(self.gazetteer.record(index), name=self.gazetteer.name(index), **extra)
+    
+    def _city_results(self, indices, distances) -> List[Dict]:
+        return [
+            self._city(index, distance_km=round(distance, 3))
+            for index, distance in zip(indices.tolist(), distances.tolist())
+        ]
+    
+    def nearest_cities(self, lat: float, lng: float, k: int = 1) -> List[Dict]:
+        """Find the k cities closest to a location.
+        
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of cities to return
+            
+        Returns:
+            List[Dict]: City data plus 'name' and great-circle 'distance_km', nearest first
+        """
+        return self._city_results(*self.spatial_index.nearest(lat, lng, k))
+    
+    def cities_within(self, lat: float, lng: float, radius_km: float) -> List[Dict]:
+        """Find every city within a radius of a location.
+        
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            radius_km (float): Search radius in kilometers
+            
+        Returns:
+            List[Dict]: City data plus 'name' and great-circle 'distance_km', nearest first
+        """
+        return self._city_results(*self.spatial_index.within(lat, lng, radius_km))
+    
+    def search_cities(self, query: str, k: int = 5, country: Optional[str] = None) -> List[Dict]:
+        """Type-ahead suggestions for a partial city name.
+        
+        Matches name prefixes (including later words, e.g. "york"), then
+        falls back to fuzzy matching for typos. A trailing ", country" in the
+        query narrows the results to that country.
+        
+        Args:
+            query (str): Partial city name as typed
+            k (int): Maximum number of suggestions
+            country (str): Optional country prefix filter (case insensitive)
+            
+        Returns:
+            List[Dict]: City data plus 'name', a 'label' such as "Paris, France",
+            'match' ('exact', 'prefix' or 'fuzzy') and 'score', best first
+        """
+        results = []
+        for index, match, score in self.name_index.search(query, k, country):
+            name = self.gazetteer.name(index)
+            results.append(self._city(index, label=f"{name.title()}, {self.gazetteer.country(index)}",
+                                      match=match, score=score))
+        return results
     
     def get_coordinates(self, city_name: str) -> Optional[Tuple[float, float]]:
         """Get latitude and longitude for a given city name.
@@ -51,7 +135,7 @@ class LocationUtils:
         Returns:
             Dict: Dictionary of all cities and their data
         """
-        return self.cities
+        return {self.gazetteer.name(i): self.gazetteer.record(i) for i in range(len(self.gazetteer))}
     
     def get_cities_by_country(self, country: str) -> Dict:
         """Get all cities in a specific country.
@@ -62,10 +146,9 @@ class LocationUtils:
         Returns:
             Dict: Dictionary of cities in the specified country
         """
-        return {
-            city: data for city, data in self.cities.items()
-            if data['country'] == country
-        }
+        # Records are sorted by country, so each country is one contiguous range
+        start, stop = self.gazetteer.country_range(country)
+        return {self.gazetteer.name(i): self.gazetteer.record(i) for i in range(start, stop)}
     
     def format_coordinates(self, lat: float, lng: float) -> str:
         """Format coordinates into a human-readable string.
@@ -94,4 +177,15 @@ if __name__ == "__main__":
     us_cities = location_utils.get_cities_by_country("USA")
     print("\nUS Cities:")
     for city, data in us_cities.items():
-        print(f"{city.title()}: {location_utils.format_coordinates(data['lat'], data['lng'])}") 
\ No newline at end of file
+        print(f"{city.title()}: {location_utils.format_coordinates(data['lat'], data['lng'])}")
+    
+    # Type-ahead suggestions, tolerant of typos
+    print("\nSuggestions for 'los ang' and 'tokio':")
+    for query in ("los ang", "tokio"):
+        for city in location_utils.search_cities(query, k=2):
+            print(f"{query}: {city['label']} ({city['match']})")
+    
+    # Snap a point in the English Channel to the closest known cities
+    print("\nNearest cities to 50.5°N, 1.0°E:")
+    for city in location_utils.nearest_cities(50.5, 1.0, k=3):
+        print(f"{city['name'].title()}: {city['distance_km']} km") 
\ No newline at end of file
@@ -0,0 +1,132 @@
+import sys
+import json
+import os
+import math
+from bisect import bisect_right
+import ephem
+import numpy as np
+
+# Precomputed lunation instants (new, first quarter, full, last quarter).
+#
+# ephem.next_full_moon / next_new_moon run an iterative search on every call.
+# The table holds every quarter instant from late 1899 to early 2101 as a
+# sorted array of ephem dates, starting with a new moon, so the phase kind of
+# entry i is i % 4. Lookups are a binary search.
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                            'data', 'lunations.npy')
+
+START_DATE = '1899/12/1'
+END_DATE = '2101/2/1'
+
+NEW, FIRST_QUARTER, FULL, LAST_QUARTER = range(4)
+
+_SEARCHES = (ephem.next_new_moon, ephem.next_first_quarter_moon,
+             ephem.next_full_moon, ephem.next_last_quarter_moon)
+
+
+def build_lunations(start=START_DATE, end=END_DATE):
+    """Return all quarter instants in [start, end) as a float64 array."""
+    date = ephem.next_new_moon(start)
+    end = ephem.Date(end)
+    instants = []
+    while date < end:
+        instants.append(float(date))
+        date = _SEARCHES[len(instants) % 4](date)
+    return np.array(instants)
+
+
+def moon_phase_name(percentage):
+    return ('New' if percentage < 25 else
+            'Waxing Crescent' if percentage < 50 else
+            'First Quarter' if percentage < 75 else
+            'Waxing Gibbous' if percentage < 100 else
+            'Full' if percentage < 125 else
+            'Waning Gibbous' if percentage < 150 else
+            'Last Quarter' if percentage < 175 else
+            'Waning Crescent')
+
+
+def _format_date(date):
+    return ephem.Date(date).datetime().strftime("%Y-%m-%d %H:%M")
+
+
+class LunationTable:
+    def __init__(self, instants):
+        self.instants = np.asarray(instants, dtype=float)
+        # Plain list for scalar bisect, which is faster than numpy for one value
+        self._instants = self.instants.tolist()
+        self.start = self._instants[0]
+        # The last lunation has no following new moon to answer "next new"
+        self.end = self._instants[-5]
+
+    def covers(self, date):
+        return self.start <= float(date) < self.end
+
+    def lookup(self, date):
+        """Return (percentage illuminated, next full, next new) for one date."""
+        date = float(date)
+        instants = self._instants
+        i = bisect_right(instants, date) - 1
+        # Elongation is interpolated linearly between the bracketing quarters
+        elongation = 90 * (i % 4 + (date - instants[i]) / (instants[i + 1] - instants[i]))
+        percentage = (1 - math.cos(math.radians(elongation))) * 50
+        next_full = instants[i + 1 + (FULL - i - 1) % 4]
+        next_new = instants[i + 1 + (NEW - i - 1) % 4]
+        return percentage, next_full, next_new
+
+    def lookup_batch(self, dates):
+        """Vectorized lookup; returns arrays of percentage, next full and next new."""
+        dates = np.asarray(dates, dtype=float)
+        instants = self.instants
+        i = np.searchsorted(instants, dates, side='right') - 1
+        elongation = 90 * (i % 4 + (dates - instants[i]) / (instants[i + 1] - instants[i]))
+        percentage = (1 - np.cos(np.radians(elongation))) * 50
+        next_full = instants[i + 1 + (FULL - i - 1) % 4]
+        next_new = instants[i + 1 + (NEW - i - 1) % 4]
+        return percentage, next_full, next_new
+
+    def moon_phase(self, date):
+        """Moon phase block in the format calculate_astro returns."""
+        percentage, next_full, next_new = self.lookup(date)
+        return {
+            'percentage': round(percentage, 2),
+            'phase': moon_phase_name(percentage),
+            'nextFull': _format_date(next_full),
+            'nextNew': _format_date(next_new)
+        }
+
+
+def save_lunations(path=DEFAULT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, build_lunations())
+    return path
+
+
+_default_table = None
+
+
+def get_default_table():
+    # Load the lunation table once, building and caching it on first use
+    global _default_table
+    if _default_table is None:
+        if os.path.exists(DEFAULT_PATH):
+            instants = np.load(DEFAULT_PATH, mmap_mode='r')
+        else:
+            instants = build_lunations()
+            try:
+                os.makedirs(os.path.dirname(DEFAULT_PATH), exist_ok=True)
+                np.save(DEFAULT_PATH, instants)
+            except OSError:
+                pass
+        _default_table = LunationTable(instants)
+    return _default_table
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: output_path'}))
+        sys.exit(1)
+
+    path = save_lunations(sys.argv[1] if len(sys.argv) == 2 else DEFAULT_PATH)
+    print(json.dumps({'success': True, 'path': path, 'lunations': len(np.load(path)) // 4}))
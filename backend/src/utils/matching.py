@@ -0,0 +1,246 @@
+import sys
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from aspects import AspectSet, ALL_ASPECTS
+from astro_calculator import BODY_NAMES
+
+# Population-wide compatibility matching.
+#
+# Every stored chart is reduced to a vector of body longitudes. Pairwise
+# compatibility is the weighted sum, over all body pairs between the two
+# charts, of how close each separation is to an aspect (1 at exact, falling
+# linearly to 0 at the orb).
+#
+# That kernel depends only on the angle between two bodies, so it can be
+# expanded as a Fourier series, and the score of two charts becomes a dot
+# product of per-chart harmonic features. Candidates are found by matrix
+# multiplication in tiles sized to a memory budget, keeping a running top-k
+# per user so memory never grows with N^2. Each candidate is then rescored
+# with the exact kernel.
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                               'data', 'astro_guide.db')
+
+# Harmonious aspects add to compatibility, hard aspects subtract
+ASPECT_WEIGHTS = {
+    'Conjunction': 1.0,
+    'Trine': 1.0,
+    'Sextile': 0.8,
+    'Square': -0.6,
+    'Opposition': -0.4,
+    'Semi-sextile': 0.2,
+    'Quintile': 0.3,
+    'Biquintile': 0.3,
+    'Semi-square': -0.2,
+    'Sesquiquadrate': -0.2,
+    'Quincunx': -0.3
+}
+
+DEFAULT_ASPECT_SET = AspectSet(ALL_ASPECTS)
+
+# Bytes of scratch memory allowed per scoring tile
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Kernel samples per degree of separation. Aspect angles and orb edges fall
+# on grid points, so linear interpolation reproduces the kernel exactly.
+TABLE_RESOLUTION = 100
+
+# Harmonics kept in the Fourier expansion of the scoring kernel
+HARMONICS = 64
+
+# Candidates per requested partner that are rescored exactly
+CANDIDATE_FACTOR = 4
+
+# Below this many charts a single thread is faster than a pool
+PARALLEL_THRESHOLD = 4000
+
+
+def load_chart_longitudes(db_path=DEFAULT_DB_PATH):
+    """Read stored charts into one contiguous array.
+
+    Returns (user_ids, longitudes) where longitudes has shape (N, 10) in
+    BODY_NAMES order. Rows whose astro_data lacks planet longitudes are
+    skipped.
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        rows = connection.execute('SELECT id, astro_data FROM users ORDER BY id').fetchall()
+    finally:
+        connection.close()
+
+    user_ids = []
+    longitudes = []
+    for user_id, astro_json in rows:
+        try:
+            planets = json.loads(astro_json)['planets']
+            longitudes.append([planets[name]['longitude'] for name in BODY_NAMES])
+        except (ValueError, KeyError, TypeError):
+            continue
+        user_ids.append(user_id)
+    return np.array(user_ids, dtype=np.int64), np.array(longitudes, dtype=np.float32).reshape(-1, len(BODY_NAMES))
+
+
+def kernel_table(weights=ASPECT_WEIGHTS, aspect_set=DEFAULT_ASPECT_SET):
+    """Scoring kernel sampled over separations 0..180 degrees."""
+    separation = np.arange(180 * TABLE_RESOLUTION + 2) / TABLE_RESOLUTION
+    table = np.zeros(separation.shape)
+    for name, angle, orb in zip(aspect_set.names, aspect_set.angles, aspect_set.orbs):
+        table += weights.get(name, 0.0) * np.maximum(0, 1 - np.abs(separation - angle) / orb)
+    return table.astype(np.float32)
+
+
+def _kernel_sum(separation, table):
+    # Interpolated kernel summed over the last two (body pair) axes
+    position = separation * np.float32(TABLE_RESOLUTION)
+    index = position.astype(np.intp)
+    fraction = position - index
+    values = table[index] * (1 - fraction) + table[index + 1] * fraction
+    return values.sum(axis=(-2, -1), dtype=np.float32)
+
+
+def _separation(a, b):
+    # Longitudes must already be normalized to 0..360
+    diff = np.abs(a[..., :, None] - b[..., None, :])
+    return np.minimum(diff, 360 - diff)
+
+
+def pair_scores(block_a, block_b, weights=ASPECT_WEIGHTS, aspect_set=DEFAULT_ASPECT_SET):
+    """Exact compatibility scores between every chart in block_a and block_b.
+
+    Blocks have shape (Na, bodies) and (Nb, bodies); the result is (Na, Nb).
+    """
+    block_a = np.asarray(block_a, dtype=np.float32) % 360
+    block_b = np.asarray(block_b, dtype=np.float32) % 360
+    return _kernel_sum(_separation(block_a[:, None, :], block_b[None, :, :]),
+                       kernel_table(weights, aspect_set))
+
+
+def kernel_coefficients(table, harmonics=HARMONICS):
+    """Cosine series coefficients of the scoring kernel, harmonics 0..H."""
+    # The kernel over a full turn is the 0..180 table mirrored
+    kernel = np.concatenate([table[:-2], table[-2:0:-1]]).astype(float)
+    coefficients = np.fft.rfft(kernel).real[:harmonics + 1] / len(kernel)
+    coefficients[1:] *= 2
+    return coefficients
+
+
+def chart_features(longitudes, coefficients):
+    """Harmonic features whose dot products approximate pair_scores.
+
+    Returns (left, right), each (N, 2 * (H + 1)); the score of charts a and
+    b is left[a] @ right[b].
+    """
+    harmonics = np.arange(len(coefficients))
+    angles = np.radians(np.asarray(longitudes, dtype=float))[:, :, None] * harmonics
+    cosines = np.cos(angles).sum(axis=1)
+    sines = np.sin(angles).sum(axis=1)
+    right = np.concatenate([cosines, sines], axis=1)
+    left = right * np.concatenate([coefficients, coefficients])
+    return left.astype(np.float32), right.astype(np.float32)
+
+
+def tile_size(memory_budget=DEFAULT_MEMORY_BUDGET):
+    # Side of a square tile whose score matrix and top-k merge buffers
+    # (float32 scores, int64 indices) fit in the budget
+    return max(1, int((memory_budget / 24) ** 0.5))
+
+
+def _merge_top_k(best_scores, best_index, scores, offset, k):
+    # Merge a tile's scores into the running top-k of each row
+    candidates = np.concatenate([best_scores, scores], axis=1)
+    tile_index = np.broadcast_to(np.arange(offset, offset + scores.shape[1]), scores.shape)
+    indices = np.concatenate([best_index, tile_index], axis=1)
+    keep = np.argpartition(-candidates, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(candidates, keep, axis=1), np.take_along_axis(indices, keep, axis=1)
+
+
+def _top_k_rows(longitudes, left, right, start, stop, k, table, tile):
+    # Top-k partners for rows [start, stop) against the whole population
+    count = longitudes.shape[0]
+    candidates = min(k * CANDIDATE_FACTOR, count - 1)
+    best_scores = np.full((stop - start, candidates), -np.inf, dtype=np.float32)
+    best_index = np.full((stop - start, candidates), -1, dtype=np.int64)
+    for offset in range(0, count, tile):
+        scores = left[start:stop] @ right[offset:offset + tile].T
+        # A chart is not its own match
+        overlap = np.arange(max(start, offset), min(stop, offset + tile))
+        scores[overlap - start, overlap - offset] = -np.inf
+        best_scores, best_index = _merge_top_k(best_scores, best_index, scores, offset, candidates)
+
+    # Rescore the candidates exactly and keep the best k
+    exact = _kernel_sum(_separation(longitudes[start:stop, None, :], longitudes[best_index]), table)
+    order = np.argsort(-exact, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(exact, order, axis=1), np.take_along_axis(best_index, order, axis=1)
+
+
+def top_matches(longitudes, k=10, weights=ASPECT_WEIGHTS, aspect_set=DEFAULT_ASPECT_SET,
+                memory_budget=DEFAULT_MEMORY_BUDGET, workers=None):
+    """Top-k most compatible partners for every chart.
+
+    Args:
+        longitudes: (N, bodies) array of body longitudes
+        k (int): Partners to return per chart
+        weights (dict): Aspect name -> weight
+        aspect_set (AspectSet): Aspects and orbs to score
+        memory_budget (int): Scratch bytes allowed per tile and thread
+        workers (int): Threads to use; defaults to all cores for large N
+
+    Returns:
+        Tuple of (indices, scores), each (N, k), best first. Indices are rows
+        of longitudes and scores are exact pair_scores values.
+    """
+    longitudes = np.ascontiguousarray(np.asarray(longitudes, dtype=np.float32) % 360)
+    count = longitudes.shape[0]
+    k = max(1, min(k, count - 1))
+    indices = np.full((count, k), -1, dtype=np.int64)
+    scores = np.full((count, k), -np.inf, dtype=np.float32)
+    if count < 2:
+        return indices, scores
+
+    if workers is None:
+        workers = os.cpu_count() if count >= PARALLEL_THRESHOLD else 1
+    table = kernel_table(weights, aspect_set)
+    left, right = chart_features(longitudes, kernel_coefficients(table))
+
+    # Row blocks are also bounded by the exact rescoring temporaries
+    bodies = longitudes.shape[1]
+    rescore_rows = memory_budget // (k * CANDIDATE_FACTOR * bodies * bodies * 4 * 6)
+    tile = tile_size(memory_budget)
+    rows = max(1, min(tile, rescore_rows))
+
+    def run(start):
+        stop = min(start + rows, count)
+        scores[start:stop], indices[start:stop] = _top_k_rows(
+            longitudes, left, right, start, stop, k, table, tile)
+
+    # NumPy releases the GIL in matrix products and reductions, so threads
+    # share the feature arrays without copying them into each worker
+    if workers <= 1:
+        for start in range(0, count, rows):
+            run(start)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, range(0, count, rows)))
+    return indices, scores
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print(json.dumps({'error': 'Incorrect arguments. Optional: db_path k'}))
+        sys.exit(1)
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    user_ids, longitudes = load_chart_longitudes(db_path)
+    indices, scores = top_matches(longitudes, k)
+    print(json.dumps({
+        str(user_id): [
+            {'userId': int(user_ids[j]), 'score': round(float(score), 3)}
+            for j, score in zip(row_index, row_scores) if j >= 0
+        ]
+        for user_id, row_index, row_scores in zip(user_ids.tolist(), indices, scores)
+    }))
@@ -0,0 +1,172 @@
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+import numpy as np
+
+# Type-ahead search over place names.
+#
+# Prefix matches come from a sorted array of keys: every full name plus every
+# later word of a multi-word name ("york" for "new york"), so a prefix is a
+# contiguous slice found with two binary searches. Each key carries a static
+# rank, so the best k of a slice are an argpartition away; slices too large
+# for that to be cheap (one- and two-letter prefixes of a big gazetteer) are
+# memoized. Typos fall back to a trigram index ranked by Jaccard similarity.
+
+# Prefix slices larger than this have their top results memoized
+MEMO_THRESHOLD = 2048
+
+# Trigrams in more names than this are too common to narrow a fuzzy search
+MAX_POSTINGS = 20000
+
+# Minimum trigram similarity for a fuzzy match
+MIN_SIMILARITY = 0.25
+
+# Candidates kept from a prefix slice before de-duplicating names
+OVERFETCH = 4
+
+
+def normalize_name(name):
+    """Lowercase, strip accents and collapse whitespace."""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.lower().replace(',', ' ').split())
+
+
+def trigrams(text):
+    """Set of character trigrams of a normalized name, padded at the ends."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Prefix and fuzzy name search.
+
+    Args:
+        names: Place names
+        countries: Country of each name, used for disambiguation and filtering
+        weights: Optional importance of each name (e.g. population); higher
+            weights rank first among equally good matches
+    """
+
+    def __init__(self, names, countries, weights=None):
+        self.names = list(names)
+        self.countries = list(countries)
+        normalized = [normalize_name(name) for name in self.names]
+        self._normalized = normalized
+        self._countries = [normalize_name(country) for country in self.countries]
+        weights = np.zeros(len(normalized)) if weights is None else np.asarray(weights, dtype=float)
+
+        # Prefix keys: full names, then later words of multi-word names
+        entries = []
+        for i, name in enumerate(normalized):
+            entries.append((name, 0, i))
+            words = name.split(' ')
+            for w in range(1, len(words)):
+                entries.append((' '.join(words[w:]), 1, i))
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._ids = np.array([i for _, _, i in entries], dtype=np.int64)
+
+        # Static rank of each key: full-name keys first, then heavier and
+        # shorter names, then alphabetical
+        kinds = np.array([kind for _, kind, _ in entries], dtype=np.int64)
+        lengths = np.array([len(normalized[i]) for i in self._ids], dtype=np.int64)
+        order = np.lexsort((np.arange(len(entries)), lengths, -weights[self._ids], kinds))
+        self._rank = np.empty(len(entries), dtype=np.int64)
+        self._rank[order] = np.arange(len(entries))
+        self._memo = {}
+
+        # Trigram postings: trigram -> ids of the names containing it
+        postings = defaultdict(list)
+        self._gram_counts = np.zeros(len(normalized), dtype=np.int64)
+        for i, name in enumerate(normalized):
+            grams = trigrams(name)
+            self._gram_counts[i] = len(grams)
+            for gram in grams:
+                postings[gram].append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_slice(self, prefix, limit):
+        # Best-ranked name ids of every key starting with prefix
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + '\uffff')
+        if hi - lo > MEMO_THRESHOLD:
+            memo = self._memo.get(prefix)
+            if memo is not None and memo[0] >= limit:
+                return memo[1]
+        ranks = self._rank[lo:hi]
+        if hi - lo > limit:
+            keep = np.argpartition(ranks, limit - 1)[:limit]
+        else:
+            keep = np.arange(hi - lo)
+        ids = self._ids[lo:hi][keep[np.argsort(ranks[keep])]]
+        if hi - lo > MEMO_THRESHOLD:
+            self._memo[prefix] = (limit, ids)
+        return ids
+
+    def _fuzzy(self, query, limit):
+        # Names sharing the most trigrams with the query, by Jaccard similarity
+        grams = trigrams(query)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        narrow = [ids for ids in lists if len(ids) <= MAX_POSTINGS]
+        lists = narrow or lists
+        if not lists:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates, shared = np.unique(np.concatenate(lists), return_counts=True)
+        similarity = shared / (len(grams) + self._gram_counts[candidates] - shared)
+        keep = similarity >= MIN_SIMILARITY
+        candidates, similarity = candidates[keep], similarity[keep]
+        order = np.argsort(-similarity, kind='stable')[:limit]
+        return candidates[order], similarity[order]
+
+    def search(self, query, k=5, country=None):
+        """Ranked suggestions for a partial place name.
+
+        A trailing ", country" in the query (or the country argument) keeps
+        only names whose country starts with it.
+
+        Args:
+            query (str): What the user has typed so far
+            k (int): Maximum number of suggestions
+            country (str): Optional country filter
+
+        Returns:
+            List of (index, match, score) tuples, best first, where match is
+            'exact', 'prefix' or 'fuzzy' and index refers to the input names.
+        """
+        if country is None and ',' in query:
+            query, country = query.rsplit(',', 1)
+        query = normalize_name(query)
+        country = normalize_name(country) if country else ''
+        if not query or k <= 0:
+            return []
+
+        def allowed(i):
+            return self._countries[i].startswith(country)
+
+        results = []
+        seen = set()
+        limit = k * OVERFETCH
+        while True:
+            ids = self._prefix_slice(query, limit)
+            for i in ids.tolist():
+                if i not in seen and allowed(i):
+                    seen.add(i)
+                    results.append((i, 'exact' if self._normalized[i] == query else 'prefix', 1.0))
+            # Filtering or duplicate keys can leave too few; widen the slice
+            if len(results) >= k or len(ids) < limit:
+                break
+            limit *= OVERFETCH
+        # An exact name beats any other prefix match
+        results.sort(key=lambda result: result[1] != 'exact')
+
+        if len(results) < k:
+            ids, similarity = self._fuzzy(query, limit)
+            for i, score in zip(ids.tolist(), similarity.tolist()):
+                if i not in seen and allowed(i):
+                    seen.add(i)
+                    results.append((i, 'fuzzy', round(score, 3)))
+        return results[:k]
@@ -0,0 +1,153 @@
+import numpy as np
+
+# Spatial index for reverse geocoding.
+#
+# Points are stored as unit vectors, so straight-line (chord) distance in 3D
+# grows monotonically with great-circle distance and there is no seam at the
+# antimeridian or singularity at the poles. A KD-tree over those vectors is
+# built once; each query then touches only O(log n) nodes and a handful of
+# leaf buckets, which are scanned with NumPy.
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Points per leaf bucket
+LEAF_SIZE = 32
+
+
+def to_unit_vectors(latitudes, longitudes):
+    """(N, 3) unit vectors for latitudes and longitudes in degrees."""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lng = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    """Great-circle distance in km for a chord length on the unit sphere."""
+    return 2 * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0)) * EARTH_RADIUS_KM
+
+
+def km_to_chord(distance_km):
+    """Chord length on the unit sphere for a great-circle distance in km."""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class SphereKDTree:
+    """KD-tree over points on the sphere.
+
+    Args:
+        latitudes: Latitudes in degrees
+        longitudes: Longitudes in degrees
+        leaf_size (int): Maximum points per leaf bucket
+
+    Query results are indices into the input arrays.
+    """
+
+    def __init__(self, latitudes, longitudes, leaf_size=LEAF_SIZE):
+        points = to_unit_vectors(latitudes, longitudes).reshape(-1, 3)
+        self.size = len(points)
+        self.leaf_size = leaf_size
+        self.index = np.arange(self.size)
+        # Node arrays: slice [start, stop) of index, split axis and value, children
+        self._start, self._stop, self._axis, self._split, self._left, self._right = [], [], [], [], [], []
+        # Reordered alongside index while building, so every node is a
+        # contiguous slice
+        self.points = np.array(points)
+        if self.size:
+            self._build()
+
+    def _add_node(self, start, stop):
+        self._start.append(start)
+        self._stop.append(stop)
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        return len(self._start) - 1
+
+    def _build(self):
+        stack = [self._add_node(0, self.size)]
+        while stack:
+            node = stack.pop()
+            start, stop = self._start[node], self._stop[node]
+            if stop - start <= self.leaf_size:
+                continue
+            # Split the widest axis at the median
+            block = self.points[start:stop]
+            axis = int(np.argmax(np.ptp(block, axis=0)))
+            middle = (stop - start) // 2
+            order = np.argpartition(block[:, axis], middle)
+            self.points[start:stop] = block[order]
+            self.index[start:stop] = self.index[start:stop][order]
+            self._axis[node] = axis
+            self._split[node] = float(self.points[start + middle, axis])
+            self._left[node] = self._add_node(start, start + middle)
+            self._right[node] = self._add_node(start + middle, stop)
+            stack.extend((self._left[node], self._right[node]))
+
+    def _distances(self, node, query):
+        start, stop = self._start[node], self._stop[node]
+        diff = self.points[start:stop] - query
+        return np.einsum('ij,ij->i', diff, diff)
+
+    def _collect(self, query, limit):
+        # Positions and squared chords of every point within sqrt(limit)
+        components = query.tolist()
+        positions, squares = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            axis = self._axis[node]
+            if axis < 0:
+                squared = self._distances(node, query)
+                hits = np.nonzero(squared <= limit)[0]
+                positions.append(hits + self._start[node])
+                squares.append(squared[hits])
+                continue
+            offset = components[axis] - self._split[node]
+            stack.append(self._left[node] if offset < 0 else self._right[node])
+            if offset * offset <= limit:
+                stack.append(self._right[node] if offset < 0 else self._left[node])
+        positions = np.concatenate(positions)
+        squared = np.concatenate(squares)
+        order = np.argsort(squared, kind='stable')
+        return positions[order], squared[order]
+
+    def nearest(self, latitude, longitude, k=1):
+        """The k nearest points.
+
+        Returns:
+            Tuple of (indices, distances_km), nearest first.
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        query = to_unit_vectors(latitude, longitude)
+
+        # The k-th nearest point of the smallest subtree around the query
+        # that still holds k points bounds the search radius
+        components = query.tolist()
+        node = 0
+        while self._axis[node] >= 0:
+            offset = components[self._axis[node]] - self._split[node]
+            child = self._left[node] if offset < 0 else self._right[node]
+            if self._stop[child] - self._start[child] < k:
+                break
+            node = child
+        squared = self._distances(node, query)
+        limit = float(np.partition(squared, k - 1)[k - 1])
+
+        positions, squared = self._collect(query, limit)
+        return self.index[positions[:k]], chord_to_km(np.sqrt(squared[:k]))
+
+    def within(self, latitude, longitude, radius_km):
+        """All points within radius_km of a location.
+
+        Returns:
+            Tuple of (indices, distances_km), nearest first.
+        """
+        if self.size == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        query = to_unit_vectors(latitude, longitude)
+        positions, squared = self._collect(query, km_to_chord(radius_km) ** 2)
+        return self.index[positions], chord_to_km(np.sqrt(squared))
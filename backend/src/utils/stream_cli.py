@@ -0,0 +1,154 @@
+import sys
+import json
+import time
+import importlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Streaming (NDJSON) mode shared by the calculator command lines.
+#
+# Each input line is a birth record:
+#   {"id": ..., "birth_date": "YYYY-MM-DD", "birth_time": "HH:MM", "latitude": .., "longitude": ..}
+# and produces exactly one output line, in input order, in the worker
+# protocol format: {"id", "ok", "result"} or {"id", "ok": false, "error"}.
+# "id" defaults to the line number. Bad records become error lines and the
+# stream carries on.
+#
+# Lines are grouped into chunks that are parsed, computed and serialized in
+# worker processes. At most a fixed window of chunks is in flight, so memory
+# stays bounded however long the input is, and chunks are written back in
+# the order they were read.
+
+CHUNK_SIZE = 64
+
+# Chunks in flight per worker
+WINDOW_PER_WORKER = 2
+
+REQUIRED_FIELDS = ('birth_date', 'birth_time', 'latitude', 'longitude')
+
+_functions = {}
+
+
+def _resolve(module_name, function_name):
+    # Import the calculator once per process
+    key = (module_name, function_name)
+    if key not in _functions:
+        _functions[key] = getattr(importlib.import_module(module_name), function_name)
+    return _functions[key]
+
+
+def _process_line(function, line_number, line):
+    record_id = line_number
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError('Record must be a JSON object')
+        record_id = record.get('id', line_number)
+        missing = [field for field in REQUIRED_FIELDS if field not in record]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+        result = function(record['birth_date'], record['birth_time'],
+                          float(record['latitude']), float(record['longitude']))
+    except Exception as e:
+        return False, json.dumps({'id': record_id, 'ok': False, 'error': str(e)})
+    if isinstance(result, dict) and 'error' in result:
+        return False, json.dumps({'id': record_id, 'ok': False, 'error': result['error']})
+    return True, json.dumps({'id': record_id, 'ok': True, 'result': result})
+
+
+def process_chunk(module_name, function_name, chunk):
+    """Compute one chunk of (line_number, line) pairs.
+
+    Returns (output lines, error count).
+    """
+    function = _resolve(module_name, function_name)
+    lines = []
+    errors = 0
+    for line_number, line in chunk:
+        ok, output = _process_line(function, line_number, line)
+        lines.append(output)
+        errors += not ok
+    return lines, errors
+
+
+def read_chunks(lines, chunk_size=CHUNK_SIZE):
+    """Group non-blank input lines into chunks of (line_number, line)."""
+    chunk = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append((line_number, line))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def compute_chunks(module_name, function_name, chunks, workers=1):
+    """Yield processed chunks in input order.
+
+    With more than one worker, chunks run in a process pool with a bounded
+    window of chunks in flight.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield process_chunk(module_name, function_name, chunk)
+        return
+
+    window = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            window.append(pool.submit(process_chunk, module_name, function_name, chunk))
+            if len(window) >= workers * WINDOW_PER_WORKER:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def run_stream(module_name, function_name, infile=None, out=None, workers=1, summary=None):
+    """Stream NDJSON records from infile to out and return the run summary.
+
+    The summary (records, errors, seconds, recordsPerSecond) is also written
+    as one JSON line to summary (stderr by default).
+    """
+    infile = infile or sys.stdin
+    out = out or sys.stdout
+    summary = summary or sys.stderr
+
+    start = time.perf_counter()
+    records = 0
+    errors = 0
+    for lines, chunk_errors in compute_chunks(module_name, function_name, read_chunks(infile), workers):
+        out.write('\n'.join(lines) + '\n')
+        out.flush()
+        records += len(lines)
+        errors += chunk_errors
+
+    seconds = time.perf_counter() - start
+    result = {
+        'records': records,
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'recordsPerSecond': round(records / seconds, 1) if seconds > 0 else None
+    }
+    summary.write(json.dumps(result) + '\n')
+    return result
+
+
+def stream_main(module_name, function_name, argv):
+    """Handle `--stream [input_path] [--workers N]` for a calculator __main__."""
+    args = list(argv)
+    workers = 1
+    if '--workers' in args:
+        position = args.index('--workers')
+        workers = int(args[position + 1])
+        del args[position:position + 2]
+    if len(args) > 1:
+        raise ValueError('Too many arguments')
+
+    if args and args[0] != '-':
+        with open(args[0], 'r') as infile:
+            return run_stream(module_name, function_name, infile, workers=workers)
+    return run_stream(module_name, function_name, workers=workers)
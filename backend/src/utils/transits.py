@@ -0,0 +1,242 @@
+import sys
+import json
+import math
+import ephem
+import numpy as np
+from aspects import MAJOR_ASPECTS
+from astro_calculator import BODY_NAMES
+from ephemeris_table import get_default_table
+
+# Transit and return search.
+#
+# A transit is an instant when a transiting body's longitude sits at an
+# aspect angle from a natal point. The search walks forward with steps sized
+# from the body's maximum speed: when the body is d degrees from the target
+# it cannot get there in less than d / max_speed days, so no hit is ever
+# stepped over. Sign changes are then refined with a bracketing root finder.
+# Retrograde bodies simply produce several hits for the same target.
+
+# Maximum daily motion in degrees, per frame, with a safety margin
+MAX_SPEED = {
+    'heliocentric': {
+        'Sun': 1.05, 'Moon': 15.6, 'Mercury': 6.4, 'Venus': 1.65, 'Mars': 0.66,
+        'Jupiter': 0.1, 'Saturn': 0.045, 'Uranus': 0.016, 'Neptune': 0.01, 'Pluto': 0.01
+    },
+    'geocentric': {
+        'Sun': 1.05, 'Moon': 15.6, 'Mercury': 2.25, 'Venus': 1.3, 'Mars': 0.82,
+        'Jupiter': 0.25, 'Saturn': 0.14, 'Uranus': 0.07, 'Neptune': 0.045, 'Pluto': 0.045
+    }
+}
+
+# Smallest search step in days; two hits closer than this (only possible
+# right at a station) may be reported as one
+MIN_STEP = 1 / 96.0
+
+# Root tolerance in days (about one second)
+TOLERANCE = 1e-5
+
+ASPECT_ANGLES = {name: angle for name, angle, _ in MAJOR_ASPECTS}
+
+
+def _wrap(degrees):
+    # Signed difference in -180..180
+    return (degrees + 180) % 360 - 180
+
+
+def body_longitude_function(name, frame='heliocentric'):
+    """Return f(date) -> longitude in degrees for one body.
+
+    'heliocentric' matches the longitudes calculate_astro reports;
+    'geocentric' is the apparent ecliptic longitude of date. The precomputed
+    ephemeris table is used where it covers the date.
+    """
+    body = getattr(ephem, name)()
+    table = get_default_table()
+    index = BODY_NAMES.index(name)
+    quantity = 'hlong' if frame == 'heliocentric' else 'glong'
+
+    def longitude(date):
+        if table is not None and table.covers(date):
+            return table.longitudes(date, quantity)[index]
+        body.compute(date)
+        if frame == 'heliocentric':
+            return math.degrees(body.hlong)
+        equatorial = ephem.Equatorial(body.g_ra, body.g_dec, epoch=date)
+        return math.degrees(ephem.Ecliptic(equatorial, epoch=date).lon)
+
+    return longitude
+
+
+def _refine(f, a, b, fa, fb):
+    # Illinois variant of regula falsi on a sign-changing bracket
+    side = 0
+    while b - a > TOLERANCE:
+        c = (a * fb - b * fa) / (fb - fa)
+        fc = f(c)
+        if fc * fb > 0:
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2
+            side = 1
+        if fc == 0:
+            return c
+    return (a + b) / 2
+
+
+def _hit(name, longitude, date, target, natal_point, aspect):
+    # Direction of motion at the hit, from a short central difference
+    speed = _wrap(longitude(date + 0.01) - longitude(date - 0.01))
+    return {
+        'body': name,
+        'natalPoint': natal_point,
+        'aspect': aspect,
+        'target': round(target % 360, 4),
+        'date': ephem.Date(date).datetime().strftime("%Y-%m-%d %H:%M"),
+        'julianDate': float(date) + 2415020,
+        'retrograde': bool(speed < 0)
+    }
+
+
+def _crossings(offset, t0, end, speed, g0=None):
+    # Dates in [t0, end) where offset (degrees from a target) crosses zero,
+    # stepping by |offset| / speed so no crossing is stepped over
+    g0 = offset(t0) if g0 is None else g0
+    dates = []
+    while t0 < end:
+        t1 = min(end, t0 + max(MIN_STEP, abs(g0) / speed))
+        g1 = offset(t1)
+        # A sign change near zero is a hit; one near +-180 is the wrap
+        if g0 == 0 or (g0 < 0) != (g1 < 0) and abs(g0 - g1) < 180:
+            dates.append(t0 if g0 == 0 else _refine(offset, t0, t1, g0, g1))
+        t0, g0 = t1, g1
+    return dates
+
+
+def find_transits(natal_longitude, body, aspect='Conjunction', start=None, end=None,
+                  frame='heliocentric', natal_point=None):
+    """Exact times a transiting body aspects a natal longitude.
+
+    Args:
+        natal_longitude (float): Natal longitude in degrees
+        body (str): Transiting body, one of BODY_NAMES
+        aspect (str): Aspect name from MAJOR_ASPECTS
+        start, end: Search range as ephem dates or 'YYYY/MM/DD' strings
+        frame (str): 'heliocentric' or 'geocentric'
+        natal_point (str): Optional label copied into each hit
+
+    Returns:
+        List of hit dicts ordered by time.
+    """
+    start = float(ephem.Date(start if start is not None else ephem.now()))
+    end = float(ephem.Date(end)) if end is not None else start + 365.25
+    angle = ASPECT_ANGLES[aspect]
+    speed = MAX_SPEED[frame][body]
+    longitude = body_longitude_function(body, frame)
+
+    # Both sides of the natal point, unless they coincide
+    targets = {natal_longitude + angle, natal_longitude - angle}
+    if angle in (0, 180):
+        targets = {natal_longitude + angle}
+
+    hits = []
+    for target in targets:
+        def offset(date, target=target):
+            return _wrap(longitude(date) - target)
+
+        for date in _crossings(offset, start, end, speed):
+            hits.append(_hit(body, longitude, date, target, natal_point, aspect))
+    return sorted(hits, key=lambda hit: hit['julianDate'])
+
+
+def _sample_longitudes(name, dates, frame):
+    # Longitudes of one body over a grid, vectorized through the table if it
+    # covers the whole range
+    table = get_default_table()
+    quantity = 'hlong' if frame == 'heliocentric' else 'glong'
+    if table is not None and table.covers(dates[0]) and table.covers(dates[-1]):
+        return table.longitudes_batch(dates, quantity)[:, BODY_NAMES.index(name)]
+    longitude = body_longitude_function(name, frame)
+    return np.array([longitude(date) for date in dates])
+
+
+def find_all_transits(natal_longitudes, start=None, end=None, bodies=BODY_NAMES,
+                      aspects=None, frame='heliocentric'):
+    """All transits from the given bodies to every natal point in one pass.
+
+    Each transiting body is sampled once on a grid fine enough that it moves
+    at most one degree per step. Every (natal point, aspect, side) target is
+    then checked at once for steps it could reach: a sign change, or both
+    ends close enough that the body could touch the target and turn back
+    (at a station). Those steps are searched like find_transits, so the
+    hits are the same as from one find_transits call per target.
+
+    Args:
+        natal_longitudes (dict): Natal point name -> longitude in degrees
+        start, end: Search range; defaults to one year from now
+        bodies: Transiting bodies
+        aspects: Aspect names; defaults to all of MAJOR_ASPECTS
+        frame (str): 'heliocentric' or 'geocentric'
+
+    Returns:
+        List of hit dicts ordered by time.
+    """
+    start = float(ephem.Date(start if start is not None else ephem.now()))
+    end = float(ephem.Date(end)) if end is not None else start + 365.25
+    aspects = aspects or list(ASPECT_ANGLES)
+
+    # Every target longitude with its labels
+    labels = []
+    targets = []
+    for point, natal in natal_longitudes.items():
+        for aspect in aspects:
+            angle = ASPECT_ANGLES[aspect]
+            for side in ((1,) if angle in (0, 180) else (1, -1)):
+                labels.append((point, aspect))
+                targets.append(natal + side * angle)
+    targets = np.array(targets)
+
+    hits = []
+    for name in bodies:
+        speed = MAX_SPEED[frame][name]
+        dates = np.append(np.arange(start, end, 1.0 / speed), end)
+        offsets = _wrap(_sample_longitudes(name, dates, frame)[:, None] - targets[None, :])
+        crossings = ((offsets[:-1] < 0) != (offsets[1:] < 0)) & (np.abs(offsets[1:] - offsets[:-1]) < 180)
+        # Within reach of both ends: the body may cross and come back
+        reachable = np.abs(offsets[:-1]) + np.abs(offsets[1:]) <= speed * np.diff(dates)[:, None]
+        longitude = body_longitude_function(name, frame)
+        for i, j in zip(*np.nonzero(crossings | reachable)):
+            target = targets[j]
+
+            def offset(date, target=target):
+                return _wrap(longitude(date) - target)
+
+            for date in _crossings(offset, dates[i], dates[i + 1], speed, offsets[i, j]):
+                hits.append(_hit(name, longitude, date, target, labels[j][0], labels[j][1]))
+    return sorted(hits, key=lambda hit: hit['julianDate'])
+
+
+def solar_return(natal_sun_longitude, year, frame='heliocentric'):
+    """Instant the Sun returns to its natal longitude in a given year."""
+    hits = find_transits(natal_sun_longitude, 'Sun', 'Conjunction',
+                         f'{year}/1/1', f'{year + 1}/1/1', frame, 'Sun')
+    return hits[0] if hits else None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (5, 6):
+        print(json.dumps({'error': 'Incorrect arguments. Required: natal_longitude body start_date end_date [aspect]'}))
+        sys.exit(1)
+
+    try:
+        result = find_transits(float(sys.argv[1]), sys.argv[2],
+                               sys.argv[5] if len(sys.argv) == 6 else 'Conjunction',
+                               sys.argv[3].replace('-', '/'), sys.argv[4].replace('-', '/'))
+        print(json.dumps(result))
+    except Exception as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
@@ -0,0 +1,156 @@
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+const { logger } = require('./logger');
+
+const WORKER_SCRIPT = path.join(__dirname, 'calc_worker.py');
+
+// A long-lived calc_worker.py process. Requests are written as NDJSON and
+// matched to responses by id, so several can be in flight at once.
+class PythonWorker {
+  constructor(pythonPath, threads) {
+    this.pythonPath = pythonPath;
+    this.threads = threads;
+    this.pending = new Map();
+    this.nextId = 1;
+    this.start();
+  }
+
+  start() {
+    const child = spawn(this.pythonPath, [WORKER_SCRIPT, String(this.threads)], {
+      cwd: __dirname
+    });
+    this.process = child;
+    this.alive = true;
+
+    const lines = readline.createInterface({ input: child.stdout });
+    lines.on('line', (line) => this.handleLine(line));
+
+    child.stderr.on('data', (data) => {
+      logger.warn('Python worker stderr', { pid: child.pid, output: data.toString() });
+    });
+
+    // A worker that dies mid-request turns the next write into EPIPE; without
+    // a listener that would be an unhandled stream error
+    child.stdin.on('error', (error) => {
+      if (this.process !== child) {
+        return;
+      }
+      logger.error('Python worker stdin error', { pid: child.pid, error: error.message });
+      this.failPending(new Error(`Python worker stdin error: ${error.message}`));
+      child.kill();
+      this.start();
+    });
+
+    child.on('exit', (code) => {
+      logger.error('Python worker exited', { pid: child.pid, code });
+      // Already replaced after a stdin error
+      if (this.process !== child) {
+        return;
+      }
+      this.alive = false;
+      this.failPending(new Error(`Python worker exited with code ${code}`));
+    });
+  }
+
+  // Fail everything that was waiting on the current process
+  failPending(error) {
+    for (const { reject, timer } of this.pending.values()) {
+      clearTimeout(timer);
+      reject(error);
+    }
+    this.pending.clear();
+  }
+
+  handleLine(line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (error) {
+      logger.error('Failed to parse worker output', { output: line });
+      return;
+    }
+
+    const entry = this.pending.get(message.id);
+    if (!entry) {
+      return;
+    }
+    this.pending.delete(message.id);
+    clearTimeout(entry.timer);
+
+    // Stage breakdown, present when the worker runs with ASTRO_INSTRUMENTATION=1
+    if (message.timings) {
+      logger.info('Python worker timings', { op: entry.op, timings: message.timings });
+    }
+
+    if (message.ok) {
+      entry.resolve(message.result);
+    } else {
+      entry.reject(new Error(message.error));
+    }
+  }
+
+  call(op, params, timeout) {
+    return new Promise((resolve, reject) => {
+      const id = this.nextId++;
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Python worker timed out on ${op}`));
+      }, timeout);
+
+      this.pending.set(id, { resolve, reject, timer, op });
+      this.process.stdin.write(JSON.stringify({ id, op, params }) + '\n');
+    });
+  }
+}
+
+// Small pool of warm workers; each call goes to the least busy live worker
+// and dead workers are respawned on demand.
+class PythonWorkerPool {
+  constructor({ pythonPath = 'python3', size = 2, threads = 4, timeout = 30000 } = {}) {
+    this.timeout = timeout;
+    this.workers = Array.from({ length: size }, () => new PythonWorker(pythonPath, threads));
+  }
+
+  pick() {
+    const worker = this.workers.reduce((best, current) =>
+      current.pending.size < best.pending.size ? current : best
+    );
+    if (!worker.alive) {
+      worker.start();
+    }
+    return worker;
+  }
+
+  call(op, params) {
+    return this.pick().call(op, params, this.timeout);
+  }
+
+  // Send the same call to every worker
+  broadcast(op, params = {}) {
+    return Promise.all(this.workers.map((worker) => {
+      if (!worker.alive) {
+        worker.start();
+      }
+      return worker.call(op, params, this.timeout);
+    }));
+  }
+
+  ping() {
+    return this.broadcast('ping');
+  }
+
+  // Stage histograms and counters of all workers, in Prometheus text format
+  async metrics() {
+    const snapshots = await this.broadcast('metrics');
+    return this.call('metrics_text', { snapshots });
+  }
+
+  close() {
+    for (const worker of this.workers) {
+      worker.process.stdin.end();
+    }
+  }
+}
+
+module.exports = { PythonWorkerPool };
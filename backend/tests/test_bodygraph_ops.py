@@ -0,0 +1,86 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+import chart_generator
+from chart_generator import (BODYGRAPH_MASKS, CENTER_LAYOUT, center_ops, draw_bodygraph,
+                             draw_bodygraph_direct, render_hd_chart)
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.pdfgen import canvas
+
+# Body graphs replayed from the cached PDF operators must produce the same
+# bytes as drawing every center directly, and charts must render the same
+# when the operators cannot be recorded.
+#
+# Usage: python -m unittest discover backend/tests
+
+
+def page_pdf(draw):
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(letter), invariant=1, pageCompression=0)
+    draw(c)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def forms_pdf(masks):
+    # One page per mask, centers drawn as per-document forms
+    def draw(c):
+        forms = set()
+        for mask in masks:
+            draw_bodygraph(c, mask, forms)
+            c.showPage()
+    return page_pdf(draw)
+
+
+class WithoutOperators:
+    # Make chart_generator behave as if recording were unavailable
+    def __enter__(self):
+        self.saved = chart_generator._center_ops, dict(chart_generator._bodygraph_ops)
+        chart_generator._center_ops = ()
+        chart_generator._bodygraph_ops.clear()
+
+    def __exit__(self, *exc_info):
+        chart_generator._center_ops, ops = self.saved
+        chart_generator._bodygraph_ops.clear()
+        chart_generator._bodygraph_ops.update(ops)
+        return False
+
+
+class BodygraphOpsTest(unittest.TestCase):
+
+    def test_operators_recorded(self):
+        self.assertEqual(len(center_ops()), len(CENTER_LAYOUT))
+
+    def test_cached_matches_direct(self):
+        for mask in range(BODYGRAPH_MASKS):
+            self.assertEqual(page_pdf(lambda c: draw_bodygraph(c, mask)),
+                             page_pdf(lambda c: draw_bodygraph_direct(c, mask)), mask)
+
+    def test_forms_match_direct(self):
+        masks = [0, 1, 0b101010101, BODYGRAPH_MASKS - 1, 0b010101010]
+        cached = forms_pdf(masks)
+        with WithoutOperators():
+            self.assertEqual(forms_pdf(masks), cached)
+
+    def test_chart_matches_direct(self):
+        hd_data = {
+            'type': 'Projector', 'authority': 'Splenic', 'profile': '2/4', 'definition': 'Single',
+            'gates': [1, 13, 25, 46], 'centers': ['G', 'Spleen', 'Throat']
+        }
+        astro_data = {
+            'planets': {'Sun': {'sign': 'Taurus', 'degrees': 24.5}},
+            'aspects': [{'bodies': ['Sun', 'Moon'], 'aspect': 'Trine'}],
+            'moonPhase': {'phase': 'Waxing Crescent', 'percentage': 20.0}
+        }
+        cached = bytes(render_hd_chart(hd_data, astro_data, 'Test'))
+        with WithoutOperators():
+            self.assertEqual(bytes(render_hd_chart(hd_data, astro_data, 'Test')), cached)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from chart_cache import ChartCache, SQLiteCache
+from astro_calculator import calculate_astro
+from human_design import calculate_human_design
+
+# Cached results must equal a direct calculation for the same input, also
+# for nearby coordinates that round to the same two decimals.
+#
+# Usage: python -m unittest discover backend/tests
+
+# Both round to 40.71, but truncate to different human design seeds
+NEARBY = ((40.706, -74.006), (40.714, -74.006))
+
+
+class ChartCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ChartCache(persistent=SQLiteCache(os.path.join(self.directory.name, 'cache.db')))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_nearby_coordinates_get_their_own_results(self):
+        for kind, compute in (('astro', calculate_astro), ('human_design', calculate_human_design)):
+            for latitude, longitude in NEARBY:
+                self.assertEqual(
+                    self.cache.get_or_compute(kind, compute, '1990-05-05', '10:00', latitude, longitude),
+                    compute('1990-05-05', '10:00', latitude, longitude))
+
+    def test_persistent_tier_matches_direct(self):
+        for latitude, longitude in NEARBY:
+            self.cache.get_or_compute('astro', calculate_astro, '1990-05-05', '10:00', latitude, longitude)
+        self.cache.memory.clear()
+        for latitude, longitude in reversed(NEARBY):
+            self.assertEqual(
+                self.cache.get_or_compute('astro', calculate_astro, '1990-05-05', '10:00', latitude, longitude),
+                calculate_astro('1990-05-05', '10:00', latitude, longitude))
+        self.assertEqual(self.cache.persistent.hits, len(NEARBY))
+
+    def test_repeat_is_a_hit(self):
+        latitude, longitude = NEARBY[0]
+        first = self.cache.get_or_compute('astro', calculate_astro, '1990-05-05', '10:00', latitude, longitude)
+        second = self.cache.get_or_compute('astro', calculate_astro, '1990-05-05', '10:00', latitude, longitude)
+        self.assertIs(second, first)
+        self.assertEqual(self.cache.memory.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
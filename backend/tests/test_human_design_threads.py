@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import random
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+from human_design import calculate_human_design, calculate_human_design_batch
+from astro_calculator import calculate_astro
+
+# calculate_human_design must give the same result from many threads at once
+# as it does serially, even while other code reseeds the global RNG.
+#
+# Usage: python -m unittest discover backend/tests
+
+RECORDS = 2000
+THREADS = 16
+SEED = 20240101
+
+
+def random_records(count, seed=SEED):
+    rng = random.Random(seed)
+    return [
+        (f'{rng.randint(1900, 2099)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+         f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}',
+         round(rng.uniform(-60, 65), 4), round(rng.uniform(-180, 180), 4))
+        for _ in range(count)
+    ]
+
+
+def interfere(stop):
+    # Reseed and draw from the global RNG as fast as possible
+    while not stop.is_set():
+        random.seed(time.perf_counter_ns())
+        random.random()
+
+
+class HumanDesignThreadTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.records = random_records(RECORDS)
+        cls.expected = [calculate_human_design(*record) for record in cls.records]
+
+    def setUp(self):
+        # Lots of thread switches inside each call
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.stop = threading.Event()
+        self.noise = threading.Thread(target=interfere, args=(self.stop,), daemon=True)
+        self.noise.start()
+
+    def tearDown(self):
+        self.stop.set()
+        self.noise.join()
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_thread_pool_matches_serial(self):
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(lambda record: calculate_human_design(*record), self.records))
+        self.assertEqual(results, self.expected)
+
+    def test_batch_matches_serial(self):
+        self.assertEqual(calculate_human_design_batch(self.records, THREADS), self.expected)
+
+    def test_astro_matches_serial(self):
+        # calculate_astro embeds the Human Design result
+        records = self.records[:100]
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(lambda record: calculate_astro(*record)['humanDesign'], records))
+        self.assertEqual(results, self.expected[:100])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'utils'))
+
+import ephem
+from transits import (ASPECT_ANGLES, body_longitude_function, find_all_transits, find_transits,
+                      _refine, _wrap)
+
+# The bulk search must report the same hits as one find_transits call per
+# target, including targets a body touches and leaves again at a station.
+#
+# Usage: python -m unittest discover backend/tests
+
+START = '2024/1/1'
+END = '2025/1/1'
+
+# Days between two reports of the same hit
+SAME_HIT = 1e-4
+
+
+def station(name, frame='geocentric', start=START, end=END):
+    """(date, longitude, turning retrograde) of a body's first station."""
+    longitude = body_longitude_function(name, frame)
+
+    def speed(date):
+        return _wrap(longitude(date + 0.01) - longitude(date - 0.01))
+
+    t0, end = float(ephem.Date(start)), float(ephem.Date(end))
+    s0 = speed(t0)
+    while t0 < end:
+        s1 = speed(t0 + 1)
+        if (s0 < 0) != (s1 < 0):
+            date = _refine(speed, t0, t0 + 1, s0, s1)
+            return date, longitude(date), s0 > 0
+        t0, s0 = t0 + 1, s1
+    raise AssertionError(f'No station of {name}')
+
+
+def per_target(natal_longitudes, bodies, aspects, frame):
+    hits = []
+    for point, natal in natal_longitudes.items():
+        for body in bodies:
+            for aspect in aspects:
+                hits += find_transits(natal, body, aspect, START, END, frame, point)
+    return sorted(hits, key=lambda hit: hit['julianDate'])
+
+
+class FindAllTransitsTest(unittest.TestCase):
+
+    def assertSameHits(self, bulk, expected):
+        key = lambda hit: (hit['body'], hit['natalPoint'], hit['aspect'], hit['target'], hit['julianDate'])
+        bulk, expected = sorted(bulk, key=key), sorted(expected, key=key)
+        self.assertEqual(len(bulk), len(expected))
+        for hit, reference in zip(bulk, expected):
+            self.assertEqual(key(hit)[:4], key(reference)[:4])
+            self.assertAlmostEqual(hit['julianDate'], reference['julianDate'], delta=SAME_HIT)
+            self.assertEqual(hit['retrograde'], reference['retrograde'])
+
+    def test_geocentric_stations(self):
+        # A natal point just short of the station is crossed twice within
+        # one grid step of the bulk search
+        for body in ('Jupiter', 'Saturn', 'Pluto'):
+            _, longitude, retrograde = station(body)
+            for distance in (0.001, 0.005, 0.02):
+                natal = longitude - distance if retrograde else longitude + distance
+                expected = find_transits(natal, body, 'Conjunction', START, END, 'geocentric')
+                self.assertEqual(len(expected), 2)
+                bulk = find_all_transits({None: natal}, START, END, [body], ['Conjunction'], 'geocentric')
+                with self.subTest(body=body, distance=distance):
+                    self.assertSameHits(bulk, expected)
+
+    def test_matches_per_target_search(self):
+        rng = random.Random(7)
+        natal_longitudes = {f'point{i}': rng.uniform(0, 360) for i in range(4)}
+        bodies = ('Sun', 'Mercury', 'Mars', 'Saturn')
+        for frame in ('geocentric', 'heliocentric'):
+            with self.subTest(frame=frame):
+                self.assertSameHits(
+                    find_all_transits(natal_longitudes, START, END, bodies, list(ASPECT_ANGLES), frame),
+                    per_target(natal_longitudes, bodies, list(ASPECT_ANGLES), frame))
+
+
+if __name__ == "__main__":
+    unittest.main()